@@ -5,14 +5,18 @@
 from flask import Flask, render_template, request, send_file, jsonify, flash, redirect, url_for
 from werkzeug.utils import secure_filename
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import pandas as pd
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from supabase import create_client, Client
 from dotenv import load_dotenv
+import base64
 import json
-import threading
+import hashlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 import time
 import traceback
 
@@ -37,6 +41,20 @@ else:
 
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 
+# 이 크기 이상의 파일은 스트리밍 모드로 읽기 (메모리 사용량 일정)
+app.config['STREAMING_MIN_BYTES'] = int(os.getenv('STREAMING_MIN_BYTES', 2 * 1024 * 1024))  # 2MB
+
+# 업로드는 이 크기까지 메모리 버퍼에서 바로 읽고, 넘으면 임시 파일로 옮겨서 읽음
+app.config['UPLOAD_SPOOL_BYTES'] = int(os.getenv('UPLOAD_SPOOL_BYTES', app.config['MAX_CONTENT_LENGTH']))
+
+# 원본 업로드 보관 여부 (관리자 원본 다운로드용, 변환 후 백그라운드에서 저장). 0이면 저장하지 않음
+# Vercel의 /tmp는 인스턴스 사이에 유지되지 않으므로 기본값은 보관하지 않음
+app.config['KEEP_UPLOADS'] = os.getenv('KEEP_UPLOADS', '0' if IS_VERCEL else '1') == '1'
+
+# 웹 화면이 작업 모드(/upload?mode=job)로 업로드할지 여부. 작업 상태는 프로세스 메모리에 있어
+# 상태 조회가 다른 워커로 가면 찾지 못하므로 gunicorn 워커가 하나일 때만 1로 설정
+app.config['UPLOAD_JOB_MODE'] = os.getenv('UPLOAD_JOB_MODE', '0') == '1' and not IS_VERCEL
+
 # 폴더 생성 (에러 무시)
 try:
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -53,13 +71,33 @@ try:
         raise ValueError("SUPABASE_URL 또는 SUPABASE_KEY가 설정되지 않았습니다")
     
     supabase: Client = create_client(supabase_url, supabase_key)
+    
+    # 레코드 교체처럼 RLS를 넘어서는 DB 함수는 service_role에만 실행 권한이 있으므로 서버 전용 키로 호출
+    # (이 키는 서버 환경 변수에만 두고 브라우저로 보내지 않음)
+    supabase_service_key = os.getenv('SUPABASE_SERVICE_KEY')
+    if supabase_service_key:
+        supabase_service: Client = create_client(supabase_url, supabase_service_key)
+    else:
+        supabase_service = supabase
+        print("⚠️ SUPABASE_SERVICE_KEY가 설정되지 않아 레코드 교체 등 DB 함수 호출이 거부될 수 있습니다")
     print("✓ Supabase 연결 성공")
 except Exception as e:
     print(f"❌ Supabase 연결 오류: {e}")
     raise
 
 # main.py의 함수들 가져오기
-from income_statement import generate_income_statement
+from income_statement import (generate_income_statement, generate_store_statements, cube_period_view,
+                              recompute_results, generate_comparison_statement, PreloadedState,
+                              generate_batch_statements, store_output_path, CUBE_FREQUENCIES, INCREMENTAL_INGEST)
+from jobs import job_registry
+from maintenance import MaintenanceScheduler, cleanup_old_records, check_monthly_rollup, rebuild_monthly_rollup
+from calculator import calculate_totals
+from excel_generator import render_excel, statement_preview
+from render_cache import statement_cache
+from readers import file_format, SpooledUpload
+from data_extractor import read_preamble_period
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
 @app.route('/health')
 def health():
@@ -75,14 +113,270 @@ def health():
 @app.route('/')
 def index():
     """메인 페이지"""
-    # 오래된 레코드 자동 삭제 (Vercel이 아닌 경우만)
-    if not IS_VERCEL:
-        cleanup_old_records()
-    return render_template('index.html')
+    return render_template('index.html', job_mode=app.config['UPLOAD_JOB_MODE'])
+
+def secure_upload_filename(original_name):
+    """안전한 파일명 생성 (한글 파일명은 secure_filename에서 확장자만 남으므로 확장자 보존)"""
+    ext = os.path.splitext(original_name)[1].lower()
+    filename = secure_filename(original_name)
+    if not filename.lower().endswith(ext):
+        filename = f"{os.path.splitext(filename)[0] or 'upload'}{ext}"
+    return filename
+
+
+def save_upload(file, path, chunk_size=64 * 1024):
+    """업로드 스트림(또는 zip 항목 같은 파일 객체)을 파일로 저장하면서 내용의 SHA-256 해시 계산"""
+    stream = getattr(file, 'stream', file)
+    digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+def spool_upload(file, name, chunk_size=64 * 1024):
+    """
+    업로드 스트림을 메모리 버퍼로 받으면서 내용의 SHA-256 해시 계산
+
+    Returns:
+        (SpooledUpload, 해시) - 버퍼는 읽기 위치가 끝에 있으므로 tell()이 크기
+    """
+    buffer = SpooledUpload(name, app.config['UPLOAD_SPOOL_BYTES'])
+    digest = hashlib.sha256()
+    while True:
+        chunk = file.stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        buffer.write(chunk)
+    return buffer, digest.hexdigest()
+
+
+def persist_upload(buffer, path, chunk_size=64 * 1024):
+    """
+    업로드 버퍼를 원본 파일로 저장하고 버퍼 닫기
+
+    임시 이름으로 쓴 뒤 교체하므로 반쯤 쓰인 파일이 원본 경로에 남지 않는다.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        buffer.seek(0)
+        with open(tmp_path, 'wb') as f:
+            while True:
+                chunk = buffer.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"원본 파일 저장 오류: {e}")
+        remove_file(tmp_path)
+        raise
+    finally:
+        buffer.close()
+
+
+# 원본 저장과 교체된 레코드의 파일 삭제 (응답을 기다리게 하지 않도록 백그라운드에서 하나씩)
+file_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='files')
+
+
+def find_converted_upload(content_hash):
+    """
+    같은 내용의 파일을 이미 변환한 기록 조회 (없으면 None)
+
+    매장별 업로드(/upload/stores)는 워크북 해시를 시트마다 저장하므로, 매장 없이 파일 전체를
+    변환한 레코드만 찾는다.
+    """
+    try:
+        response = (supabase.table('income_statements')
+                    .select('*')
+                    .eq('content_hash', content_hash)
+                    .is_('store_name', 'null')
+                    .order('upload_date', desc=True)
+                    .limit(1)
+                    .execute())
+    except Exception as e:
+        print(f"중복 업로드 조회 오류: {e}")
+        return None
+    
+    if response.data:
+        record = response.data[0]
+        if record.get('result') and (record.get('column_data') or os.path.exists(record['output_file_path'])):
+            return record
+    return None
+
+
+def render_record_statement(record):
+    """
+    레코드의 손익계산서 xlsx 바이트 (최근 생성한 버퍼는 캐시에서 반환)
+
+    저장된 항목별 합계(column_data)로 메모리에서 생성하고, column_data가 없는 이전
+    레코드는 디스크에 남아 있는 파일을 읽는다. 둘 다 없으면 None.
+    """
+    data = statement_cache.get(record['id'])
+    if data is not None:
+        return data
+    
+    if record.get('column_data'):
+        data = render_excel(calculate_totals(record['column_data']))
+    elif record.get('output_file_path') and os.path.exists(record['output_file_path']):
+        with open(record['output_file_path'], 'rb') as f:
+            data = f.read()
+    else:
+        return None
+    statement_cache.put(record['id'], data)
+    return data
+
+
+def send_record_statement(record):
+    """레코드의 손익계산서를 디스크를 거치지 않고 바로 전송"""
+    data = render_record_statement(record)
+    if data is None:
+        return jsonify({'error': '파일을 찾을 수 없습니다'}), 404
+    return send_file(BytesIO(data), mimetype=XLSX_MIMETYPE, as_attachment=True,
+                     download_name=os.path.basename(record['output_file_path']))
+
+
+def find_ingest_state(transaction_period):
+    """
+    같은 거래기간의 가장 최근 레코드의 증분 처리 상태 조회 (없으면 None)
+
+    상태(ingest_state)만 가져오고, 저장된 합계/큐브는 앞부분이 같을 때 load_ingest_sums()로 가져온다.
+    """
+    if not transaction_period:
+        return None
+    
+    try:
+        response = (supabase.table('income_statements')
+                    .select('id, ingest_state')
+                    .eq('transaction_period', transaction_period)
+                    .is_('store_name', 'null')
+                    .order('upload_date', desc=True)
+                    .limit(1)
+                    .execute())
+        return response.data[0] if response.data else None
+    except Exception as e:
+        print(f"증분 처리 상태 조회 오류 (전체 처리): {e}")
+        return None
+
+
+def load_ingest_sums(record):
+    """find_ingest_state()로 찾은 레코드의 저장된 합계/큐브 조회 (없으면 None)"""
+    try:
+        response = (supabase.table('income_statements')
+                    .select('column_data, daily_cube')
+                    .eq('id', record['id'])
+                    .execute())
+        return response.data[0] if response.data else None
+    except Exception as e:
+        print(f"저장된 합계 조회 오류 (전체 처리): {e}")
+        return None
+
+
+def remove_files(paths):
+    """교체/삭제된 레코드의 파일 삭제 (백그라운드 작업)"""
+    for path in paths:
+        try:
+            remove_file(path)
+        except OSError as e:
+            print(f"파일 삭제 오류 (무시됨): {e}")
+
+
+def replace_records(rows):
+    """
+    같은 (매장, 거래기간)의 기존 레코드를 새 레코드로 교체하여 저장
+
+    삭제와 저장은 DB 함수(replace_income_statements, service_role 키로 호출) 한 번 호출로 한 트랜잭션에서 처리하고,
+    삭제된 레코드의 파일은 응답을 기다리게 하지 않도록 백그라운드에서 지운다.
+    rows 안에 같은 (매장, 거래기간)이 두 번 있으면 앞의 새 레코드가 바로 삭제되므로
+    호출하는 쪽에서 하나만 남겨야 한다.
+
+    Returns:
+        (rows 순서의 새 레코드 id 목록, 교체된 기존 레코드 수)
+    """
+    response = supabase_service.rpc('replace_income_statements', {'new_rows': rows}).execute()
+    ids = response.data['ids']
+    removed = response.data['removed']
+    
+    if removed:
+        for record in removed:
+            statement_cache.discard(record['id'])
+        paths = [record[key] for record in removed for key in ('input_file_path', 'output_file_path') if record[key]]
+        file_worker.submit(remove_files, paths)
+        print(f"✓ 같은 거래기간의 기존 데이터 {len(removed)}건을 교체했습니다.")
+    return ids, len(removed)
+
+
+def save_conversion(result, upload):
+    """
+    변환 결과를 DB에 저장하고 /upload 응답 딕셔너리 반환
+
+    Args:
+        result: generate_income_statement() 결과
+        upload: {'filename', 'input_path', 'output_path', 'content_hash'}
+    """
+    statement = result.pop('statement')
+    daily_cube = result.pop('daily_cube')
+    column_data = result.pop('column_data')
+    ingest_state = result.pop('ingest_state')
+    
+    # DB에 새 데이터 저장 (같은 거래기간의 기존 데이터는 교체)
+    data = {
+        'upload_filename': upload['filename'],
+        'transaction_period': result.get('transaction_period'),
+        'period_start': result['period_start'],
+        'period_end': result['period_end'],
+        'input_file_path': upload['input_path'],
+        'output_file_path': upload['output_path'],
+        'upload_date': datetime.now().isoformat(),
+        'total_sales': result['total_maechul'],
+        'total_cost': result['maechul_wonka'],
+        'gross_profit': result['maechul_total_iik'],
+        'deposit_amount': result['ipgeum_total'],
+        'content_hash': upload['content_hash'],
+        'result': result,
+        'daily_cube': daily_cube,
+        'column_data': column_data,
+        'ingest_state': ingest_state
+    }
+    
+    ids, replaced = replace_records([data])
+    record_id = ids[0]
+    
+    return {
+        'success': True,
+        'output_filename': os.path.basename(upload['output_path']),
+        'download_url': f"/download/record/{record_id}",
+        'result': result,
+        'statement': statement,
+        'id': record_id,
+        'updated': replaced > 0,
+        'cache': 'miss',
+        'ingest': {
+            'mode': ingest_state['mode'],
+            'new_rows': ingest_state['new_rows']
+        } if ingest_state else {'mode': 'full'}
+    }
+
+
+def remove_file(path):
+    """파일이 있으면 삭제 (작업 실패 시 정리용)"""
+    if path and os.path.exists(path):
+        os.remove(path)
+
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    """파일 업로드 및 변환"""
+    """
+    파일 업로드 및 변환
+
+    ?mode=job 이면 변환을 작업 프로세스에서 실행하고 작업 id를 바로 반환한다
+    (/jobs/<id>로 상태 조회, 완료되면 response에 동기 변환과 같은 응답).
+    """
     if 'file' not in request.files:
         return jsonify({'error': '파일이 없습니다'}), 400
     
@@ -90,152 +384,569 @@ def upload_file():
     if file.filename == '':
         return jsonify({'error': '파일이 선택되지 않았습니다'}), 400
     
-    if not file.filename.endswith('.xlsx'):
-        return jsonify({'error': 'Excel 파일(.xlsx)만 업로드 가능합니다'}), 400
+    if file_format(file.filename) is None:
+        return jsonify({'error': 'Excel(.xlsx), CSV(.csv), Parquet(.parquet) 파일만 업로드 가능합니다'}), 400
     
+    input_path = ''
+    buffer = None
     try:
-        # 파일 저장
-        filename = secure_filename(file.filename)
+        # 메모리 버퍼로 받기 (받으면서 내용 해시 계산, 디스크에는 쓰지 않음)
+        filename = secure_upload_filename(file.filename)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         input_filename = f"{timestamp}_{filename}"
         input_path = os.path.join(app.config['UPLOAD_FOLDER'], input_filename)
-        file.save(input_path)
-        
-        # 손익계산서 생성
-        output_filename = f"손익계산서_{timestamp}.xlsx"
-        output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
-        
-        result = generate_income_statement(input_path, output_path)
-        transaction_period = result.get('transaction_period')
-        
-        # 동일한 거래기간의 기존 데이터 확인 및 삭제
-        is_updated = False
-        if transaction_period:
-            try:
-                existing = supabase.table('income_statements').select('*').eq('transaction_period', transaction_period).execute()
-                
-                if existing.data:
-                    for old_record in existing.data:
-                        # 기존 파일 삭제
-                        old_input = old_record['input_file_path']
-                        old_output = old_record['output_file_path']
-                        
-                        if os.path.exists(old_input):
-                            os.remove(old_input)
-                        
-                        if os.path.exists(old_output):
-                            os.remove(old_output)
-                        
-                        # DB에서 기존 레코드 삭제
-                        supabase.table('income_statements').delete().eq('id', old_record['id']).execute()
-                    
-                    is_updated = True
-                    print(f"✓ 동일한 거래기간({transaction_period})의 기존 데이터 {len(existing.data)}건을 삭제했습니다.")
-            except Exception as e:
-                print(f"기존 데이터 삭제 오류: {e}")
-        
-        # DB에 새 데이터 저장
-        data = {
-            'upload_filename': filename,
-            'transaction_period': transaction_period,
-            'input_file_path': input_path,
-            'output_file_path': output_path,
-            'upload_date': datetime.now().isoformat(),
-            'total_sales': result['total_maechul'],
-            'total_cost': result['maechul_wonka'],
-            'gross_profit': result['maechul_total_iik'],
-            'deposit_amount': result['ipgeum_total']
+        buffer, content_hash = spool_upload(file, filename)
+        
+        # 같은 파일을 이미 변환했다면 저장된 결과 반환
+        cached = find_converted_upload(content_hash)
+        if cached:
+            buffer.close()
+            buffer = None
+            print(f"✓ 동일한 파일의 변환 결과를 재사용합니다 (id={cached['id']})")
+            return jsonify({
+                'success': True,
+                'output_filename': os.path.basename(cached['output_file_path']),
+                'download_url': f"/download/record/{cached['id']}",
+                'result': cached['result'],
+                'statement': statement_preview(calculate_totals(cached['column_data'])) if cached.get('column_data') else None,
+                'id': cached['id'],
+                'updated': False,
+                'cache': 'hit'
+            })
+        
+        # 손익계산서 계산 (Excel은 다운로드할 때 생성, 다운로드 이름만 기록)
+        keep_upload = app.config['KEEP_UPLOADS']
+        upload = {
+            'filename': filename,
+            'input_path': input_path if keep_upload else '',
+            'output_path': os.path.join(app.config['OUTPUT_FOLDER'], f"손익계산서_{timestamp}.xlsx"),
+            'content_hash': content_hash
         }
+        streaming = buffer.tell() >= app.config['STREAMING_MIN_BYTES']
+        
+        # 작업 모드: 작업 프로세스는 경로로 읽으므로 먼저 저장하고, 작업 프로세스는 DB를 조회할 수
+        # 없으므로 증분 처리용 이전 레코드(합계/큐브 포함)는 프리앰블의 거래기간으로 여기서 미리 조회해 넘긴다
+        if request.args.get('mode') == 'job' and not IS_VERCEL:
+            persist_upload(buffer, input_path)
+            buffer = None
+            find_state = None
+            if INCREMENTAL_INGEST and not streaming and file_format(input_path) == 'xlsx':
+                period = read_preamble_period(input_path)
+                record = find_ingest_state(period)
+                if record:
+                    record.update(load_ingest_sums(record) or {})
+                find_state = PreloadedState(period, record)
+            
+            def finish(result):
+                response = save_conversion(result, upload)
+                if not keep_upload:
+                    remove_file(input_path)
+                return response
+            
+            job_id = job_registry.submit(
+                generate_income_statement, (input_path, None, streaming, None, find_state),
+                finish=finish,
+                cleanup=lambda: remove_file(input_path))
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status_url': f"/jobs/{job_id}"
+            }), 202
+        
+        result = generate_income_statement(buffer, None, streaming=streaming,
+                                           find_state=find_ingest_state if INCREMENTAL_INGEST else None,
+                                           load_sums=load_ingest_sums)
+        response = save_conversion(result, upload)
+        
+        # 원본은 저장이 끝난 뒤 백그라운드에서 보관 (보관하지 않으면 버퍼만 닫음)
+        if keep_upload:
+            file_worker.submit(persist_upload, buffer, input_path)
+        else:
+            buffer.close()
+        buffer = None
+        return jsonify(response)
+        
+    except Exception as e:
+        # 오류 발생 시 버퍼와 임시 파일 정리
+        if buffer is not None:
+            buffer.close()
+        remove_file(input_path)
+        return jsonify({'error': str(e)}), 500
+
+# 일괄 업로드 제한 (zip은 압축을 푼 크기 기준)
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', 100))
+BATCH_MAX_UNZIPPED_BYTES = int(os.getenv('BATCH_MAX_UNZIPPED_BYTES', 200 * 1024 * 1024))  # 200MB
+
+
+def zip_member_name(info):
+    """zip 항목 이름 (UTF-8 표시가 없으면 Windows 한글 압축 프로그램의 CP949로 해석)"""
+    name = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode('cp437').decode('cp949')
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return os.path.basename(name.rstrip('/'))
+
+
+def iter_batch_uploads(files):
+    """
+    업로드된 파일과 zip 안의 파일을 (원래 이름, 파일 객체) 로 차례로 반환
+
+    지원하지 않는 형식은 파일 객체 None. zip 안의 폴더, 숨김 파일, 중첩 zip은 건너뛴다.
+    """
+    unzipped = 0
+    for file in files:
+        if not file.filename.lower().endswith('.zip'):
+            yield file.filename, file if file_format(file.filename) else None
+            continue
+        
+        with zipfile.ZipFile(file.stream) as archive:
+            for info in archive.infolist():
+                name = zip_member_name(info)
+                if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+                    continue
+                if not file_format(name):
+                    yield name, None
+                    continue
+                unzipped += info.file_size
+                if unzipped > BATCH_MAX_UNZIPPED_BYTES:
+                    raise ValueError(f"압축을 푼 파일 크기가 {BATCH_MAX_UNZIPPED_BYTES // (1024 * 1024)}MB를 넘습니다")
+                with archive.open(info) as member:
+                    yield name, member
+
+
+@app.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    """
+    여러 파일(.xlsx/.csv/.parquet) 또는 zip 하나를 일괄 변환
+
+    파일마다 프로세스 풀에서 동시에 변환하고 모든 레코드를 한 번에 저장한다. 파일 이름
+    (확장자 제외)을 매장 이름으로 저장하므로 같은 거래기간의 매장별 파일을 함께 올릴 수 있다.
+    응답의 files는 파일별 결과 목록, archive_url은 모든 손익계산서를 묶은 zip 다운로드 경로.
+    """
+    files = [file for file in request.files.getlist('files') + request.files.getlist('file') if file.filename]
+    if not files:
+        return jsonify({'error': '파일이 없습니다'}), 400
+    
+    start = time.time()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    manifest = []
+    uploads = []
+    try:
+        # 1. 파일 저장 (저장하면서 내용 해시 계산, 같은 내용의 파일은 한 번만 변환)
+        seen = {}
+        for name, member in iter_batch_uploads(files):
+            entry = {'filename': name, 'status': 'skipped'}
+            manifest.append(entry)
+            if member is None:
+                entry['error'] = '지원하지 않는 형식입니다'
+                continue
+            if len(uploads) >= BATCH_MAX_FILES:
+                raise ValueError(f"한 번에 최대 {BATCH_MAX_FILES}개 파일까지 변환할 수 있습니다")
+            
+            index = len(uploads) + 1
+            store_name = os.path.splitext(name)[0]
+            input_path = os.path.join(app.config['UPLOAD_FOLDER'],
+                                      f"{timestamp}_{index:03d}_{secure_upload_filename(name)}")
+            content_hash = save_upload(member, input_path)
+            if content_hash in seen:
+                os.remove(input_path)
+                entry['error'] = f"'{seen[content_hash]}'와 같은 파일입니다"
+                continue
+            seen[content_hash] = name
+            uploads.append({
+                'entry': entry,
+                'filename': secure_upload_filename(name),
+                'store_name': store_name,
+                'input_path': input_path,
+                'output_path': store_output_path(app.config['OUTPUT_FOLDER'], f"손익계산서_{timestamp}_{index:03d}", store_name),
+                'content_hash': content_hash
+            })
+        
+        # 2. 이미 변환한 파일은 한 번의 조회로 찾아 기존 결과 사용 (같은 매장 이름으로 저장된
+        #    레코드만, 매장별 업로드의 시트 레코드가 파일 전체 결과로 쓰이지 않도록)
+        if uploads:
+            cached = (supabase.table('income_statements')
+                      .select('id, content_hash, store_name, result')
+                      .in_('content_hash', [upload['content_hash'] for upload in uploads])
+                      .not_.is_('column_data', 'null')
+                      .execute().data)
+            cached = {(record['content_hash'], record['store_name']): record for record in cached}
+        else:
+            cached = {}
+        pending = []
+        for upload in uploads:
+            record = cached.get((upload['content_hash'], upload['store_name']))
+            if record:
+                os.remove(upload['input_path'])
+                upload['entry'].update({'status': 'cached', 'id': record['id'], 'result': record['result'],
+                                        'download_url': f"/download/record/{record['id']}"})
+            else:
+                pending.append(upload)
         
-        response = supabase.table('income_statements').insert(data).execute()
+        # 3. 동시에 변환
+        converted = generate_batch_statements(
+            [upload['input_path'] for upload in pending],
+            [os.path.getsize(upload['input_path']) >= app.config['STREAMING_MIN_BYTES'] for upload in pending])
+        
+        # 4. 저장할 레코드 모으기 (원본을 보관하지 않으면 변환이 끝난 입력 파일은 바로 삭제)
+        keep_upload = app.config['KEEP_UPLOADS']
+        rows = []
+        saved = []
+        for upload, outcome in zip(pending, converted):
+            entry = upload['entry']
+            entry['elapsed'] = round(outcome['elapsed'], 3)
+            if outcome['error']:
+                os.remove(upload['input_path'])
+                entry.update({'status': 'error', 'error': outcome['error']})
+                continue
+            
+            if not keep_upload:
+                os.remove(upload['input_path'])
+            result = outcome['result']
+            daily_cube = result.pop('daily_cube')
+            column_data = result.pop('column_data')
+            ingest_state = result.pop('ingest_state')
+            rows.append({
+                'upload_filename': upload['filename'],
+                'store_name': upload['store_name'],
+                'transaction_period': result['transaction_period'],
+                'period_start': result['period_start'],
+                'period_end': result['period_end'],
+                'input_file_path': upload['input_path'] if keep_upload else '',
+                'output_file_path': upload['output_path'],
+                'upload_date': datetime.now().isoformat(),
+                'total_sales': result['total_maechul'],
+                'total_cost': result['maechul_wonka'],
+                'gross_profit': result['maechul_total_iik'],
+                'deposit_amount': result['ipgeum_total'],
+                'content_hash': upload['content_hash'],
+                'result': result,
+                'daily_cube': daily_cube,
+                'column_data': column_data,
+                'ingest_state': ingest_state
+            })
+            entry.update({'status': 'converted', 'store_name': upload['store_name'], 'result': result})
+            saved.append(entry)
+        
+        # 같은 (매장, 거래기간) 파일이 여러 개면 마지막 파일만 저장 (한 번의 교체 요청 안에서
+        # 앞 파일의 레코드가 바로 삭제되지 않도록)
+        latest = {}
+        for position, row in enumerate(rows):
+            if row['transaction_period'] is not None:
+                latest[(row['store_name'], row['transaction_period'])] = position
+        kept_rows, kept_entries = [], []
+        for position, (row, entry) in enumerate(zip(rows, saved)):
+            key = (row['store_name'], row['transaction_period'])
+            if row['transaction_period'] is not None and latest[key] != position:
+                remove_file(row['input_file_path'])
+                entry.update({'status': 'skipped', 'result': None,
+                              'error': f"같은 매장·거래기간의 '{saved[latest[key]]['filename']}' 파일로 대체되었습니다"})
+                continue
+            kept_rows.append(row)
+            kept_entries.append(entry)
+        rows, saved = kept_rows, kept_entries
+        
+        # 매장별 기존 데이터 교체와 저장을 한 번에
+        if rows:
+            record_ids, _ = replace_records(rows)
+            for entry, record_id in zip(saved, record_ids):
+                entry.update({'id': record_id, 'download_url': f"/download/record/{record_id}"})
+        
+        ids = [entry['id'] for entry in manifest if entry.get('id')]
+        print(f"✓ 일괄 변환: {len(saved)}개 변환, {len(ids) - len(saved)}개 재사용, "
+              f"{len(manifest) - len(ids)}개 실패/건너뜀")
+        return jsonify({
+            'success': bool(ids),
+            'files': manifest,
+            'archive_url': f"/download/batch?ids={','.join(map(str, ids))}" if ids else None,
+            'elapsed': round(time.time() - start, 3)
+        })
+        
+    except Exception as e:
+        # 오류 발생 시 이번 요청에서 저장한 파일 정리
+        for upload in uploads:
+            remove_file(upload['input_path'])
+        return jsonify({'error': str(e), 'files': manifest}), 400 if isinstance(e, (ValueError, zipfile.BadZipFile)) else 500
+
+@app.route('/download/batch')
+def download_batch():
+    """여러 레코드의 손익계산서를 zip 하나로 묶어 다운로드 (?ids=1,2,3)"""
+    try:
+        ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids는 쉼표로 구분한 숫자여야 합니다'}), 400
+    if not ids:
+        return jsonify({'error': 'ids를 지정하세요'}), 400
+    
+    try:
+        records = (supabase.table('income_statements')
+                   .select('id, output_file_path, column_data')
+                   .in_('id', ids)
+                   .execute().data)
+        
+        buffer = BytesIO()
+        names = set()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for record in sorted(records, key=lambda record: record['id']):
+                data = render_record_statement(record)
+                if data is None:
+                    continue
+                name = os.path.basename(record['output_file_path'])
+                if name in names:
+                    name = f"{record['id']}_{name}"
+                names.add(name)
+                archive.writestr(name, data)
+        if not names:
+            return jsonify({'error': '파일을 찾을 수 없습니다'}), 404
+        
+        buffer.seek(0)
+        return send_file(buffer, mimetype='application/zip', as_attachment=True,
+                         download_name=f"손익계산서_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """변환 작업 상태 조회 (status: queued/running/done/failed, stage: queued/converting/saving/done/failed)"""
+    job = job_registry.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다'}), 404
+    
+    now = time.time()
+    return jsonify({
+        'id': job['id'],
+        'status': job['status'],
+        'stage': job['stage'],
+        'elapsed': round((job['finished'] or now) - job['created'], 3),
+        'response': job['response'],
+        'error': job['error']
+    })
+
+@app.route('/upload/stores', methods=['POST'])
+def upload_store_workbook():
+    """매장별 시트가 여러 개인 워크북 업로드 및 시트별 변환"""
+    if 'file' not in request.files:
+        return jsonify({'error': '파일이 없습니다'}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': '파일이 선택되지 않았습니다'}), 400
+    
+    if file_format(file.filename) != 'xlsx':
+        return jsonify({'error': '매장별 변환은 Excel 파일(.xlsx)만 가능합니다'}), 400
+    
+    input_path = ''
+    converted = None
+    try:
+        filename = secure_upload_filename(file.filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        input_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{timestamp}_{filename}")
+        content_hash = save_upload(file, input_path)
+        
+        # 시트별 손익계산서 + 요약 파일 생성 (시트 변환 프로세스가 경로로 읽으므로 변환 중에는 디스크에 둠)
+        converted = generate_store_statements(input_path, app.config['OUTPUT_FOLDER'], f"손익계산서_{timestamp}")
+        
+        # 원본을 보관하지 않으면 변환이 끝난 입력 파일은 바로 삭제
+        keep_upload = app.config['KEEP_UPLOADS']
+        if not keep_upload:
+            remove_file(input_path)
+        
+        # 매장별 기존 데이터 교체와 저장을 한 번에
+        rows = []
+        for store in converted['stores']:
+            result = store['result']
+            rows.append({
+                'upload_filename': filename,
+                'store_name': store['store_name'],
+                'transaction_period': result['transaction_period'],
+                'period_start': result['period_start'],
+                'period_end': result['period_end'],
+                'input_file_path': input_path if keep_upload else '',
+                'output_file_path': store['output_file'],
+                'upload_date': datetime.now().isoformat(),
+                'total_sales': result['total_maechul'],
+                'total_cost': result['maechul_wonka'],
+                'gross_profit': result['maechul_total_iik'],
+                'deposit_amount': result['ipgeum_total'],
+                'content_hash': content_hash,
+                'result': result,
+                'daily_cube': store['daily_cube'],
+                'column_data': store['column_data']
+            })
+        record_ids, _ = replace_records(rows)
         
         return jsonify({
             'success': True,
-            'output_filename': output_filename,
-            'result': result,
-            'id': response.data[0]['id'],
-            'updated': is_updated
+            'stores': [{
+                'store_name': store['store_name'],
+                'id': record_id,
+                'output_filename': os.path.basename(store['output_file']),
+                'download_url': f"/download/record/{record_id}",
+                'result': store['result'],
+                'elapsed': round(store['elapsed'], 3)
+            } for store, record_id in zip(converted['stores'], record_ids)],
+            'skipped_sheets': converted['skipped'],
+            'summary_filename': os.path.basename(converted['summary_file']),
+            'elapsed': round(converted['elapsed'], 3)
         })
         
     except Exception as e:
         # 오류 발생 시 임시 파일 정리
-        if os.path.exists(input_path):
-            os.remove(input_path)
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        remove_file(input_path)
+        if converted:
+            for path in [store['output_file'] for store in converted['stores']] + [converted['summary_file']]:
+                if os.path.exists(path):
+                    os.remove(path)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/download/record/<int:record_id>')
+def download_record(record_id):
+    """저장된 계산 결과로 손익계산서를 생성하여 다운로드"""
+    try:
+        response = (supabase.table('income_statements')
+                    .select('id, output_file_path, column_data')
+                    .eq('id', record_id)
+                    .execute())
+        if not response.data:
+            return jsonify({'error': '데이터를 찾을 수 없습니다'}), 404
+        return send_record_statement(response.data[0])
+    except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/download/<filename>')
 def download_file(filename):
-    """파일 다운로드"""
+    """파일 다운로드 (디스크에 없으면 같은 이름의 레코드로 생성)"""
+    filename = os.path.basename(filename)
     file_path = os.path.join(app.config['OUTPUT_FOLDER'], filename)
     if os.path.exists(file_path):
         return send_file(file_path, as_attachment=True)
-    return jsonify({'error': '파일을 찾을 수 없습니다'}), 404
-
-def cleanup_old_records():
-    """7주(49일) 이상 된 레코드 자동 삭제"""
+    
     try:
-        cutoff_date = datetime.now() - timedelta(days=49)
-        
-        # 7주 이상 된 레코드 조회
-        response = supabase.table('income_statements').select('*').lt('upload_date', cutoff_date.isoformat()).execute()
-        
+        response = (supabase.table('income_statements')
+                    .select('id, output_file_path, column_data')
+                    .eq('output_file_path', file_path)
+                    .order('upload_date', desc=True)
+                    .limit(1)
+                    .execute())
         if response.data:
-            deleted_count = 0
-            for record in response.data:
-                try:
-                    # 파일 삭제
-                    input_file = record['input_file_path']
-                    output_file = record['output_file_path']
-                    
-                    if os.path.exists(input_file):
-                        os.remove(input_file)
-                    
-                    if os.path.exists(output_file):
-                        os.remove(output_file)
-                    
-                    # DB에서 레코드 삭제
-                    supabase.table('income_statements').delete().eq('id', record['id']).execute()
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"레코드 {record['id']} 삭제 오류: {e}")
-            
-            if deleted_count > 0:
-                print(f"✓ {deleted_count}개의 오래된 레코드를 삭제했습니다.")
+            return send_record_statement(response.data[0])
     except Exception as e:
-        print(f"자동 삭제 오류: {e}")
+        print(f"다운로드 레코드 조회 오류: {e}")
+    return jsonify({'error': '파일을 찾을 수 없습니다'}), 404
 
+# 목록 페이지 크기 (기본값, 최대값)
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))
+MAX_PAGE_SIZE = 200
+
+# 목록 화면에 필요한 요약 컬럼 (fields를 지정하지 않으면 이 컬럼만 조회)
+SUMMARY_FIELDS = ['id', 'upload_date', 'upload_filename', 'store_name', 'transaction_period',
+                  'period_start', 'period_end', 'total_sales', 'total_cost', 'gross_profit', 'deposit_amount']
+
+# fields=로 요청할 수 있는 컬럼 (큐브, 항목별 합계 같은 큰 JSON 컬럼은 단건 조회로만)
+LIST_FIELDS = SUMMARY_FIELDS + ['input_file_path', 'output_file_path', 'content_hash', 'result', 'created_at']
+
+
+def encode_cursor(record):
+    """다음 페이지 커서 (마지막 레코드의 upload_date, id)"""
+    payload = json.dumps([record['upload_date'], record['id']])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """커서 → (upload_date, id) (형식이 잘못되면 ValueError)"""
+    try:
+        upload_date, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        datetime.fromisoformat(upload_date)
+        return upload_date, int(record_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"잘못된 커서입니다: {cursor}") from e
+
+
+def parse_period_range(args):
+    """요청 인자 from/to (YYYY-MM-DD) → (date_from, date_to) (없으면 None, 형식이 잘못되면 ValueError)"""
+    try:
+        date_from = datetime.strptime(args['from'], '%Y-%m-%d').date() if args.get('from') else None
+        date_to = datetime.strptime(args['to'], '%Y-%m-%d').date() if args.get('to') else None
+    except ValueError:
+        raise ValueError("from/to는 YYYY-MM-DD 형식이어야 합니다")
+    return date_from, date_to
+
+
+def filter_period_start(query, date_from, date_to):
+    """거래기간 시작일(period_start 인덱스) 범위 조건 추가"""
+    if date_from:
+        query = query.gte('period_start', date_from.isoformat())
+    if date_to:
+        query = query.lte('period_start', date_to.isoformat())
+    return query
+
+
+def fetch_record_page(args):
+    """
+    (upload_date, id) 내림차순 키셋 페이지 조회
+
+    Args:
+        args: 요청 인자 - fields(쉼표로 구분한 컬럼, 기본 SUMMARY_FIELDS), limit(기본 PAGE_SIZE,
+              최대 MAX_PAGE_SIZE), cursor(이전 페이지의 next_cursor),
+              from/to(YYYY-MM-DD, 거래기간 시작일 범위)
+
+    Returns:
+        {'records': 레코드 목록, 'next_cursor': 다음 페이지 커서 (마지막 페이지면 None)}
+    """
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()] or SUMMARY_FIELDS
+    unknown = [field for field in fields if field not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"조회할 수 없는 컬럼입니다: {', '.join(unknown)}")
+    # 커서에 필요한 컬럼은 항상 포함
+    fields = list(dict.fromkeys(['id', 'upload_date'] + fields))
+    
+    try:
+        limit = min(max(int(args.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ValueError("limit은 숫자여야 합니다")
+    date_from, date_to = parse_period_range(args)
+    
+    query = supabase.table('income_statements').select(', '.join(fields))
+    query = filter_period_start(query, date_from, date_to)
+    cursor = args.get('cursor')
+    if cursor:
+        upload_date, record_id = decode_cursor(cursor)
+        query = query.or_(f'upload_date.lt."{upload_date}",'
+                          f'and(upload_date.eq."{upload_date}",id.lt.{record_id})')
+    
+    # 한 건 더 조회하여 다음 페이지가 있는지 확인
+    records = (query.order('upload_date', desc=True)
+               .order('id', desc=True)
+               .limit(limit + 1)
+               .execute().data)
+    has_more = len(records) > limit
+    records = records[:limit]
+    return {
+        'records': records,
+        'next_cursor': encode_cursor(records[-1]) if has_more else None
+    }
 
-def cleanup_scheduler():
-    """백그라운드에서 매일 자동 삭제 실행"""
-    while True:
-        try:
-            cleanup_old_records()
-        except Exception as e:
-            print(f"스케줄러 오류: {e}")
-        # 24시간마다 실행
-        time.sleep(86400)
 
 @app.route('/history')
 def history():
-    """변환 이력 조회"""
+    """변환 이력 조회 (첫 페이지만 렌더링하고 이후 페이지는 /api/records로 불러옴)"""
     try:
-        # 오래된 레코드 자동 삭제 (Vercel이 아닌 경우만)
-        if not IS_VERCEL:
-            cleanup_old_records()
-        
-        response = supabase.table('income_statements').select('*').order('upload_date', desc=True).execute()
-        return render_template('history.html', records=response.data)
+        page = fetch_record_page(request.args)
+        return render_template('history.html', records=page['records'], next_cursor=page['next_cursor'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/records')
 def get_records():
-    """API: 전체 기록 조회"""
+    """API: 기록 목록 조회 (?fields=&limit=&cursor=, 최신순 페이지)"""
     try:
-        response = supabase.table('income_statements').select('*').order('upload_date', desc=True).execute()
-        return jsonify(response.data)
+        return jsonify(fetch_record_page(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -250,6 +961,31 @@ def get_record(record_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/record/<int:record_id>/daily')
+def get_record_daily(record_id):
+    """API: 저장된 거래일별 큐브로 일별/주별 손익 조회 (?freq=day|week)"""
+    freq = request.args.get('freq', 'day')
+    if freq not in CUBE_FREQUENCIES:
+        return jsonify({'error': 'freq는 day 또는 week만 가능합니다'}), 400
+    
+    try:
+        response = supabase.table('income_statements').select('id, transaction_period, daily_cube').eq('id', record_id).execute()
+        if not response.data:
+            return jsonify({'error': '기록을 찾을 수 없습니다'}), 404
+        
+        record = response.data[0]
+        if not record.get('daily_cube'):
+            return jsonify({'error': '거래일별 데이터가 없는 기록입니다 (다시 업로드하면 생성됩니다)'}), 404
+        
+        return jsonify({
+            'id': record['id'],
+            'transaction_period': record['transaction_period'],
+            'freq': freq,
+            'periods': cube_period_view(record['daily_cube'], freq)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/admin')
 def admin():
     """관리자 페이지"""
@@ -265,54 +1001,18 @@ def admin_verify():
         return jsonify({'success': True})
     return jsonify({'success': False, 'error': '비밀번호가 올바르지 않습니다'}), 401
 
-def parse_month_from_period(period_str):
-    """거래기간에서 월 추출 (종료일 기준)"""
-    if not period_str:
-        return None
-    
-    try:
-        # "2024.07.26 ~ 2024.08.26" 또는 "07-26-08-26" 형식 처리
-        period_str = str(period_str).strip()
-        
-        # ~ 기준으로 분리
-        if '~' in period_str:
-            parts = period_str.split('~')
-            end_date = parts[1].strip() if len(parts) > 1 else parts[0].strip()
-        else:
-            # 하이픈으로만 구분된 경우 (07-26-08-26)
-            parts = period_str.split('-')
-            if len(parts) >= 4:
-                # 마지막 두 부분이 종료 월-일
-                end_date = f"{parts[-2]}-{parts[-1]}"
-            else:
-                end_date = period_str
-        
-        # 날짜에서 연도와 월 추출
-        end_date = end_date.replace('.', '-').replace('/', '-')
-        date_parts = [p.strip() for p in end_date.split('-') if p.strip()]
-        
-        if len(date_parts) >= 2:
-            year = date_parts[0] if len(date_parts[0]) == 4 else f"20{date_parts[0]}"
-            month = date_parts[1].zfill(2)
-            return f"{year}-{month}"
-        
-        return None
-    except Exception as e:
-        print(f"월 파싱 오류: {e}, 입력: {period_str}")
-        return None
-
-
 @app.route('/admin/data')
 def admin_data():
-    """관리자 데이터 조회 (비밀번호 확인 후)"""
+    """관리자 데이터 조회 (비밀번호 확인 후, /api/records와 같은 키셋 페이지)"""
     password = request.args.get('password', '')
     
     if password != '0928':
         return jsonify({'error': '권한이 없습니다'}), 403
     
     try:
-        response = supabase.table('income_statements').select('*').order('upload_date', desc=True).execute()
-        return jsonify(response.data)
+        return jsonify(fetch_record_page(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"admin_data 오류: {e}")
         traceback.print_exc()
@@ -321,53 +1021,43 @@ def admin_data():
 
 @app.route('/admin/statistics')
 def admin_statistics():
-    """관리자 통계 조회"""
+    """
+    관리자 통계 조회
+
+    거래기간 종료월별 합계는 DB 트리거가 갱신하는 income_statement_monthly 집계 테이블에서 읽는다
+    (레코드 전체를 내려받아 다시 합산하지 않음).
+    """
     password = request.args.get('password', '')
     
     if password != '0928':
         return jsonify({'error': '권한이 없습니다'}), 403
     
     try:
-        response = supabase.table('income_statements').select('*').execute()
-        records = response.data
+        rows = supabase.table('income_statement_monthly').select(
+            'month, record_count, total_sales, total_cost, gross_profit, deposit_amount'
+        ).order('month', desc=True).execute().data
         
-        # 월별 통계 집계
-        monthly_stats = {}
-        
-        for record in records:
-            month = parse_month_from_period(record.get('transaction_period'))
-            
-            if month:
-                if month not in monthly_stats:
-                    monthly_stats[month] = {
-                        'month': month,
-                        'count': 0,
-                        'total_sales': 0,
-                        'total_cost': 0,
-                        'gross_profit': 0,
-                        'deposit_amount': 0
-                    }
-                
-                monthly_stats[month]['count'] += 1
-                monthly_stats[month]['total_sales'] += float(record.get('total_sales', 0) or 0)
-                monthly_stats[month]['total_cost'] += float(record.get('total_cost', 0) or 0)
-                monthly_stats[month]['gross_profit'] += float(record.get('gross_profit', 0) or 0)
-                monthly_stats[month]['deposit_amount'] += float(record.get('deposit_amount', 0) or 0)
-        
-        # 월별로 정렬 (최신순)
-        sorted_stats = sorted(monthly_stats.values(), key=lambda x: x['month'], reverse=True)
+        # 월별 통계 (최신순, 거래기간을 읽을 수 없는 레코드는 전체 통계에만 포함)
+        monthly_stats = [{
+            'month': row['month'],
+            'count': row['record_count'],
+            'total_sales': float(row['total_sales']),
+            'total_cost': float(row['total_cost']),
+            'gross_profit': float(row['gross_profit']),
+            'deposit_amount': float(row['deposit_amount'])
+        } for row in rows if row['month']]
         
         # 전체 통계
         total_stats = {
-            'total_records': len(records),
-            'total_sales': sum(float(r.get('total_sales', 0) or 0) for r in records),
-            'total_cost': sum(float(r.get('total_cost', 0) or 0) for r in records),
-            'gross_profit': sum(float(r.get('gross_profit', 0) or 0) for r in records),
-            'deposit_amount': sum(float(r.get('deposit_amount', 0) or 0) for r in records)
+            'total_records': sum(row['record_count'] for row in rows),
+            'total_sales': sum(float(row['total_sales']) for row in rows),
+            'total_cost': sum(float(row['total_cost']) for row in rows),
+            'gross_profit': sum(float(row['gross_profit']) for row in rows),
+            'deposit_amount': sum(float(row['deposit_amount']) for row in rows)
         }
         
         return jsonify({
-            'monthly': sorted_stats,
+            'monthly': monthly_stats,
             'total': total_stats
         })
         
@@ -376,6 +1066,141 @@ def admin_statistics():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admin/statistics/check')
+def admin_statistics_check():
+    """월별 통계 집계와 레코드 테이블의 실제 합계 비교 (불일치한 월 목록)"""
+    password = request.args.get('password', '')
+    
+    if password != '0928':
+        return jsonify({'error': '권한이 없습니다'}), 403
+    
+    try:
+        return jsonify(check_monthly_rollup(supabase_service))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/statistics/rebuild', methods=['POST'])
+def admin_statistics_rebuild():
+    """월별 통계 집계를 레코드 테이블에서 다시 계산"""
+    password = request.args.get('password', '')
+    
+    if password != '0928':
+        return jsonify({'error': '권한이 없습니다'}), 403
+    
+    try:
+        return jsonify({'success': True, **rebuild_monthly_rollup(supabase_service)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# 계산식 재계산 시 한 번에 조회/저장할 레코드 수
+RECOMPUTE_BATCH_SIZE = 500
+
+
+@app.route('/admin/recompute', methods=['POST'])
+def admin_recompute():
+    """
+    계산식 수정 후 저장된 항목별 합계로 전체 이력의 요약 결과를 다시 계산
+
+    id 순 키셋 페이지로 RECOMPUTE_BATCH_SIZE건씩 읽어 한 번에 계산하고, 페이지마다 DB 함수
+    (update_income_statement_results, service_role 키로 호출) 한 번으로 저장한다.
+    """
+    password = request.args.get('password', '')
+    
+    if password != '0928':
+        return jsonify({'error': '권한이 없습니다'}), 403
+    
+    try:
+        recomputed = 0
+        last_id = 0
+        while True:
+            records = (supabase.table('income_statements')
+                       .select('id, transaction_period, column_data')
+                       .not_.is_('column_data', 'null')
+                       .gt('id', last_id)
+                       .order('id')
+                       .limit(RECOMPUTE_BATCH_SIZE)
+                       .execute().data)
+            if not records:
+                break
+            last_id = records[-1]['id']
+            
+            results = recompute_results(records)
+            updates = [{
+                'id': record['id'],
+                'total_sales': result['total_maechul'],
+                'total_cost': result['maechul_wonka'],
+                'gross_profit': result['maechul_total_iik'],
+                'deposit_amount': result['ipgeum_total'],
+                'period_start': result['period_start'],
+                'period_end': result['period_end'],
+                'result': result
+            } for record, result in zip(records, results)]
+            recomputed += supabase_service.rpc('update_income_statement_results', {'updates': updates}).execute().data
+            for record in records:
+                statement_cache.discard(record['id'])
+            
+            if len(records) < RECOMPUTE_BATCH_SIZE:
+                break
+        
+        print(f"✓ 레코드 {recomputed}건의 계산 결과를 다시 계산했습니다.")
+        return jsonify({'success': True, 'recomputed': recomputed})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/export/comparison')
+def admin_export_comparison():
+    """
+    여러 기간의 손익계산서를 한 파일로 비교 다운로드
+
+    ?ids=1,2,3 으로 레코드를 고르거나 ?from=YYYY-MM-DD&to=YYYY-MM-DD 로 거래기간 시작일 범위 지정
+    """
+    password = request.args.get('password', '')
+    
+    if password != '0928':
+        return jsonify({'error': '권한이 없습니다'}), 403
+    
+    try:
+        ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids는 쉼표로 구분한 숫자여야 합니다'}), 400
+    try:
+        date_from, date_to = parse_period_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not ids and not (date_from or date_to):
+        return jsonify({'error': 'ids 또는 from/to를 지정하세요'}), 400
+    
+    try:
+        query = supabase.table('income_statements').select('id, store_name, transaction_period, period_start, column_data')
+        if ids:
+            query = query.in_('id', ids)
+        query = filter_period_start(query, date_from, date_to)
+        records = query.not_.is_('column_data', 'null').execute().data
+        
+        buffer = BytesIO()
+        included = generate_comparison_statement(records, buffer)
+        buffer.seek(0)
+        print(f"✓ 기간별 비교 손익계산서 생성: {len(included)}개 기간")
+        return send_file(buffer, mimetype=XLSX_MIMETYPE, as_attachment=True,
+                         download_name=f"손익계산서_비교_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/maintenance')
+def admin_maintenance():
+    """유지보수 스케줄러 상태와 마지막 정리 결과(삭제 건수, 소요 시간) 조회"""
+    password = request.args.get('password', '')
+    
+    if password != '0928':
+        return jsonify({'error': '권한이 없습니다'}), 403
+    
+    if maintenance_scheduler is None:
+        return jsonify({'scheduler': None, 'message': 'Vercel 환경: Cron Job(api/cleanup.py)으로 실행됩니다'})
+    return jsonify({'scheduler': maintenance_scheduler.status()})
+
 @app.route('/admin/download/input/<int:record_id>')
 def admin_download_input(record_id):
     """원본 파일 다운로드"""
@@ -403,11 +1228,9 @@ def admin_download_output(record_id):
         return jsonify({'error': '권한이 없습니다'}), 403
     
     try:
-        response = supabase.table('income_statements').select('*').eq('id', record_id).execute()
+        response = supabase.table('income_statements').select('id, output_file_path, column_data').eq('id', record_id).execute()
         if response.data:
-            file_path = response.data[0]['output_file_path']
-            if os.path.exists(file_path):
-                return send_file(file_path, as_attachment=True)
+            return send_record_statement(response.data[0])
         return jsonify({'error': '파일을 찾을 수 없습니다'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -442,18 +1265,25 @@ def admin_delete_record(record_id):
         
         # DB에서 레코드 삭제
         supabase.table('income_statements').delete().eq('id', record_id).execute()
+        statement_cache.discard(record_id)
         
         return jsonify({'success': True, 'message': '삭제되었습니다'})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# 백그라운드 스케줄러 시작 (Vercel이 아닌 경우만)
+# 백그라운드 유지보수 스케줄러 시작 (Vercel이 아닌 경우만, 여러 워커 중 하나만 실행)
 if not IS_VERCEL:
-    scheduler_thread = threading.Thread(target=cleanup_scheduler, daemon=True)
-    scheduler_thread.start()
+    def run_maintenance():
+        def discard_statements(ids):
+            for record_id in ids:
+                statement_cache.discard(record_id)
+        return cleanup_old_records(supabase_service, on_deleted=discard_statements)
+    
+    maintenance_scheduler = MaintenanceScheduler(run_maintenance).start()
     print("✓ 자동 삭제 스케줄러가 시작되었습니다 (매일 실행)")
 else:
+    maintenance_scheduler = None
     print("✓ Vercel 환경: Cron Job을 사용하여 자동 삭제가 실행됩니다")
 
 if __name__ == '__main__':
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+손익계산서 Excel 생성 벤치마크
+
+data.xlsx의 계산 결과로 이전 방식(셀마다 스타일 객체를 설정하는 baseline_excel)과
+현재 방식(NamedStyle 템플릿의 generate_excel(), 메모리 버퍼로 만드는 render_excel())을
+반복 실행하여 1회 생성 시간과 출력 크기를 비교한다.
+
+사용법: python benchmarks/bench_excel.py [반복 횟수]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import SAMPLE_FILE
+
+import baseline_excel
+from calculator import calculate_totals
+from data_extractor import load_column_data
+from excel_generator import generate_excel, render_excel
+
+
+def timings(func, repeat):
+    """(최소, 중앙값) 소요 시간(초)"""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[0], times[len(times) // 2]
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    _, column_data = load_column_data(SAMPLE_FILE)
+    calc_result = calculate_totals(column_data)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        before_file = os.path.join(tmp_dir, 'before.xlsx')
+        after_file = os.path.join(tmp_dir, 'after.xlsx')
+        cases = [
+            ('before (셀별 스타일)', lambda: baseline_excel.generate_excel(before_file, calc_result),
+             lambda: os.path.getsize(before_file)),
+            ('after (템플릿, 파일)', lambda: generate_excel(after_file, calc_result),
+             lambda: os.path.getsize(after_file)),
+            ('after (render_excel)', lambda: render_excel(calc_result),
+             lambda: len(render_excel(calc_result))),
+        ]
+
+        print(f"반복 {repeat}회")
+        print(f"{'방식':<24}{'최소(ms)':>10}{'중앙값(ms)':>12}{'크기(bytes)':>14}")
+        results = {}
+        for label, func, size in cases:
+            best, median = timings(func, repeat)
+            results[label] = median
+            print(f"{label:<24}{best * 1000:>10.2f}{median * 1000:>12.2f}{size():>14,}")
+
+    baseline = results[cases[0][0]]
+    for label, _, _ in cases[1:]:
+        print(f"{label} 중앙값 기준 {baseline / results[label]:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+합계 계산식 배치 평가 벤치마크
+
+저장된 레코드 N건의 합계를 레코드마다 calculate_totals()로 다시 계산하는 방식과
+N × 26 행렬 한 번으로 calculate_totals_batch()를 호출하는 방식을 비교한다.
+레코드는 synthetic.synthetic_records()로 샘플 파일의 항목별 합계를 변형해 만든다.
+'평가만'은 행렬 변환을 뺀 calculate_totals_batch() 시간이다.
+
+사용법: python benchmarks/bench_formulas.py [레코드 수 ...]
+"""
+import sys
+import time
+
+from synthetic import synthetic_records
+
+from calculator import calculate_totals, calculate_totals_batch, column_matrix
+
+
+def per_record(records):
+    """이전 방식: 레코드마다 calculate_totals()"""
+    return [calculate_totals(data) for data in records]
+
+
+def batch(records):
+    """현재 방식: 행렬 변환 후 한 번에 평가"""
+    return calculate_totals_batch(column_matrix(records))
+
+
+def best_of(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+    print(f"{'레코드 수':>10}{'per-record(초)':>16}{'batch(초)':>12}{'평가만(초)':>12}{'speedup':>10}")
+    for n_records in sizes:
+        records = synthetic_records(n_records)
+        expected = per_record(records)
+        totals = batch(records)
+        assert all(result[name] == totals[name][idx]
+                   for idx, result in enumerate(expected) for name in totals)
+        old = best_of(per_record, records)
+        new = best_of(batch, records)
+        evaluate = best_of(calculate_totals_batch, column_matrix(records))
+        print(f"{n_records:>10,}{old:>16.4f}{new:>12.4f}{evaluate:>12.4f}{old / new:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
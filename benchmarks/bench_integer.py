@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+정수 원 단위(int64) 모드 벤치마크
+
+같은 데이터 프레임에서 float64 블록 합계(기본 모드)와 int64 블록 합계(INTEGER_WON)의
+컬럼 추출 + 합계 계산 시간을 비교하고, 두 결과가 같은지 확인한다.
+
+사용법: python benchmarks/bench_integer.py [행 수 ...]
+"""
+import sys
+import time
+
+from bench_vectorized import make_frame
+
+from calculator import calculate_totals
+from data_extractor import build_column_plan, extract_all_columns
+
+
+def run(df_data, plan, integer):
+    return calculate_totals(extract_all_columns(df_data, plan, integer=integer))
+
+
+def best_of(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    print(f"{'행 수':>10}{'float64(초)':>14}{'int64(초)':>12}{'speedup':>10}")
+    for n_rows in sizes:
+        df_data = make_frame(n_rows)
+        plan = build_column_plan(df_data.columns)
+        as_float, as_int = run(df_data, plan, False), run(df_data, plan, True)
+        assert all(as_float[key] == as_int[key] for key in as_float if key != 'data')
+        repeat = 5 if n_rows < 1_000_000 else 3
+        old = best_of(run, df_data, plan, False, repeat=repeat)
+        new = best_of(run, df_data, plan, True, repeat=repeat)
+        print(f"{n_rows:>10,}{old:>14.4f}{new:>12.4f}{old / new:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+워크북 파싱 횟수/시간 벤치마크
+
+이전 방식(거래기간 추출과 데이터 읽기가 각각 파일을 파싱)과
+ParsedWorkbook을 재사용하는 현재 방식을 비교한다.
+
+사용법: python benchmarks/bench_parse_once.py [행 수 ...]
+"""
+import sys
+import time
+
+from synthetic import SAMPLE_FILE, synthetic_path
+
+import data_extractor
+from data_extractor import (parse_workbook, read_excel_data,
+                            extract_transaction_period, extract_all_columns)
+
+
+class ReadCounter:
+    """워크북 열기 횟수 계측 (data_extractor가 시트를 읽는 readers.iter_sheet_rows 호출 수)"""
+
+    def __init__(self):
+        self.count = 0
+        self._original = data_extractor.iter_sheet_rows
+
+    def __enter__(self):
+        def counted(*args, **kwargs):
+            self.count += 1
+            return self._original(*args, **kwargs)
+        data_extractor.iter_sheet_rows = counted
+        return self
+
+    def __exit__(self, *exc):
+        data_extractor.iter_sheet_rows = self._original
+
+
+def before(path):
+    """이전 파이프라인: 경로를 넘겨 단계마다 다시 파싱"""
+    extract_transaction_period(path)
+    return extract_all_columns(read_excel_data(path))
+
+
+def after(path):
+    """현재 파이프라인: 한 번 파싱한 워크북 재사용"""
+    workbook = parse_workbook(path)
+    extract_transaction_period(workbook)
+    return extract_all_columns(workbook.data)
+
+
+def measure(func, path, repeat=3):
+    """(파싱 횟수, 최소 소요 시간) 반환"""
+    best = float('inf')
+    for _ in range(repeat):
+        with ReadCounter() as counter:
+            start = time.perf_counter()
+            func(path)
+            best = min(best, time.perf_counter() - start)
+    return counter.count, best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000]
+    targets = [('data.xlsx', SAMPLE_FILE)] + [(f'{n:,}행', synthetic_path(n)) for n in sizes]
+
+    print(f"{'파일':<14}{'방식':<8}{'파싱 횟수':>10}{'시간(초)':>12}")
+    for label, path in targets:
+        results = {}
+        for name, func in (('before', before), ('after', after)):
+            count, elapsed = measure(func, path)
+            results[name] = elapsed
+            print(f"{label:<14}{name:<8}{count:>10}{elapsed:>12.3f}")
+        print(f"{'':<14}{'speedup':<8}{'':>10}{results['before'] / results['after']:>11.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+스프레드시트 읽기 백엔드 비교 벤치마크
+
+번들된 data.xlsx와 합성 대용량 파일에서 설치된 백엔드별로
+워크북 파싱(parse_workbook)과 스트리밍 합계(stream_excel_columns) 시간을 측정한다.
+참고용으로 이전 방식인 pd.read_excel도 함께 측정한다.
+
+사용법: python benchmarks/bench_readers.py [행 수 ...]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from synthetic import SAMPLE_FILE, synthetic_path
+
+from data_extractor import parse_workbook, stream_excel_columns, extract_all_columns
+from readers import available_backends
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000]
+    targets = [('data.xlsx', SAMPLE_FILE)] + [(f'{n:,}행', synthetic_path(n)) for n in sizes]
+    backends = available_backends()
+    print(f"사용 가능한 백엔드: {', '.join(backends)}\n")
+
+    print(f"{'파일':<14}{'백엔드':<12}{'parse(초)':>12}{'stream(초)':>12}")
+    for label, path in targets:
+        repeat = 3 if path == SAMPLE_FILE else 1
+
+        _, elapsed = best_of(lambda: pd.read_excel(path, sheet_name=0, header=None), repeat)
+        print(f"{label:<14}{'pd.read_excel':<12}{elapsed:>12.3f}{'-':>12}")
+
+        expected = None
+        for backend in backends:
+            def parse():
+                workbook = parse_workbook(path, backend)
+                return extract_all_columns(workbook.data, workbook.column_plan)
+            parsed, parse_time = best_of(parse, repeat)
+            (_, streamed), stream_time = best_of(lambda: stream_excel_columns(path, backend), repeat)
+            expected = expected or parsed
+            assert parsed == streamed == expected, f'{backend} 결과가 다릅니다'
+            print(f"{label:<14}{backend:<12}{parse_time:>12.3f}{stream_time:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
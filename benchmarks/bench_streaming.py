@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+데이터 프레임 방식과 스트리밍 방식의 최대 메모리/시간 비교
+
+사용법: python benchmarks/bench_streaming.py [행 수 ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from synthetic import synthetic_path
+
+from data_extractor import parse_workbook, stream_excel_columns, extract_all_columns
+
+
+def dataframe_path(path):
+    workbook = parse_workbook(path)
+    return extract_all_columns(workbook.data)
+
+
+def streaming_path(path):
+    _, column_data = stream_excel_columns(path)
+    return column_data
+
+
+def measure(func, path):
+    """(결과, 소요 시간, 최대 메모리 MB) 반환"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000]
+
+    print(f"{'행 수':>10}  {'방식':<10}{'시간(초)':>10}{'최대 메모리(MB)':>16}")
+    for n_rows in sizes:
+        path = synthetic_path(n_rows)
+        expected, elapsed, peak = measure(dataframe_path, path)
+        print(f"{n_rows:>10,}  {'dataframe':<10}{elapsed:>10.3f}{peak:>16.1f}")
+        result, elapsed, peak = measure(streaming_path, path)
+        print(f"{n_rows:>10,}  {'streaming':<10}{elapsed:>10.3f}{peak:>16.1f}")
+        assert result == expected, '스트리밍 결과가 데이터 프레임 결과와 다릅니다'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+컬럼 합계 추출 마이크로 벤치마크
+
+항목마다 pd.to_numeric().sum()을 호출하던 이전 방식과
+2차원 블록 한 번의 합계로 계산하는 현재 방식을 비교한다.
+
+사용법: python benchmarks/bench_vectorized.py [행 수 ...]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import read_sample_rows
+
+from data_extractor import build_column_plan, extract_all_columns
+
+
+def make_frame(n_rows):
+    """샘플 행을 반복한 object dtype 데이터 프레임 (read_excel 결과와 같은 형태)"""
+    head, data = read_sample_rows()
+    headers = list(head[-1])
+    repeats = -(-n_rows // len(data))
+    values = np.array(data * repeats, dtype=object)[:n_rows]
+    return pd.DataFrame(values, columns=headers, dtype=object)
+
+
+def per_column(df_data, plan):
+    """이전 방식: 항목마다 pd.to_numeric(...).sum()"""
+    return {key: 0 if position is None else pd.to_numeric(df_data.iloc[:, position], errors='coerce').sum()
+            for key, position in plan.positions.items()}
+
+
+def vectorized(df_data, plan):
+    """현재 방식: 숫자 블록 한 번 변환 후 단일 합계"""
+    return extract_all_columns(df_data, plan)
+
+
+def best_of(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    print(f"{'행 수':>10}{'per-column(초)':>16}{'vectorized(초)':>16}{'speedup':>10}")
+    for n_rows in sizes:
+        df_data = make_frame(n_rows)
+        plan = build_column_plan(df_data.columns)
+        assert per_column(df_data, plan) == vectorized(df_data, plan)
+        repeat = 5 if n_rows < 1_000_000 else 3
+        old = best_of(per_column, df_data, plan, repeat=repeat)
+        new = best_of(vectorized, df_data, plan, repeat=repeat)
+        print(f"{n_rows:>10,}{old:>16.4f}{new:>16.4f}{old / new:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 합성 정산 파일 생성 모듈
+
+번들된 data.xlsx의 프리앰블/헤더를 그대로 쓰고, 데이터 행을 반복하여
+원하는 행 수의 대용량 파일을 만든다.
+"""
+import os
+import sys
+from itertools import cycle, islice
+
+import numpy as np
+from openpyxl import Workbook, load_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_FILE = os.path.join(ROOT, 'data.xlsx')
+HEADER_ROW = 4
+
+
+def read_sample_rows(sample_file=SAMPLE_FILE):
+    """샘플 파일의 (프리앰블+헤더 행, 데이터 행) 반환"""
+    wb = load_workbook(sample_file, read_only=True, data_only=True)
+    ws = wb.worksheets[0]
+    ws.reset_dimensions()
+    rows = [tuple(row) for row in ws.iter_rows(values_only=True)]
+    wb.close()
+    return rows[:HEADER_ROW + 1], rows[HEADER_ROW + 1:]
+
+
+def write_synthetic_xlsx(path, n_rows, sample_file=SAMPLE_FILE):
+    """n_rows개의 데이터 행을 가진 합성 xlsx 파일 생성"""
+    head, data = read_sample_rows(sample_file)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    for row in head:
+        ws.append(row)
+    for row in islice(cycle(data), n_rows):
+        ws.append(row)
+    wb.save(path)
+    return path
+
+
+def synthetic_path(n_rows, directory=None):
+    """캐시된 합성 파일 경로 반환 (없으면 생성)"""
+    directory = directory or os.path.join(ROOT, 'benchmarks', '.data')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'synthetic_{n_rows}.xlsx')
+    if not os.path.exists(path):
+        print(f"합성 파일 생성 중: {n_rows:,}행 → {path}")
+        write_synthetic_xlsx(path, n_rows)
+    return path
+
+
+def synthetic_records(n_records, seed=0):
+    """
+    n_records개의 레코드 항목별 합계(column_data) 목록
+
+    샘플 파일의 정수 원 단위 항목별 합계에 레코드·항목마다 다른 정수 배율(1~19)을 곱한다.
+    """
+    from calculator import ITEM_KEYS
+    from data_extractor import load_column_data
+
+    _, column_data = load_column_data(SAMPLE_FILE, integer=True)
+    base = np.array([int(column_data[key]) for key in ITEM_KEYS], dtype=np.int64)
+    scales = np.random.default_rng(seed).integers(1, 20, size=(n_records, len(ITEM_KEYS)))
+    return [dict(zip(ITEM_KEYS, row.tolist())) for row in base * scales]
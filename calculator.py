@@ -1,69 +1,160 @@
 #!/usr/bin/env python3
 """
 손익계산서 계산 로직 모듈
+
+합계 항목은 FORMULAS에 선언적으로 정의한다. 레코드 하나는 calculate_totals()로,
+여러 레코드는 N × 26 행렬을 받는 calculate_totals_batch()로 한 번에 계산하며,
+두 경로 모두 같은 정의를 같은 덧셈 순서로 평가하므로 결과가 같다.
 """
+import numpy as np
 
 
-def calculate_totals(data):
-    """
-    추출된 데이터로부터 모든 합계 계산
-    
-    Args:
-        data: extract_all_columns()에서 반환된 딕셔너리
-    
-    Returns:
-        계산된 모든 합계를 포함하는 딕셔너리
-    """
+# 추출 항목 (행렬의 열 순서)
+ITEM_KEYS = ['f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r',
+             's', 't', 'u', 'v', 'w', 'x', 'y', 'z', 'aa', 'ab', 'ac', 'ad', 'ae']
+
+# 합계 이름 → 더할 항목 목록 (추출 항목 또는 앞에서 정의한 합계, 왼쪽부터 차례로 더함)
+FORMULAS = {
     # 중개이용료 합계
-    jungae_total = data['h'] + data['i'] + data['j'] + data['k']
-    
+    'jungae_total': ['h', 'i', 'j', 'k'],
     # 고객할인 합계
-    gohak_total = data['l'] + data['m']
-    
+    'gohak_total': ['l', 'm'],
     # 주문중개 합계
-    jumun_jungae_total = data['f'] + data['g'] + jungae_total + gohak_total
-    
+    'jumun_jungae_total': ['f', 'g', 'jungae_total', 'gohak_total'],
     # 배달비 합계
-    baedalbi_total = (data['n'] + data['o'] + data['p'] + data['q'] + 
-                      data['r'] + data['s'] + data['t'] + data['u'] + 
-                      data['v'] + data['w'])
-    
+    'baedalbi_total': ['n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w'],
     # 결제정산수수료 합계
-    gyeoljae_total = data['x'] + data['y'] + data['z'] + data['aa']
-    
+    'gyeoljae_total': ['x', 'y', 'z', 'aa'],
     # 우리가게클릭 합계
-    urigagae_total = data['ad'] + data['ae']
-    
+    'urigagae_total': ['ad', 'ae'],
     # 입금금액
-    ipgeum_total = (jumun_jungae_total + baedalbi_total + gyeoljae_total + 
-                    data['ab'] + data['ac'] + urigagae_total)
-    
+    'ipgeum_total': ['jumun_jungae_total', 'baedalbi_total', 'gyeoljae_total',
+                     'ab', 'ac', 'urigagae_total'],
     # 총매출
-    total_maechul = data['f'] + data['g'] + data['n'] + data['o']
-    
+    'total_maechul': ['f', 'g', 'n', 'o'],
     # 매출원가
-    maechul_wonka = (data['h'] + data['i'] + data['j'] + data['k'] +
-                     data['l'] + data['m'] +
-                     data['p'] + data['q'] + data['r'] + data['s'] +
-                     data['t'] + data['u'] + data['v'] + data['w'] +
-                     data['x'] + data['y'] +
-                     data['ab'] +
-                     data['ac'] +
-                     data['ad'] + data['ae'])
-    
+    'maechul_wonka': ['h', 'i', 'j', 'k', 'l', 'm',
+                      'p', 'q', 'r', 's', 't', 'u', 'v', 'w',
+                      'x', 'y', 'ab', 'ac', 'ad', 'ae'],
     # 매출총이익
-    maechul_total_iik = total_maechul + maechul_wonka
-    
-    return {
-        'data': data,
-        'jungae_total': jungae_total,
-        'gohak_total': gohak_total,
-        'jumun_jungae_total': jumun_jungae_total,
-        'baedalbi_total': baedalbi_total,
-        'gyeoljae_total': gyeoljae_total,
-        'urigagae_total': urigagae_total,
-        'ipgeum_total': ipgeum_total,
-        'total_maechul': total_maechul,
-        'maechul_wonka': maechul_wonka,
-        'maechul_total_iik': maechul_total_iik
-    }
+    'maechul_total_iik': ['total_maechul', 'maechul_wonka'],
+}
+
+
+def compile_formulas(formulas=FORMULAS, items=ITEM_KEYS):
+    """
+    합계 정의를 평가 순서대로 정리하고 항 이름을 검증
+
+    Returns:
+        [(합계 이름, [(종류, 참조), ...]), ...] - 종류는 'item'(행렬 열 번호) 또는
+        'total'(앞에서 계산한 합계 이름)
+    """
+    columns = {key: idx for idx, key in enumerate(items)}
+    compiled = []
+    defined = set()
+    for name, terms in formulas.items():
+        if not terms:
+            raise ValueError(f"'{name}' 합계에 더할 항목이 없습니다")
+        steps = []
+        for term in terms:
+            if term in defined:
+                steps.append(('total', term))
+            elif term in columns:
+                steps.append(('item', columns[term]))
+            else:
+                raise ValueError(f"'{name}' 합계의 '{term}' 항목을 찾을 수 없습니다 (합계는 먼저 정의해야 합니다)")
+        compiled.append((name, steps))
+        defined.add(name)
+    return compiled
+
+
+def max_item_weight(compiled):
+    """합계 하나를 추출 항목으로 펼쳤을 때 같은 항목이 더해지는 최대 횟수"""
+    weights = {}
+    max_weight = 1
+    for name, steps in compiled:
+        counts = {}
+        for kind, ref in steps:
+            for item, count in (weights[ref].items() if kind == 'total' else [(ref, 1)]):
+                counts[item] = counts.get(item, 0) + count
+        weights[name] = counts
+        max_weight = max(max_weight, *counts.values())
+    return max_weight
+
+
+COMPILED_FORMULAS = compile_formulas()
+MAX_ITEM_WEIGHT = max_item_weight(COMPILED_FORMULAS)
+
+# int64 합계 계산의 안전 한도 (float로 어림한 상한에 2배 여유)
+INT64_SAFE_BOUND = 2 ** 62
+
+
+def check_integer_range(data):
+    """
+    정수 원 단위 항목으로 합계를 계산하는 동안 int64 범위를 넘을 수 있으면 OverflowError
+
+    모든 중간 합계의 절댓값은 (항목 절댓값의 합 × 최대 중복 횟수)를 넘지 않는다.
+    """
+    values = [data[key] for key in ITEM_KEYS]
+    if not any(isinstance(value, np.integer) for value in values):
+        return
+    if sum(abs(int(value)) for value in values) * MAX_ITEM_WEIGHT > np.iinfo(np.int64).max:
+        raise OverflowError("합계 계산 중 금액이 int64 범위를 넘습니다")
+
+
+def calculate_totals(data):
+    """
+    추출된 데이터로부터 모든 합계 계산
+
+    Args:
+        data: extract_all_columns()에서 반환된 딕셔너리
+
+    Returns:
+        계산된 모든 합계를 포함하는 딕셔너리
+    """
+    check_integer_range(data)
+
+    totals = {}
+    for name, steps in COMPILED_FORMULAS:
+        values = [totals[ref] if kind == 'total' else data[ITEM_KEYS[ref]] for kind, ref in steps]
+        total = values[0]
+        for value in values[1:]:
+            total = total + value
+        totals[name] = total
+
+    return {'data': data, **totals}
+
+
+def calculate_totals_batch(matrix):
+    """
+    여러 레코드의 합계를 한 번에 계산
+
+    Args:
+        matrix: N × 26 배열 (열 순서는 ITEM_KEYS)
+
+    Returns:
+        합계 이름 → 길이 N 배열 딕셔너리 (i번째 값은 i번째 행을 calculate_totals()로
+        계산한 값과 같음)
+    """
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[1] != len(ITEM_KEYS):
+        raise ValueError(f"행렬은 N × {len(ITEM_KEYS)} 형태여야 합니다: {matrix.shape}")
+    if matrix.dtype.kind == 'i' and len(matrix):
+        bound = np.abs(matrix.astype(np.float64)).sum(axis=1) * MAX_ITEM_WEIGHT
+        if (bound >= INT64_SAFE_BOUND).any():
+            raise OverflowError("합계 계산 중 금액이 int64 범위를 넘습니다")
+
+    totals = {}
+    for name, steps in COMPILED_FORMULAS:
+        columns = [totals[ref] if kind == 'total' else matrix[:, ref] for kind, ref in steps]
+        total = columns[0].copy()
+        for column in columns[1:]:
+            total += column
+        totals[name] = total
+    return totals
+
+
+def column_matrix(records, dtype=np.float64):
+    """column_data 딕셔너리 목록을 N × 26 행렬로 변환 (없는 항목은 0)"""
+    rows = [[data.get(key, 0) for key in ITEM_KEYS] for data in records]
+    return np.array(rows, dtype=dtype).reshape(len(rows), len(ITEM_KEYS))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+헤더 지문 기반 컬럼 매핑 캐시 모듈
+
+같은 플랫폼에서 내려받은 파일은 헤더 행이 같으므로, 헤더 행의 지문(fingerprint)을
+키로 해석된 컬럼 위치를 JSON 파일에 저장해 두고 다음 업로드/실행에서 재사용한다.
+웹(data_extractor)과 CLI(main.py)가 같은 캐시 파일을 공유한다.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+IS_VERCEL = os.getenv('VERCEL') == '1' or os.getenv('VERCEL_ENV') is not None
+
+# Vercel에서는 /tmp만 쓰기 가능. 그 외에는 실행 위치와 관계없이 모듈 옆의 파일 사용
+DEFAULT_CACHE_PATH = ('/tmp/column_cache.json' if IS_VERCEL
+                      else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'column_cache.json'))
+CACHE_PATH = os.getenv('COLUMN_CACHE_PATH', DEFAULT_CACHE_PATH)
+MAX_ENTRIES = int(os.getenv('COLUMN_CACHE_SIZE', 64))
+
+
+def _header_key(header):
+    """JSON으로 저장 가능한 헤더 값 (문자열이 아닌 빈 셀 등은 None)"""
+    return header if isinstance(header, str) else None
+
+
+def header_fingerprint(headers, namespace=''):
+    """헤더 행 지문 (namespace에는 항목 정의 버전 등을 넣어 정의가 바뀌면 키도 바뀌게 함)"""
+    payload = json.dumps([namespace, [_header_key(h) for h in headers]], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ColumnCache:
+    """
+    크기 제한이 있는 LRU 컬럼 매핑 캐시
+
+    항목: 지문 → {'headers', 'positions', 'ambiguous', 'confirmed'}
+    confirmed는 CLI에서 사용자가 직접 확인/선택한 매핑인지 여부
+    파일의 항목 순서가 최근 사용 순서이므로, 조회로 순서가 바뀌면 파일에도 저장하여
+    다른 프로세스와 다시 읽은 뒤에도 사용 순서가 유지된다.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _reload_if_changed(self):
+        """다른 프로세스가 파일을 갱신했으면 다시 읽기"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+            self._entries = OrderedDict(entries)
+            self._mtime = mtime
+        except (OSError, ValueError) as e:
+            print(f"컬럼 캐시 읽기 오류 (무시됨): {e}")
+
+    def _save(self):
+        """임시 파일에 쓴 뒤 교체하여 다른 워커가 반쯤 쓰인 파일을 읽지 않게 함"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            print(f"컬럼 캐시 저장 오류 (무시됨): {e}")
+
+    def get(self, headers, namespace=''):
+        """캐시된 항목의 복사본 반환 (없으면 None, 호출한 쪽이 고쳐도 캐시는 바뀌지 않음)"""
+        key = header_fingerprint(headers, namespace)
+        with self._lock:
+            self._reload_if_changed()
+            entry = self._entries.get(key)
+            if entry is None or entry['headers'] != [_header_key(h) for h in headers]:
+                return None
+            if next(reversed(self._entries)) != key:
+                # 가장 최근 항목이 아닐 때만 순서를 바꿔 저장 (같은 헤더가 이어지면 쓰지 않음)
+                self._entries.move_to_end(key)
+                self._save()
+            return {
+                'headers': list(entry['headers']),
+                'positions': dict(entry['positions']),
+                'ambiguous': {name: list(candidates) for name, candidates in entry['ambiguous'].items()},
+                'confirmed': entry['confirmed'],
+            }
+
+    def put(self, headers, positions, namespace='', ambiguous=None, confirmed=False):
+        """매핑 저장 (크기를 넘으면 가장 오래 사용하지 않은 항목부터 제거)"""
+        key = header_fingerprint(headers, namespace)
+        with self._lock:
+            self._reload_if_changed()
+            self._entries[key] = {
+                'headers': [_header_key(h) for h in headers],
+                'positions': dict(positions),
+                'ambiguous': dict(ambiguous or {}),
+                'confirmed': confirmed,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+
+# 프로세스 공용 캐시
+column_cache = ColumnCache()
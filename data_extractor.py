@@ -2,54 +2,200 @@
 """
 Excel 데이터 추출 모듈
 """
+import hashlib
+import json
+import os
+import re
+from datetime import date
+from itertools import islice
+
+import numpy as np
 import pandas as pd
+from column_cache import column_cache, header_fingerprint
+from readers import (iter_sheet_rows, file_format, detect_csv_encoding,
+                     read_csv_head, import_parquet, open_text, rewind)
+
+
+# 시트 레이아웃: 0~3행은 프리앰블(거래기간 등), 4행은 헤더, 5행부터 데이터
+HEADER_ROW = 4
+
+# 손익계산서 항목 키 → 가능한 컬럼명 목록 (앞의 이름일수록 우선)
+COLUMN_SPECS = {
+    'f': ['바로결제주문금액', '바로결제 주문금액', '직접결제주문금액'],
+    'g': ['만나서결제주문금액', '만나서결제 주문금액', '현장결제주문금액'],
+    'h': ['배민1중개이용료', '배민1 중개이용료', '배민 1 중개이용료'],
+    'i': ['알뜰배달 중개이용료', '알뜰배달중개이용료'],
+    'j': ['오픈리스트중개이용료', '오픈리스트 중개이용료'],
+    'k': ['배민포장주문중개이용료', '배민포장 주문중개이용료', '포장주문중개이용료'],
+    'l': ['주문금액 즉시할인', '주문금액즉시할인', '즉시할인'],
+    'm': ['주문금액 즉시할인 지원', '주문금액즉시할인지원', '즉시할인지원'],
+    'n': ['바로결제배달팁', '바로결제 배달팁', '직접결제배달팁'],
+    'o': ['만나서결제배달팁', '만나서결제 배달팁', '현장결제배달팁'],
+    'p': ['배민클럽(한집배달) 배달팁 할인', '배민클럽한집배달배달팁할인'],
+    'q': ['배민클럽(한집배달) 배달팁 할인 지원', '배민클럽한집배달배달팁할인지원'],
+    'r': ['배민클럽(알뜰배달) 배달팁 할인', '배민클럽알뜰배달배달팁할인'],
+    's': ['배민클럽(알뜰배달) 배달팁 할인 지원', '배민클럽알뜰배달배달팁할인지원'],
+    't': ['배민1 한집배달 배달비', '배민1한집배달배달비'],
+    'u': ['배민1 한집배달 배달비할인', '배민1한집배달배달비할인'],
+    'v': ['알뜰배달 배달비', '알뜰배달배달비'],
+    'w': ['알뜰배달 배달비할인', '알뜰배달배달비할인'],
+    'x': ['기본수수료(정률)', '기본수수료', '정률수수료'],
+    'y': ['우대수수료', '할인수수료'],
+    'z': ['배민 만나서결제주문금액', '배민만나서결제주문금액'],
+    'aa': ['배민 만나서결제배달팁', '배민만나서결제배달팁'],
+    'ab': ['보정금액', '조정금액'],
+    'ac': ['(E) 부가세', 'E부가세', '부가세E'],
+    'ad': ['우리가게클릭 이용요금', '우리가게클릭이용요금'],
+    'ae': ['부가세', '부가세F'],
+}
+
+# 행별 거래일 컬럼 후보 (프리앰블에 거래기간이 없을 때 기간 추정에 사용)
+DATE_COLUMNS = ['정산대상기간', '거래일', '거래일자', '주문일', '주문일시']
+
+# 정산 내역 시트로 인정할 최소 일치 컬럼 수 (손익계산서 등 다른 시트 제외용)
+MIN_HEADER_MATCHES = 5
+
+# CSV 헤더 행을 찾을 때 살펴볼 앞쪽 행 수, 한 번에 읽을 행 수
+CSV_HEADER_SCAN_ROWS = 20
+CSV_CHUNK_ROWS = int(os.getenv('CSV_CHUNK_ROWS', 100_000))
+
+# 스트리밍 모드에서 거래일별 합계를 한 번에 집계할 행 수
+CUBE_CHUNK_ROWS = 10_000
+
+# 정수 원 단위 모드 기본값 (금액을 float 대신 int64로 읽고 계산)
+INTEGER_WON = os.getenv('INTEGER_WON', '0') == '1'
+INT64_MAX = np.iinfo(np.int64).max
+
+# 항목 정의 버전 (정의가 바뀌면 캐시된 컬럼 매핑을 쓰지 않음)
+SPECS_VERSION = hashlib.sha256(json.dumps(COLUMN_SPECS, ensure_ascii=False).encode('utf-8')).hexdigest()[:12]
+
+
+class ParsedWorkbook:
+    """
+    한 번 파싱한 Excel 시트
+
+    파이프라인의 모든 단계(거래기간 추출, 컬럼 추출)가 같은 객체를 재사용하여
+    파일을 한 번만 읽도록 한다.
+    """
+
+    def __init__(self, df_raw, header_row=HEADER_ROW, period_hint=None):
+        self.raw = df_raw
+        self.header_row = header_row
+        self.preamble = df_raw.iloc[:header_row + 1]
+        self.headers = df_raw.iloc[header_row].tolist() if len(df_raw) > header_row else []
+        # 프리앰블에 거래기간이 없을 때 사용할 기간 (CSV/Parquet의 거래일 범위 등)
+        self.period_hint = period_hint
+        # 거래일별 항목 합계 (load_column_data에서 채움, DailyCube.to_dict() 형식)
+        self.daily_cube = None
+        # 증분 처리 상태 (load_column_data_incremental에서 채움)
+        self.ingest_state = None
+        self._data = None
+        self._plan = None
+
+    @property
+    def column_plan(self):
+        """헤더 행으로 해석한 ColumnPlan (처음 접근할 때 한 번만 생성)"""
+        if self._plan is None:
+            self._plan = resolve_column_plan(self.headers)
+        return self._plan
+
+    @property
+    def data(self):
+        """헤더가 적용된 데이터 프레임 (처음 접근할 때 한 번만 생성)"""
+        if self._data is None:
+            if len(self.raw) <= self.header_row:
+                # 헤더 행까지도 없는 시트
+                self._data = pd.DataFrame(columns=self.headers, dtype=object)
+            else:
+                df_data = self.raw.iloc[self.header_row + 1:].copy()
+                df_data.columns = self.headers
+                self._data = df_data
+        return self._data
+
+
+def parse_workbook(file_path, backend=None, sheet_index=0):
+    """
+    Excel 파일을 한 번 읽어 ParsedWorkbook 반환
+
+    Args:
+        file_path: 입력 Excel 파일 경로 또는 버퍼
+        backend: 읽기 백엔드 이름 (없으면 readers.select_backend()가 자동 선택)
+        sheet_index: 읽을 시트 번호
+    """
+    rows = list(iter_sheet_rows(file_path, sheet_index, backend))
+    return ParsedWorkbook(pd.DataFrame(rows, dtype=object))
+
+
+def _as_workbook(source):
+    """파일 경로 또는 ParsedWorkbook을 ParsedWorkbook으로 변환"""
+    if isinstance(source, ParsedWorkbook):
+        return source
+    return parse_workbook(source)
 
 
-def read_excel_data(file_path):
-    """Excel 파일에서 데이터 읽기"""
-    df_raw = pd.read_excel(file_path, sheet_name=0, header=None)
-    headers = df_raw.iloc[4].tolist()
-    df_data = df_raw.iloc[5:].copy()
-    df_data.columns = headers
-    return df_data
+def read_excel_data(source):
+    """Excel 파일(또는 파싱된 워크북)에서 데이터 읽기"""
+    return _as_workbook(source).data
 
 
-def extract_transaction_period(file_path):
-    """Excel 파일에서 거래기간 추출"""
+def find_preamble_period(preamble):
+    """프리앰블(헤더 행까지의 데이터 프레임)에서 거래기간 문자열 찾기 (없으면 None)"""
+    # 첫 5행에서 거래기간 찾기
+    for row_idx in range(len(preamble)):
+        row = preamble.iloc[row_idx]
+        for cell in row:
+            if pd.notna(cell):
+                cell_str = str(cell).strip()
+                # 거래기간 패턴 찾기
+                if '거래기간' in cell_str:
+                    # "거래기간: 2024.01.01 ~ 2024.01.31" 형식
+                    period = cell_str.replace('거래기간:', '').replace('거래기간', '').strip()
+                    if period:
+                        return period
+                # 날짜 범위 패턴 (YYYY.MM.DD ~ YYYY.MM.DD 또는 YYYY-MM-DD ~ YYYY-MM-DD)
+                elif '~' in cell_str and (cell_str.count('.') >= 4 or cell_str.count('-') >= 4):
+                    return cell_str
+                # 날짜 범위 패턴 (YYYY.MM.DD-YYYY.MM.DD)
+                elif '-' in cell_str and cell_str.count('.') >= 4:
+                    parts = cell_str.split('-')
+                    if len(parts) == 2 and '.' in parts[0] and '.' in parts[1]:
+                        return f"{parts[0].strip()} ~ {parts[1].strip()}"
+    return None
+
+
+def extract_transaction_period(source):
+    """Excel 파일(또는 파싱된 워크북)에서 거래기간 추출"""
     try:
-        df_raw = pd.read_excel(file_path, sheet_name=0, header=None)
-        
-        # 첫 5행에서 거래기간 찾기
-        for row_idx in range(min(5, len(df_raw))):
-            row = df_raw.iloc[row_idx]
-            for cell in row:
-                if pd.notna(cell):
-                    cell_str = str(cell).strip()
-                    # 거래기간 패턴 찾기
-                    if '거래기간' in cell_str:
-                        # "거래기간: 2024.01.01 ~ 2024.01.31" 형식
-                        period = cell_str.replace('거래기간:', '').replace('거래기간', '').strip()
-                        if period:
-                            return period
-                    # 날짜 범위 패턴 (YYYY.MM.DD ~ YYYY.MM.DD 또는 YYYY-MM-DD ~ YYYY-MM-DD)
-                    elif '~' in cell_str and (cell_str.count('.') >= 4 or cell_str.count('-') >= 4):
-                        return cell_str
-                    # 날짜 범위 패턴 (YYYY.MM.DD-YYYY.MM.DD)
-                    elif '-' in cell_str and cell_str.count('.') >= 4:
-                        parts = cell_str.split('-')
-                        if len(parts) == 2 and '.' in parts[0] and '.' in parts[1]:
-                            return f"{parts[0].strip()} ~ {parts[1].strip()}"
-        
-        # 못 찾은 경우 None 반환
+        workbook = _as_workbook(source)
+        # 못 찾은 경우 거래일 범위 등으로 추정한 기간 (없으면 None) 반환
+        return find_preamble_period(workbook.preamble) or workbook.period_hint
+    except Exception as e:
+        print(f"거래기간 추출 오류: {e}")
         return None
+
+
+def read_preamble_period(file_path, backend=None, sheet_index=0):
+    """
+    xlsx의 앞부분(헤더 행까지)만 읽어 거래기간 추출 (없으면 None)
+
+    데이터 행은 읽지 않으므로 변환 전에 거래기간만 필요할 때(작업 모드의 증분 처리 상태 조회) 쓴다.
+    """
+    rows = iter_sheet_rows(file_path, sheet_index, backend)
+    try:
+        head = list(islice(rows, HEADER_ROW + 1))
     except Exception as e:
         print(f"거래기간 추출 오류: {e}")
         return None
+    finally:
+        rows.close()
+    return find_preamble_period(ParsedWorkbook(pd.DataFrame(head, dtype=object)).preamble)
 
 
 def get_column_sum(df, column_names):
     """
     여러 가능한 컬럼명 중 하나를 찾아서 합계 반환
+
+    항목 하나만 찾을 때 사용한다. 여러 항목은 build_column_plan()으로 한 번에 해석한다.
     """
     if isinstance(column_names, str):
         column_names = [column_names]
@@ -60,38 +206,751 @@ def get_column_sum(df, column_names):
 
         for df_col in df.columns:
             if isinstance(df_col, str) and isinstance(col_name, str):
-                if col_name.replace(' ', '').replace('(', '').replace(')', '') in df_col.replace(' ', '').replace('(', '').replace(')', ''):
+                if normalize_header(col_name) in normalize_header(df_col):
                     return pd.to_numeric(df[df_col], errors='coerce').sum()
     return 0
 
 
-def extract_all_columns(df_data):
-    """모든 필요한 컬럼 데이터 추출"""
-    return {
-        'f': get_column_sum(df_data, ['바로결제주문금액', '바로결제 주문금액', '직접결제주문금액']),
-        'g': get_column_sum(df_data, ['만나서결제주문금액', '만나서결제 주문금액', '현장결제주문금액']),
-        'h': get_column_sum(df_data, ['배민1중개이용료', '배민1 중개이용료', '배민 1 중개이용료']),
-        'i': get_column_sum(df_data, ['알뜰배달 중개이용료', '알뜰배달중개이용료']),
-        'j': get_column_sum(df_data, ['오픈리스트중개이용료', '오픈리스트 중개이용료']),
-        'k': get_column_sum(df_data, ['배민포장주문중개이용료', '배민포장 주문중개이용료', '포장주문중개이용료']),
-        'l': get_column_sum(df_data, ['주문금액 즉시할인', '주문금액즉시할인', '즉시할인']),
-        'm': get_column_sum(df_data, ['주문금액 즉시할인 지원', '주문금액즉시할인지원', '즉시할인지원']),
-        'n': get_column_sum(df_data, ['바로결제배달팁', '바로결제 배달팁', '직접결제배달팁']),
-        'o': get_column_sum(df_data, ['만나서결제배달팁', '만나서결제 배달팁', '현장결제배달팁']),
-        'p': get_column_sum(df_data, ['배민클럽(한집배달) 배달팁 할인', '배민클럽한집배달배달팁할인']),
-        'q': get_column_sum(df_data, ['배민클럽(한집배달) 배달팁 할인 지원', '배민클럽한집배달배달팁할인지원']),
-        'r': get_column_sum(df_data, ['배민클럽(알뜰배달) 배달팁 할인', '배민클럽알뜰배달배달팁할인']),
-        's': get_column_sum(df_data, ['배민클럽(알뜰배달) 배달팁 할인 지원', '배민클럽알뜰배달배달팁할인지원']),
-        't': get_column_sum(df_data, ['배민1 한집배달 배달비', '배민1한집배달배달비']),
-        'u': get_column_sum(df_data, ['배민1 한집배달 배달비할인', '배민1한집배달배달비할인']),
-        'v': get_column_sum(df_data, ['알뜰배달 배달비', '알뜰배달배달비']),
-        'w': get_column_sum(df_data, ['알뜰배달 배달비할인', '알뜰배달배달비할인']),
-        'x': get_column_sum(df_data, ['기본수수료(정률)', '기본수수료', '정률수수료']),
-        'y': get_column_sum(df_data, ['우대수수료', '할인수수료']),
-        'z': get_column_sum(df_data, ['배민 만나서결제주문금액', '배민만나서결제주문금액']),
-        'aa': get_column_sum(df_data, ['배민 만나서결제배달팁', '배민만나서결제배달팁']),
-        'ab': get_column_sum(df_data, ['보정금액', '조정금액']),
-        'ac': get_column_sum(df_data, ['(E) 부가세', 'E부가세', '부가세E']),
-        'ad': get_column_sum(df_data, ['우리가게클릭 이용요금', '우리가게클릭이용요금']),
-        'ae': get_column_sum(df_data, ['부가세', '부가세F'])
+def extract_all_columns(df_data, plan=None, cube=None, integer=False):
+    """
+    모든 필요한 컬럼 데이터 추출
+
+    Args:
+        df_data: 헤더가 적용된 데이터 프레임
+        plan: build_column_plan()의 결과 (없으면 df_data의 컬럼으로 생성)
+        cube: 같은 숫자 블록으로 거래일별 합계도 누적할 DailyCube (선택)
+        integer: True이면 금액을 int64로 읽어 정확한 정수 합계 계산
+    """
+    if plan is None:
+        plan = resolve_column_plan(df_data.columns)
+
+    positions = plan.used_positions()
+    dates = None
+    if cube is not None:
+        date_position = find_date_column(df_data.columns)
+        dates = None if date_position is None else df_data.iloc[:, date_position]
+    sums = dict(zip(positions, _sum_block(df_data, positions, cube, dates, integer)))
+    return {key: 0 if position is None else sums[position]
+            for key, position in plan.positions.items()}
+
+
+def numeric_block(df_data, positions):
+    """
+    지정한 위치의 컬럼들을 연속된 2차원 float64 배열(행 × 컬럼)로 변환
+
+    숫자로 바꿀 수 없는 셀이 섞여 있으면 컬럼별로 pd.to_numeric(errors='coerce')를
+    적용하여 NaN으로 처리한다.
+
+    Returns:
+        (block, integral) - integral은 컬럼별로 빈 셀 없이 정수 값만 있는지 여부
+        (만든 블록에서 한 번에 판별, 합계를 int64로 돌려줄 컬럼)
+    """
+    values = df_data.iloc[:, positions].to_numpy()
+    try:
+        block = values.astype(np.float64)
+    except (TypeError, ValueError):
+        block = np.empty((len(df_data), len(positions)), dtype=np.float64)
+        for idx, position in enumerate(positions):
+            block[:, idx] = pd.to_numeric(df_data.iloc[:, position], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    # NaN(빈 셀)은 자기 자신과 같지 않으므로 여기서 함께 걸러짐
+    integral = (block == np.trunc(block)).all(axis=0)
+    return block, integral
+
+
+def integer_block(df_data, positions):
+    """
+    지정한 위치의 컬럼들을 2차원 int64 배열(행 × 컬럼)로 변환 (정수 원 단위 모드)
+
+    모든 셀이 정수이면 float를 거치지 않고 블록 전체를 한 번에 int64로 바꾼다.
+    그렇지 않은 컬럼만 따로 변환한다. 정수와 빈 셀만 있는 컬럼은 nullable Int64로 읽어
+    빈 셀을 0으로(합계에서 제외하는 것과 같음) 채우고, 문자열 등이 섞인 컬럼만 숫자로
+    변환한다. 원 단위가 아닌 금액이나 int64 범위를 넘는 금액이 있으면 오류를 낸다.
+    """
+    values = df_data.iloc[:, positions].to_numpy()
+    if values.dtype.kind == 'i' or all(pd.api.types.infer_dtype(values[:, idx], skipna=False) == 'integer'
+                                       for idx in range(len(positions))):
+        try:
+            return values.astype(np.int64)
+        except OverflowError:
+            pass
+
+    block = np.empty((len(df_data), len(positions)), dtype=np.int64)
+    for idx, position in enumerate(positions):
+        column = df_data.iloc[:, position]
+        try:
+            if pd.api.types.is_integer_dtype(column) or pd.api.types.infer_dtype(column, skipna=False) == 'integer':
+                block[:, idx] = column.to_numpy(dtype=np.int64)
+                continue
+            # 정수와 빈 셀만 있는 컬럼은 nullable Int64로 바로 읽어 float를 거치지 않음
+            try:
+                block[:, idx] = column.astype('Int64').fillna(0).to_numpy(dtype=np.int64)
+                continue
+            except (TypeError, ValueError):
+                pass
+            values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        except OverflowError:
+            raise OverflowError(f"'{df_data.columns[position]}' 컬럼에 int64 범위를 넘는 금액이 있습니다")
+        values = np.nan_to_num(values)
+        if not np.array_equal(values, np.round(values)):
+            raise ValueError(f"'{df_data.columns[position]}' 컬럼에 원 단위가 아닌 금액이 있습니다 (INTEGER_WON=0으로 처리하세요)")
+        if np.abs(values).max(initial=0) >= 2 ** 63:
+            raise OverflowError(f"'{df_data.columns[position]}' 컬럼에 int64 범위를 넘는 금액이 있습니다")
+        block[:, idx] = values.astype(np.int64)
+    return block
+
+
+def integer_sums(block):
+    """
+    int64 블록의 컬럼별 합계 (합계가 int64 범위를 넘으면 OverflowError)
+
+    최대 절댓값 × 행 수가 int64 범위 안이면 NumPy 합계가 넘칠 수 없으므로 그대로
+    계산하고, 아니면 파이썬 정수로 정확히 합산하여 범위를 확인한다.
+    """
+    if len(block) == 0:
+        return np.zeros(block.shape[1], dtype=np.int64)
+    bound = np.abs(block.astype(np.float64)).max(axis=0) * len(block)
+    if (bound < 2 ** 62).all():
+        return block.sum(axis=0)
+    exact = [sum(column.tolist()) for column in block.T]
+    if any(abs(total) > INT64_MAX for total in exact):
+        raise OverflowError("금액 합계가 int64 범위를 넘습니다")
+    return np.array(exact, dtype=np.int64)
+
+
+def add_integer_sums(totals, sums):
+    """int64 합계 배열 덧셈 (부호 비트로 넘침을 확인)"""
+    result = totals + sums
+    if (((totals ^ result) & (sums ^ result)) < 0).any():
+        raise OverflowError("금액 합계가 int64 범위를 넘습니다")
+    return result
+
+
+def normalize_header(name):
+    """컬럼명 비교용 정규화 (공백, 괄호 제거)"""
+    return name.replace(' ', '').replace('(', '').replace(')', '')
+
+
+class ColumnPlan:
+    """
+    헤더 행에서 해석한 항목별 컬럼 위치
+
+    positions: 항목 키 → 컬럼 위치 (찾지 못하면 None)
+    ambiguous: 항목 키 → 부분 일치한 후보 컬럼명 목록 (후보가 여러 개였던 항목만)
+    confirmed: 사용자가 CLI에서 직접 확인한 매핑인지 여부
+    """
+
+    def __init__(self, headers, positions, ambiguous=None, confirmed=False):
+        self.headers = list(headers)
+        self.positions = positions
+        self.ambiguous = ambiguous or {}
+        self.confirmed = confirmed
+
+    def column_name(self, key):
+        position = self.positions.get(key)
+        return None if position is None else self.headers[position]
+
+    def used_positions(self):
+        """합계가 필요한 컬럼 위치 (중복 제거, 순서 유지)"""
+        return list(dict.fromkeys(p for p in self.positions.values() if p is not None))
+
+
+def build_column_plan(headers, specs=None):
+    """
+    헤더 행을 한 번 정규화하여 모든 항목의 컬럼 위치를 해석
+
+    1단계에서 각 항목의 후보명과 정확히(또는 정규화 후) 일치하는 컬럼을 먼저 배정하고,
+    2단계에서 남은 항목만 부분 일치로 찾는다. 이미 다른 항목에 배정된 컬럼은
+    부분 일치 대상에서 제외하므로 '부가세'가 '(E) 부가세'에 잘못 매칭되지 않는다.
+    부분 일치 후보가 여럿이면 정규화 길이가 가장 짧은 컬럼, 그다음 앞쪽 컬럼을 고른다.
+    """
+    specs = specs or COLUMN_SPECS
+    headers = list(headers)
+
+    exact_index = {}
+    normalized_index = {}
+    normalized = []
+    for position, header in enumerate(headers):
+        if not isinstance(header, str):
+            continue
+        norm = normalize_header(header)
+        exact_index.setdefault(header, position)
+        normalized_index.setdefault(norm, position)
+        normalized.append((position, norm))
+
+    positions = {}
+    claimed = set()
+
+    # 1단계: 정확 일치
+    for key, column_names in specs.items():
+        positions[key] = None
+        for col_name in column_names:
+            position = exact_index.get(col_name)
+            if position is None:
+                position = normalized_index.get(normalize_header(col_name))
+            if position is not None and position not in claimed:
+                positions[key] = position
+                claimed.add(position)
+                break
+
+    # 2단계: 부분 일치 (남은 항목만, 배정되지 않은 컬럼 중에서)
+    ambiguous = {}
+    for key, column_names in specs.items():
+        if positions[key] is not None:
+            continue
+        for col_name in column_names:
+            target = normalize_header(col_name)
+            hits = [(len(norm), position) for position, norm in normalized if target in norm]
+            if not hits:
+                continue
+            free = sorted(hit for hit in hits if hit[1] not in claimed)
+            if len(free) != len(hits) or len(hits) > 1:
+                ambiguous[key] = [headers[position] for _, position in sorted(hits, key=lambda hit: hit[1])]
+            if free:
+                positions[key] = free[0][1]
+                claimed.add(free[0][1])
+                break
+
+    return ColumnPlan(headers, positions, ambiguous)
+
+
+def resolve_column_plan(headers, use_cache=True):
+    """
+    헤더 행의 ColumnPlan 반환
+
+    같은 헤더 행을 이전에 해석한 적이 있으면 캐시된 매핑을 그대로 쓰고,
+    처음 보는 헤더 행이면 build_column_plan()으로 해석한 뒤 캐시에 저장한다.
+    """
+    headers = list(headers)
+    if use_cache:
+        entry = column_cache.get(headers, SPECS_VERSION)
+        if entry is not None:
+            return ColumnPlan(headers, entry['positions'], entry['ambiguous'], entry['confirmed'])
+
+    plan = build_column_plan(headers)
+    warn_ambiguous(plan)
+    if use_cache:
+        save_column_plan(plan)
+    return plan
+
+
+def save_column_plan(plan):
+    """ColumnPlan을 헤더 지문 캐시에 저장"""
+    column_cache.put(plan.headers, plan.positions, SPECS_VERSION,
+                     ambiguous=plan.ambiguous, confirmed=plan.confirmed)
+
+
+def warn_ambiguous(plan):
+    """모호한 부분 일치 항목 경고 출력"""
+    for key, candidates in plan.ambiguous.items():
+        chosen = plan.column_name(key)
+        print(f"⚠️  '{key}' 항목의 부분 일치가 모호합니다: {', '.join(map(str, candidates))} → {chosen or '사용 안 함'}")
+
+
+def _to_number(value):
+    """pd.to_numeric(errors='coerce')와 같은 규칙으로 셀 값을 숫자로 변환 (실패 시 None)"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return None if value != value else value
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return int(text)
+        except ValueError:
+            pass
+        try:
+            number = float(text)
+        except ValueError:
+            return None
+        return None if number != number else number
+    return None
+
+
+class _RunningSum:
+    """
+    컬럼 하나의 누적 합계 (정수 값만 있으면 정수, 결측이나 소수가 섞이면 실수)
+
+    1.0처럼 정수 값인 실수는 데이터 프레임 방식(numeric_block)과 같이 정수로 더한다.
+    integer=True(정수 원 단위 모드)이면 결측은 건너뛰고 원 단위가 아닌 금액은 오류를 낸다.
+    """
+
+    def __init__(self, integer=False):
+        self.total = 0
+        self.is_float = False
+        self.integer = integer
+
+    def add(self, value):
+        """값을 더하고 변환된 숫자를 반환 (숫자가 아니면 None)"""
+        number = _to_number(value)
+        if number is None:
+            self.is_float = True
+        else:
+            if isinstance(number, float):
+                if number.is_integer():
+                    number = int(number)
+                elif self.integer:
+                    raise ValueError(f"원 단위가 아닌 금액이 있습니다: {value} (INTEGER_WON=0으로 처리하세요)")
+                else:
+                    self.is_float = True
+            self.total += number
+        return number
+
+    def result(self):
+        if self.integer:
+            if abs(self.total) > INT64_MAX:
+                raise OverflowError("금액 합계가 int64 범위를 넘습니다")
+            return np.int64(self.total)
+        return np.float64(self.total) if self.is_float else np.int64(self.total)
+
+
+def stream_excel_columns(file_path, backend=None, sheet_index=0, integer=False):
+    """
+    Excel 파일을 한 행씩 읽으며 컬럼 합계 계산
+
+    데이터 프레임을 만들지 않으므로 행 수와 관계없이 메모리 사용량이 일정하다.
+
+    Returns:
+        (ParsedWorkbook, column_data) - 워크북에는 프리앰블과 헤더만 담기고,
+        column_data는 extract_all_columns()와 같은 딕셔너리
+    """
+    rows = iter_sheet_rows(file_path, sheet_index, backend)
+    try:
+        head = [list(row) for row in islice(rows, HEADER_ROW + 1)]
+        workbook = ParsedWorkbook(pd.DataFrame(head, dtype=object))
+        plan = workbook.column_plan
+        sums = {position: _RunningSum(integer) for position in plan.used_positions()}
+        date_position = find_date_column(workbook.headers)
+        cube = DailyCube(plan)
+
+        # 거래일별 합계는 CUBE_CHUNK_ROWS 행씩 모아서 한 번에 집계
+        chunk_dates, chunk_values = [], []
+        has_rows = False
+        for row in rows:
+            has_rows = True
+            numbers = [running.add(row[position] if position < len(row) else None)
+                       for position, running in sums.items()]
+            if date_position is not None:
+                chunk_dates.append(row[date_position] if date_position < len(row) else None)
+                chunk_values.append(numbers)
+                if len(chunk_dates) >= CUBE_CHUNK_ROWS:
+                    cube.add(chunk_dates, _number_block(chunk_values, len(sums)))
+                    chunk_dates, chunk_values = [], []
+        if chunk_dates:
+            cube.add(chunk_dates, _number_block(chunk_values, len(sums)))
+    finally:
+        rows.close()
+
+    workbook.daily_cube = cube.to_dict()
+
+    column_data = {}
+    for key, position in plan.positions.items():
+        if position is None:
+            column_data[key] = 0
+        elif not has_rows:
+            column_data[key] = np.int64(0)
+        else:
+            column_data[key] = sums[position].result()
+    return workbook, column_data
+
+
+def count_header_matches(row, specs=None):
+    """행에서 항목 후보명과 정확히(또는 정규화 후) 일치하는 값의 수"""
+    specs = specs or COLUMN_SPECS
+    candidates = {normalize_header(name) for names in specs.values() for name in names}
+    return sum(1 for value in row if isinstance(value, str) and normalize_header(value) in candidates)
+
+
+def is_settlement_sheet(workbook):
+    """정산 내역 시트인지 확인 (헤더 행에 알려진 컬럼명이 충분히 있는지)"""
+    return count_header_matches(workbook.headers) >= MIN_HEADER_MATCHES
+
+
+def find_header_row(rows, specs=None):
+    """
+    앞쪽 행들 중 헤더 행 위치 찾기
+
+    항목 후보명과 정확히(또는 정규화 후) 일치하는 컬럼이 가장 많은 행을 헤더로 본다.
+    프리앰블 없이 첫 행이 바로 헤더인 내보내기 파일과 Excel과 같은 레이아웃을 모두 지원한다.
+    """
+    best_row, best_score = None, 0
+    for row_idx, row in enumerate(rows):
+        score = count_header_matches(row, specs)
+        if score > best_score:
+            best_row, best_score = row_idx, score
+    if best_row is None:
+        raise ValueError("헤더 행을 찾을 수 없습니다. 거래 내역 파일 형식인지 확인하세요.")
+    return best_row
+
+
+def find_date_column(headers):
+    """행별 거래일 컬럼 위치 (없으면 None)"""
+    for name in DATE_COLUMNS:
+        for position, header in enumerate(headers):
+            if isinstance(header, str) and normalize_header(header) == normalize_header(name):
+                return position
+    return None
+
+
+def parse_dates(values):
+    """
+    거래일 값을 (시작일, 종료일) datetime 시리즈로 변환 (해석할 수 없는 값은 NaT)
+
+    값이 '2025-08-11 ~ 2025-08-18'처럼 기간일 수도 있으므로 양 끝을 나눠서 본다.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, values
+    parts = values.astype(str).str.replace(r'[./]', '-', regex=True).str.split('~')
+    starts = pd.to_datetime(parts.str[0].str.strip().str[:10], format='%Y-%m-%d', errors='coerce')
+    ends = pd.to_datetime(parts.str[-1].str.strip().str[:10], format='%Y-%m-%d', errors='coerce')
+    return starts, ends
+
+
+# 거래기간 문자열 안의 날짜 (YYYY.MM.DD, YYYY-MM-DD, YYYY/MM/DD)
+PERIOD_DATE_PATTERN = re.compile(r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})')
+
+
+def parse_period(period):
+    """
+    거래기간 문자열 → (시작일, 종료일) date (해석할 수 없으면 None)
+
+    "2024.07.26 ~ 2024.08.26", "2024-07-26 ~ 2024-08-26", "2024.07.26-2024.08.26"처럼 연도가 있는
+    날짜의 처음과 마지막을 쓴다. "07-26-08-26"처럼 연도가 없는 기간은 (None, None).
+    """
+    dates = []
+    for year, month, day in PERIOD_DATE_PATTERN.findall(str(period or '')):
+        try:
+            dates.append(date(int(year), int(month), int(day)))
+        except ValueError:
+            continue
+    if not dates:
+        return None, None
+    return dates[0], dates[-1]
+
+
+class _DateRange:
+    """청크마다 거래일의 최소/최대를 누적"""
+
+    def __init__(self):
+        self.start = None
+        self.end = None
+
+    def add(self, values):
+        starts, ends = parse_dates(values)
+        starts, ends = starts.dropna(), ends.dropna()
+        if starts.empty or ends.empty:
+            return
+        start, end = starts.min(), ends.max()
+        self.start = start if self.start is None else min(self.start, start)
+        self.end = end if self.end is None else max(self.end, end)
+
+    def period(self):
+        """'YYYY-MM-DD ~ YYYY-MM-DD' 형식 기간 (거래일이 없으면 None)"""
+        if self.start is None:
+            return None
+        return f"{self.start:%Y-%m-%d} ~ {self.end:%Y-%m-%d}"
+
+
+class DailyCube:
+    """
+    거래일별 항목 합계 큐브
+
+    합계를 계산하는 같은 숫자 블록을 거래일로 묶어 26개 항목의 일별 합계를 미리
+    집계해 둔다. 일별/주별 조회는 업로드 파일을 다시 읽지 않고 이 큐브로 처리한다.
+    거래일이 기간('시작 ~ 종료')인 행은 시작일로, 거래일이 없는 행은 제외한다.
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.positions = plan.used_positions()
+        self._days = {}
+
+    def add(self, dates, block):
+        """
+        거래일 값과 같은 행 순서의 숫자 블록(행 × used_positions)을 누적
+
+        날짜별 그룹 합계는 np.unique의 역인덱스로 한 번에 계산한다.
+        """
+        if dates is None or len(block) == 0:
+            return
+        starts, _ = parse_dates(dates)
+        valid = starts.notna().to_numpy()
+        if not valid.any():
+            return
+        labels, inverse = np.unique(starts[valid].dt.strftime('%Y-%m-%d').to_numpy(), return_inverse=True)
+        sums = np.zeros((len(labels), block.shape[1]), dtype=block.dtype)
+        np.add.at(sums, inverse, np.nan_to_num(block[valid]))
+        for label, row in zip(labels, sums):
+            if label in self._days:
+                self._days[label] += row
+            else:
+                self._days[label] = row
+
+    def to_dict(self):
+        """
+        JSON으로 저장할 큐브
+
+        {'items': ['f', ..., 'ae'], 'days': {'YYYY-MM-DD': [항목별 합계, ...]}}
+        (매핑되지 않은 항목은 0, 정수인 값은 정수로 저장)
+        """
+        index = {position: idx for idx, position in enumerate(self.positions)}
+        items = list(self.plan.positions)
+        days = {}
+        for day in sorted(self._days):
+            row = self._days[day]
+            values = []
+            for key in items:
+                position = self.plan.positions[key]
+                value = 0 if position is None else row[index[position]].item()
+                values.append(int(value) if isinstance(value, float) and value.is_integer() else value)
+            days[day] = values
+        return {'items': items, 'days': days}
+
+
+def _number_block(rows, width):
+    """숫자 리스트(None은 결측)들을 2차원 float64 배열로 변환"""
+    if not rows:
+        return np.empty((0, width), dtype=np.float64)
+    return np.array(rows, dtype=np.float64).reshape(len(rows), width)
+
+
+def _sum_block(df, positions, cube=None, dates=None, integer=False):
+    """
+    데이터 프레임의 지정 컬럼들을 단일 합계로 계산 (빈 셀 제외)
+
+    cube가 주어지면 같은 숫자 블록을 거래일(dates)별로도 누적한다.
+    integer=True이면 int64 블록으로 정확한 정수 합계를 계산한다.
+    """
+    if integer:
+        block = integer_block(df, positions)
+        if cube is not None:
+            cube.add(dates, block)
+        return integer_sums(block)
+
+    block, integral = numeric_block(df, positions)
+    if cube is not None:
+        cube.add(dates, block)
+    totals = block.sum(axis=0)
+    if np.isnan(totals).any():
+        # 빈 셀(NaN)이 있을 때만 NaN을 건너뛰는 합계로 다시 계산
+        totals = np.nansum(block, axis=0)
+    # 빈 셀 없이 정수 값만 있는 컬럼은 스트리밍 방식처럼 int64 합계 (2**53 미만이면 float64 합계도 정확)
+    integral &= np.abs(totals) < 2 ** 53
+    return [np.int64(total) if whole else total for total, whole in zip(totals, integral)]
+
+
+def stream_csv_columns(file_path, chunk_size=None, integer=False):
+    """
+    CSV 파일을 청크 단위로 읽으며 컬럼 합계 계산
+
+    앞쪽 행에서 헤더 행을 찾고(find_header_row), 그 아래 데이터는 필요한 컬럼만
+    chunk_size 행씩 읽어 합산하므로 파일 크기와 관계없이 메모리 사용량이 일정하다.
+    거래기간은 헤더 위 프리앰블에서 찾고, 없으면 거래일 컬럼의 범위로 정한다.
+
+    Returns:
+        (ParsedWorkbook, column_data)
+    """
+    chunk_size = chunk_size or CSV_CHUNK_ROWS
+    encoding = detect_csv_encoding(file_path)
+    head = read_csv_head(file_path, encoding, CSV_HEADER_SCAN_ROWS)
+    header_row = find_header_row(head)
+    workbook = ParsedWorkbook(pd.DataFrame(head[:header_row + 1], dtype=object), header_row)
+    plan = workbook.column_plan
+
+    positions = plan.used_positions()
+    date_position = find_date_column(workbook.headers)
+    usecols = sorted(set(positions) | ({date_position} if date_position is not None else set()))
+
+    # 정수 모드가 아니면 컬럼마다 정수(int64)/실수(float64) 합계를 유지하며 누적
+    totals = np.zeros(len(positions), dtype=np.int64) if integer else [np.int64(0)] * len(positions)
+    date_range = _DateRange()
+    cube = DailyCube(plan)
+    with open_text(file_path, encoding) as f:
+        for _ in range(header_row + 1):
+            f.readline()
+        chunks = pd.read_csv(f, header=None, usecols=usecols, chunksize=chunk_size,
+                             thousands=',', skip_blank_lines=True, low_memory=False)
+        for chunk in chunks:
+            chunk = chunk.reindex(columns=usecols)
+            dates = None if date_position is None else chunk[date_position]
+            sums = _sum_block(chunk, [usecols.index(p) for p in positions], cube, dates, integer)
+            totals = add_integer_sums(totals, sums) if integer else [a + b for a, b in zip(totals, sums)]
+            if dates is not None:
+                date_range.add(dates)
+
+    workbook.period_hint = date_range.period()
+    workbook.daily_cube = cube.to_dict()
+    sums = dict(zip(positions, totals))
+    column_data = {key: 0 if position is None else sums[position]
+                   for key, position in plan.positions.items()}
+    return workbook, column_data
+
+
+def read_parquet_columns(file_path, integer=False):
+    """
+    Parquet 파일에서 필요한 컬럼만 읽어 컬럼 합계 계산
+
+    Parquet 스키마의 컬럼명이 곧 헤더 행이다. 거래기간은 파일 메타데이터의
+    transaction_period 값을 우선 사용하고, 없으면 거래일 컬럼의 범위로 정한다.
+
+    Returns:
+        (ParsedWorkbook, column_data)
+    """
+    pq = import_parquet()
+    parquet_file = pq.ParquetFile(rewind(file_path))
+    headers = parquet_file.schema_arrow.names
+    workbook = ParsedWorkbook(pd.DataFrame([headers], dtype=object), header_row=0)
+    plan = workbook.column_plan
+
+    positions = plan.used_positions()
+    date_position = find_date_column(headers)
+    needed = positions + ([date_position] if date_position is not None and date_position not in positions else [])
+    table = parquet_file.read(columns=[headers[p] for p in needed])
+    df = pd.DataFrame({p: table.column(idx).to_pandas() for idx, p in enumerate(needed)})
+
+    cube = DailyCube(plan)
+    dates = None if date_position is None else df[date_position]
+    totals = _sum_block(df, list(range(len(positions))), cube, dates, integer) if positions else []
+    workbook.daily_cube = cube.to_dict()
+    sums = dict(zip(positions, totals))
+    column_data = {key: 0 if position is None else sums[position]
+                   for key, position in plan.positions.items()}
+
+    metadata = parquet_file.schema_arrow.metadata or {}
+    period = metadata.get(b'transaction_period')
+    if period:
+        workbook.period_hint = period.decode('utf-8')
+    elif date_position is not None:
+        date_range = _DateRange()
+        date_range.add(df[date_position])
+        workbook.period_hint = date_range.period()
+    return workbook, column_data
+
+
+def load_column_data(file_path, streaming=False, backend=None, sheet_index=0, integer=None):
+    """
+    입력 형식(xlsx, csv, parquet)에 맞게 파일을 읽어 (워크북, 컬럼 데이터) 반환
+
+    Args:
+        file_path: 입력 파일 경로 또는 이름이 있는 버퍼 (readers.SpooledUpload)
+        streaming: xlsx를 데이터 프레임 없이 한 행씩 읽을지 여부 (CSV는 항상 청크 스트리밍)
+        backend: xlsx 읽기 백엔드 이름
+        sheet_index: xlsx에서 읽을 시트 번호
+        integer: 정수 원 단위(int64) 모드 여부 (없으면 INTEGER_WON 환경 변수)
+    """
+    if integer is None:
+        integer = INTEGER_WON
+    fmt = file_format(file_path)
+    if fmt == 'csv':
+        return stream_csv_columns(file_path, integer=integer)
+    if fmt == 'parquet':
+        return read_parquet_columns(file_path, integer)
+    if streaming:
+        return stream_excel_columns(file_path, backend, sheet_index, integer)
+    workbook = parse_workbook(file_path, backend, sheet_index)
+    cube = DailyCube(workbook.column_plan)
+    column_data = extract_all_columns(workbook.data, workbook.column_plan, cube, integer)
+    workbook.daily_cube = cube.to_dict()
+    return workbook, column_data
+
+
+def row_hashes(df_data):
+    """데이터 행별 64비트 해시 (행 내용만 사용, 인덱스 제외)"""
+    return pd.util.hash_pandas_object(df_data, index=False).to_numpy()
+
+
+def rows_digest(hashes):
+    """행 해시 배열 전체의 SHA-256 (앞부분 n행이 같은지 비교하는 용도)"""
+    return hashlib.sha256(np.ascontiguousarray(hashes).tobytes()).hexdigest()
+
+
+def merge_column_data(stored, delta, integer=False):
+    """저장된 항목별 합계에 새로 읽은 행들의 합계를 더함"""
+    merged = {}
+    for key, value in delta.items():
+        if integer:
+            total = int(stored.get(key, 0)) + int(value)
+            if abs(total) > INT64_MAX:
+                raise OverflowError("금액 합계가 int64 범위를 넘습니다")
+            merged[key] = np.int64(total)
+        else:
+            merged[key] = value + stored.get(key, 0)
+    return merged
+
+
+def merge_daily_cubes(stored, delta):
+    """같은 항목 순서의 거래일별 큐브 두 개를 합침"""
+    days = {day: list(values) for day, values in stored['days'].items()}
+    for day, values in delta['days'].items():
+        if day in days:
+            days[day] = [total + value for total, value in zip(days[day], values)]
+        else:
+            days[day] = list(values)
+    return {'items': delta['items'], 'days': dict(sorted(days.items()))}
+
+
+def _can_extend(state, workbook, hashes, integer):
+    """저장된 상태가 이번 파일의 앞부분과 같은지 (뒤에 행만 추가된 파일인지) 확인"""
+    if not state or not state.get('ingest_state'):
+        return False
+    ingest_state = state['ingest_state']
+    row_count = ingest_state['row_count']
+    return (ingest_state['header_fingerprint'] == header_fingerprint(workbook.headers, SPECS_VERSION)
+            and ingest_state['integer'] == integer
+            and row_count <= len(hashes)
+            and rows_digest(hashes[:row_count]) == ingest_state['prefix_hash'])
+
+
+def load_column_data_incremental(file_path, find_state, backend=None, sheet_index=0, integer=None, load_sums=None):
+    """
+    같은 거래기간의 이전 업로드 상태를 이용해 추가된 행만 처리하는 xlsx 읽기
+
+    매일 올리는 누적 내보내기 파일처럼 이전 파일 뒤에 행만 추가된 경우, 이전에 처리한
+    앞부분(행 수와 행 해시)이 그대로인지 확인하고 새로 추가된 행만 합계/큐브에 더한다.
+    앞부분이 다르거나 상태가 없으면 전체를 다시 계산한다. 파일 파싱과 모든 행의 해시
+    계산은 증분이어도 생략할 수 없으므로 절약되는 것은 앞부분 행의 합계/큐브 계산뿐이다.
+
+    Args:
+        file_path: 입력 xlsx 파일 경로 또는 버퍼
+        find_state: 거래기간 → 이전 레코드({'ingest_state', ...} 또는 None)를 반환하는 함수
+        integer: 정수 원 단위(int64) 모드 여부 (없으면 INTEGER_WON 환경 변수)
+        load_sums: 이전 레코드 → {'column_data', 'daily_cube'}를 반환하는 함수. 앞부분이 같을
+                   때만 호출한다 (없으면 find_state가 돌려준 레코드의 값 사용)
+
+    Returns:
+        (ParsedWorkbook, column_data) - 워크북의 ingest_state에 다음 업로드용 상태
+        ({'row_count', 'prefix_hash', 'header_fingerprint', 'integer', 'mode', 'new_rows'})가 담긴다.
+    """
+    if integer is None:
+        integer = INTEGER_WON
+    workbook = parse_workbook(file_path, backend, sheet_index)
+    plan = workbook.column_plan
+    df_data = workbook.data
+    hashes = row_hashes(df_data)
+
+    state = find_state(extract_transaction_period(workbook))
+    start = state['ingest_state']['row_count'] if _can_extend(state, workbook, hashes, integer) else 0
+    if start:
+        # 저장된 합계/큐브는 앞부분이 같을 때만 가져옴
+        sums = load_sums(state) if load_sums else state
+        if not sums or sums.get('column_data') is None or not sums.get('daily_cube'):
+            start = 0
+
+    cube = DailyCube(plan)
+    column_data = extract_all_columns(df_data.iloc[start:], plan, cube, integer)
+    workbook.daily_cube = cube.to_dict()
+    if start:
+        column_data = merge_column_data(sums['column_data'], column_data, integer)
+        workbook.daily_cube = merge_daily_cubes(sums['daily_cube'], workbook.daily_cube)
+
+    workbook.ingest_state = {
+        'row_count': len(df_data),
+        'prefix_hash': rows_digest(hashes),
+        'header_fingerprint': header_fingerprint(workbook.headers, SPECS_VERSION),
+        'integer': integer,
+        'mode': 'delta' if start else 'full',
+        'new_rows': len(df_data) - start
     }
+    return workbook, column_data
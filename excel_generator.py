@@ -1,323 +1,453 @@
 #!/usr/bin/env python3
 """
 Excel 손익계산서 생성 모듈
+
+손익계산서 양식은 고정되어 있으므로 STATEMENT_LAYOUT으로 선언한 양식을 이름 있는
+스타일(NamedStyle)로 꾸민 템플릿 워크북으로 프로세스당 한 번만 만들어 두고,
+변환할 때는 금액과 비율 셀의 값만 채워서 저장한다.
 """
+import threading
+from io import BytesIO
+
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-
-
-def create_styles():
-    """Excel 스타일 정의"""
-    return {
-        'border': Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        ),
-        'header_fill': PatternFill(start_color='D9E1F2', end_color='D9E1F2', fill_type='solid'),
-        'section_fill': PatternFill(start_color='E7E6E6', end_color='E7E6E6', fill_type='solid'),
-        'blue_fill': PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid'),
-        'green_fill': PatternFill(start_color='70AD47', end_color='70AD47', fill_type='solid')
-    }
-
-
-def set_cell_style(cell, border, alignment='left', bold=False, size=11, fill=None, color='000000'):
-    """셀 스타일 설정"""
-    cell.border = border
-    cell.font = Font(bold=bold, size=size, color=color)
-    cell.alignment = Alignment(horizontal=alignment, vertical='center')
-    if fill:
-        cell.fill = fill
-
-
-def add_header(ws, styles):
-    """헤더 추가"""
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+
+
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+HEADER_FILL = PatternFill(start_color='D9E1F2', end_color='D9E1F2', fill_type='solid')
+SECTION_FILL = PatternFill(start_color='E7E6E6', end_color='E7E6E6', fill_type='solid')
+BLUE_FILL = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+GREEN_FILL = PatternFill(start_color='70AD47', end_color='70AD47', fill_type='solid')
+
+AMOUNT_FORMAT = '#,##0'
+RATIO_FORMAT = '0.0'
+
+# 이름 있는 스타일 정의 (이름 → NamedStyle 인자)
+NAMED_STYLES = {
+    'statement_title': dict(font=Font(bold=True, size=14),
+                            alignment=Alignment(horizontal='center', vertical='center')),
+    'statement_header': dict(font=Font(bold=True, size=11, color='000000'), fill=HEADER_FILL, border=THIN_BORDER,
+                             alignment=Alignment(horizontal='center', vertical='center')),
+    # 일반 행
+    'statement_cell': dict(border=THIN_BORDER, alignment=Alignment(vertical='center')),
+    'statement_text': dict(border=THIN_BORDER, alignment=Alignment(horizontal='left', vertical='center')),
+    'statement_amount': dict(border=THIN_BORDER, number_format=AMOUNT_FORMAT,
+                             alignment=Alignment(horizontal='right', vertical='center')),
+    'statement_ratio': dict(border=THIN_BORDER, number_format=RATIO_FORMAT,
+                            alignment=Alignment(horizontal='right', vertical='center')),
+    'statement_seconds': dict(border=THIN_BORDER, number_format='0.000',
+                              alignment=Alignment(horizontal='right', vertical='center')),
+    'statement_border': dict(border=THIN_BORDER),
+    # 섹션 행 (회색 배경)
+    'statement_section': dict(font=Font(bold=True, size=11, color='000000'), fill=SECTION_FILL, border=THIN_BORDER,
+                              alignment=Alignment(horizontal='left', vertical='center')),
+    'statement_section_amount': dict(font=Font(bold=True, size=11, color='000000'), fill=SECTION_FILL,
+                                     border=THIN_BORDER, number_format=AMOUNT_FORMAT,
+                                     alignment=Alignment(horizontal='right', vertical='center')),
+    'statement_section_ratio': dict(font=Font(bold=True, size=11, color='000000'), fill=SECTION_FILL,
+                                    border=THIN_BORDER, number_format=RATIO_FORMAT,
+                                    alignment=Alignment(horizontal='right', vertical='center')),
+    'statement_section_fill': dict(fill=SECTION_FILL, border=THIN_BORDER),
+    # 입금금액 행 (파란색)
+    'statement_deposit': dict(font=Font(bold=True, size=12, color='FFFFFF'), fill=BLUE_FILL, border=THIN_BORDER,
+                              alignment=Alignment(horizontal='center', vertical='center')),
+    'statement_deposit_amount': dict(font=Font(bold=True, size=12), border=THIN_BORDER, number_format=AMOUNT_FORMAT,
+                                     alignment=Alignment(horizontal='right', vertical='center')),
+    'statement_deposit_ratio': dict(font=Font(bold=True, size=12), border=THIN_BORDER, number_format=RATIO_FORMAT,
+                                    alignment=Alignment(horizontal='right', vertical='center')),
+    # 매출총이익 행 (초록색)
+    'statement_profit': dict(font=Font(bold=True, size=12, color='FFFFFF'), fill=GREEN_FILL, border=THIN_BORDER,
+                             alignment=Alignment(horizontal='center', vertical='center')),
+    'statement_profit_amount': dict(font=Font(bold=True, size=12, color='FFFFFF'), fill=GREEN_FILL,
+                                    border=THIN_BORDER, number_format=AMOUNT_FORMAT,
+                                    alignment=Alignment(horizontal='right', vertical='center')),
+    'statement_profit_ratio': dict(font=Font(bold=True, size=12, color='FFFFFF'), fill=GREEN_FILL,
+                                   border=THIN_BORDER, number_format=RATIO_FORMAT,
+                                   alignment=Alignment(horizontal='right', vertical='center')),
+}
+
+# 행 종류 → (구분/항목 셀, 금액 셀, 비율 셀) 스타일
+ROW_STYLES = {
+    'section': ('statement_section', 'statement_section_amount', 'statement_section_ratio'),
+    'section_title': ('statement_section', 'statement_section_fill', 'statement_section_fill'),
+    'deposit': ('statement_deposit', 'statement_deposit_amount', 'statement_deposit_ratio'),
+    'profit': ('statement_profit', 'statement_profit_amount', 'statement_profit_ratio'),
+    'group': ('statement_cell', 'statement_amount', 'statement_ratio'),
+    'subgroup': ('statement_cell', 'statement_amount', 'statement_ratio'),
+    'item': ('statement_cell', 'statement_amount', 'statement_ratio'),
+}
+
+# 구분/항목 셀을 병합하는 행 종류
+MERGED_ROWS = ('section', 'section_title', 'deposit', 'profit')
+
+# 비율: 총매출 대비 백분율
+SHARE = 'share'
+
+# 손익계산서 양식 (4행부터 차례로)
+# (행 종류, 구분, 항목, 금액 키, 비율) - 금액 키는 calculate_totals() 결과 또는 항목(f~ae) 키,
+# 비율은 None(없음), SHARE(총매출 대비) 또는 고정 값
+STATEMENT_LAYOUT = [
+    ('section', None, 'Ⅰ. 매출액', 'total_maechul', 100.0),
+    ('group', '(A)', '주문중개', 'jumun_jungae_total', SHARE),
+    ('item', None, '바로결제주문금액', 'f', None),
+    ('item', None, '만나서결제주문금액', 'g', None),
+    ('group', '(B)', '배달비', 'baedalbi_total', None),
+    ('item', None, '바로결제배달팁', 'n', None),
+    ('item', None, '만나서결제배달팁', 'o', None),
+    ('item', None, '배민클럽(한집배달) 배달팁 할인', 'p', None),
+    ('item', None, '배민클럽(한집배달) 배달팁 할인 지원', 'q', None),
+    ('item', None, '배민클럽(알뜰배달) 배달팁 할인', 'r', None),
+    ('item', None, '배민클럽(알뜰배달) 배달팁 할인 지원', 's', None),
+    ('item', None, '배민1 한집배달 배달비', 't', None),
+    ('item', None, '배민1 한집배달 배달비할인', 'u', None),
+    ('item', None, '알뜰배달 배달비', 'v', None),
+    ('item', None, '알뜰배달 배달비할인', 'w', None),
+    ('blank', None, None, None, None),
+    ('section_title', None, 'Ⅱ. 매출원가', None, None),
+    ('subgroup', None, '중개이용료', None, None),
+    ('item', None, '배민1중개이용료', 'h', None),
+    ('item', None, '알뜰배달 중개이용료', 'i', None),
+    ('item', None, '오픈리스트중개이용료', 'j', None),
+    ('item', None, '배민포장주문중개이용료', 'k', None),
+    ('blank', None, None, None, None),
+    ('subgroup', None, '고객할인', None, None),
+    ('item', None, '주문금액 즉시할인', 'l', None),
+    ('item', None, '주문금액 즉시할인 지원', 'm', None),
+    ('blank', None, None, None, None),
+    ('group', '(C)', '결제정산수수료', 'gyeoljae_total', None),
+    ('item', None, '기본수수료(정률)', 'x', None),
+    ('item', None, '우대수수료', 'y', None),
+    ('item', None, '배민 만나서결제주문금액', 'z', None),
+    ('item', None, '배민 만나서결제배달팁', 'aa', None),
+    ('blank', None, None, None, None),
+    ('group', '(D)', '조정금액', 'ab', None),
+    ('blank', None, None, None, None),
+    ('group', '(E)', '부가세', 'ac', None),
+    ('blank', None, None, None, None),
+    ('group', '(F)', '우리가게클릭', 'urigagae_total', None),
+    ('item', None, '우리가게클릭 이용요금', 'ad', None),
+    ('item', None, '부가세', 'ae', None),
+    ('blank', None, None, None, None),
+    ('deposit', None, '(H) 입금금액', 'ipgeum_total', SHARE),
+    ('spacer', None, None, None, None),
+    ('section', None, '총매출', 'total_maechul', 100.0),
+    ('section', None, '매출원가', 'maechul_wonka', SHARE),
+    ('profit', None, '매출총이익', 'maechul_total_iik', SHARE),
+]
+
+FIRST_LAYOUT_ROW = 4
+COLUMN_WIDTHS = {'A': 12, 'B': 32, 'C': 18, 'D': 12}
+
+
+def register_styles(wb):
+    """워크북에 이름 있는 스타일 등록 (스타일은 워크북마다 새로 만들어야 함)"""
+    for name, style in NAMED_STYLES.items():
+        wb.add_named_style(NamedStyle(name=name, **{'font': DEFAULT_FONT, **style}))
+
+
+def _build_statement(wb):
+    """
+    값 없이 양식만 있는 손익계산서 시트 작성
+
+    Returns:
+        값을 채울 셀 목록 [(행, 금액 키, 비율), ...]
+    """
+    ws = wb.active
+    ws.title = "손익계산서"
+
+    # 제목과 표 머리글
     ws['A1'] = '손익계산서'
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].style = 'statement_title'
     ws.merge_cells('A1:D1')
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
     ws.row_dimensions[1].height = 25
+    for col, header in zip('ABCD', ['구분', '항목', '금액(원)', '비율(%)']):
+        ws[f'{col}3'] = header
+        ws[f'{col}3'].style = 'statement_header'
 
-    headers = ['구분', '항목', '금액(원)', '비율(%)']
-    for idx, header in enumerate(headers, 1):
-        col = chr(64 + idx)
-        cell = ws[f'{col}3']
-        cell.value = header
-        set_cell_style(cell, styles['border'], 'center', True, 11, styles['header_fill'])
-
-
-def add_section_header(ws, row, label, value, ratio, styles, total_maechul):
-    """섹션 헤더 추가"""
-    ws.merge_cells(f'A{row}:B{row}')
-    ws[f'A{row}'] = label
-    set_cell_style(ws[f'A{row}'], styles['border'], 'left', True, 11, styles['section_fill'])
-    
-    ws[f'C{row}'] = value
-    ws[f'C{row}'].number_format = '#,##0'
-    set_cell_style(ws[f'C{row}'], styles['border'], 'right', True, 11, styles['section_fill'])
-    
-    ws[f'D{row}'] = ratio if ratio is not None else (value / total_maechul * 100 if total_maechul != 0 else 0)
-    ws[f'D{row}'].number_format = '0.0'
-    set_cell_style(ws[f'D{row}'], styles['border'], 'right', True, 11, styles['section_fill'])
-
-
-def add_item_row(ws, row, label, value, styles, show_ratio=False, total_maechul=0, indent=False):
-    """항목 행 추가"""
-    if label:
-        ws[f'A{row}'] = label if not indent else ''
-        ws[f'B{row}'] = ('  ' + label) if indent else label
-    
-    if value is not None:
-        ws[f'C{row}'] = value
-        ws[f'C{row}'].number_format = '#,##0'
-    
-    if show_ratio and total_maechul != 0:
-        ws[f'D{row}'] = (value / total_maechul * 100) if value else 0
-        ws[f'D{row}'].number_format = '0.0'
-    
-    for col in ['A', 'B', 'C', 'D']:
-        if ws[f'{col}{row}'].value is None and col != 'D':
-            ws[f'{col}{row}'].value = ''
-        ws[f'{col}{row}'].border = styles['border']
-        ws[f'{col}{row}'].alignment = Alignment(vertical='center')
-    
-    ws[f'C{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    if show_ratio:
-        ws[f'D{row}'].alignment = Alignment(horizontal='right', vertical='center')
+    slots = []
+    for row, (kind, code, label, key, ratio) in enumerate(STATEMENT_LAYOUT, FIRST_LAYOUT_ROW):
+        if kind in ('blank', 'spacer'):
+            ws[f'D{row}'].style = 'statement_border'
+            if kind == 'spacer':
+                ws.row_dimensions[row].height = 5
+            continue
+
+        label_style, amount_style, ratio_style = ROW_STYLES[kind]
+        if kind in MERGED_ROWS:
+            ws[f'A{row}'] = label
+            ws[f'A{row}'].style = label_style
+            ws.merge_cells(f'A{row}:B{row}')
+        else:
+            ws[f'A{row}'] = code
+            ws[f'B{row}'] = ('  ' + label) if kind == 'item' else label
+            ws[f'A{row}'].style = label_style
+            ws[f'B{row}'].style = label_style
+        ws[f'C{row}'].style = amount_style
+        ws[f'D{row}'].style = ratio_style if ratio is not None or kind in MERGED_ROWS else label_style
+
+        if key:
+            slots.append((row, key, ratio))
+
+    for col, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[col].width = width
+    return slots
+
+
+def _amount(calc_result, key):
+    """금액 키(합계 이름 또는 항목 키)의 값"""
+    return calc_result[key] if key in calc_result else calc_result['data'][key]
+
+
+def _ratio(calc_result, value, ratio):
+    """비율 셀 값 (SHARE이면 총매출 대비 백분율, 없으면 None)"""
+    if ratio == SHARE:
+        total_maechul = calc_result['total_maechul']
+        return (value / total_maechul * 100) if total_maechul != 0 else 0
+    return ratio
+
+
+def _fill_statement(ws, slots, calc_result):
+    """템플릿의 금액/비율 셀에 계산 결과 채우기"""
+    for row, key, ratio in slots:
+        value = _amount(calc_result, key)
+        ws.cell(row=row, column=3).value = value
+        if ratio is not None:
+            ws.cell(row=row, column=4).value = _ratio(calc_result, value, ratio)
+
+
+def _json_value(value):
+    """NumPy 값을 JSON으로 보낼 수 있는 int/float로 변환"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def statement_preview(calc_result):
+    """
+    Excel과 같은 손익계산서 구성을 화면 미리보기용 행 목록으로 변환 (xlsx를 만들지 않음)
+
+    Returns:
+        STATEMENT_LAYOUT 순서의 [{'kind', 'code', 'label', 'amount', 'ratio'}, ...]
+        (값이 없는 칸은 None, 'blank'/'spacer' 행은 빈 줄)
+    """
+    rows = []
+    for kind, code, label, key, ratio in STATEMENT_LAYOUT:
+        amount = _amount(calc_result, key) if key else None
+        rows.append({
+            'kind': kind,
+            'code': code,
+            'label': label,
+            'amount': _json_value(amount),
+            'ratio': _json_value(_ratio(calc_result, amount, ratio)) if key and ratio is not None else None
+        })
+    return rows
+
+
+# 프로세스당 한 번 만드는 템플릿 (워크북, 값 셀 목록)과 동시 사용 방지 잠금
+_template = None
+_template_lock = threading.Lock()
+
+
+def _statement_template():
+    global _template
+    if _template is None:
+        wb = Workbook()
+        register_styles(wb)
+        _template = (wb, _build_statement(wb))
+    return _template
 
 
 def generate_excel(output_file, calc_result):
-    """손익계산서 Excel 파일 생성"""
+    """
+    손익계산서 Excel 파일 생성 (템플릿에 값만 채워서 저장)
+
+    Args:
+        output_file: 출력 파일 경로 또는 BytesIO 같은 쓰기 가능한 버퍼
+        calc_result: calculate_totals() 결과
+    """
+    with _template_lock:
+        wb, slots = _statement_template()
+        _fill_statement(wb.active, slots, calc_result)
+        wb.save(output_file)
+
+
+def render_excel(calc_result):
+    """손익계산서를 디스크에 쓰지 않고 메모리에서 생성하여 xlsx 바이트로 반환"""
+    buffer = BytesIO()
+    generate_excel(buffer, calc_result)
+    return buffer.getvalue()
+
+
+def generate_summary_excel(output_file, stores):
+    """
+    매장별 손익계산서 요약 Excel 파일 생성
+
+    Args:
+        output_file: 출력 Excel 파일 경로
+        stores: generate_store_statements()의 매장별 결과 목록
+    """
     wb = Workbook()
+    register_styles(wb)
     ws = wb.active
-    ws.title = "손익계산서"
-    
-    styles = create_styles()
-    data = calc_result['data']
-    total_maechul = calc_result['total_maechul']
-    
-    # 헤더
-    add_header(ws, styles)
-    
-    # Ⅰ. 매출액
-    add_section_header(ws, 4, 'Ⅰ. 매출액', total_maechul, 100.0, styles, total_maechul)
-    
-    # (A) 주문중개
-    add_item_row(ws, 5, '(A)', None, styles)
-    ws['B5'] = '주문중개'
-    ws['C5'] = calc_result['jumun_jungae_total']
-    ws['C5'].number_format = '#,##0'
-    ws['D5'] = (calc_result['jumun_jungae_total'] / total_maechul * 100) if total_maechul != 0 else 0
-    ws['D5'].number_format = '0.0'
-    for col in ['A', 'B', 'C', 'D']:
-        ws[f'{col}5'].border = styles['border']
-        ws[f'{col}5'].alignment = Alignment(vertical='center')
-    ws['C5'].alignment = Alignment(horizontal='right', vertical='center')
-    ws['D5'].alignment = Alignment(horizontal='right', vertical='center')
-    
-    add_item_row(ws, 6, '바로결제주문금액', data['f'], styles, indent=True)
-    add_item_row(ws, 7, '만나서결제주문금액', data['g'], styles, indent=True)
-    
-    # (B) 배달비
-    add_item_row(ws, 8, '(B)', None, styles)
-    ws['B8'] = '배달비'
-    ws['C8'] = calc_result['baedalbi_total']
-    ws['C8'].number_format = '#,##0'
-    for col in ['A', 'B', 'C']:
-        ws[f'{col}8'].border = styles['border']
-        ws[f'{col}8'].alignment = Alignment(vertical='center')
-    ws['C8'].alignment = Alignment(horizontal='right', vertical='center')
-    
-    baedalbi_items = [
-        ('바로결제배달팁', data['n']),
-        ('만나서결제배달팁', data['o']),
-        ('배민클럽(한집배달) 배달팁 할인', data['p']),
-        ('배민클럽(한집배달) 배달팁 할인 지원', data['q']),
-        ('배민클럽(알뜰배달) 배달팁 할인', data['r']),
-        ('배민클럽(알뜰배달) 배달팁 할인 지원', data['s']),
-        ('배민1 한집배달 배달비', data['t']),
-        ('배민1 한집배달 배달비할인', data['u']),
-        ('알뜰배달 배달비', data['v']),
-        ('알뜰배달 배달비할인', data['w'])
-    ]
-    
-    row = 9
-    for label, value in baedalbi_items:
-        add_item_row(ws, row, label, value, styles, indent=True)
-        row += 1
-    
-    # Ⅱ. 매출원가
-    row += 1
-    ws.merge_cells(f'A{row}:B{row}')
-    ws[f'A{row}'] = 'Ⅱ. 매출원가'
-    set_cell_style(ws[f'A{row}'], styles['border'], 'left', True, 11, styles['section_fill'])
-    ws[f'C{row}'].border = styles['border']
-    ws[f'C{row}'].fill = styles['section_fill']
-    ws[f'D{row}'].border = styles['border']
-    ws[f'D{row}'].fill = styles['section_fill']
-    row += 1
-    
-    # 중개이용료
-    add_item_row(ws, row, '', None, styles)
-    ws[f'B{row}'] = '중개이용료'
-    row += 1
-    
-    jungae_items = [
-        ('배민1중개이용료', data['h']),
-        ('알뜰배달 중개이용료', data['i']),
-        ('오픈리스트중개이용료', data['j']),
-        ('배민포장주문중개이용료', data['k'])
-    ]
-    
-    for label, value in jungae_items:
-        add_item_row(ws, row, label, value, styles, indent=True)
-        row += 1
-    
-    row += 1
-    
-    # 고객할인
-    add_item_row(ws, row, '', None, styles)
-    ws[f'B{row}'] = '고객할인'
-    row += 1
-    
-    add_item_row(ws, row, '주문금액 즉시할인', data['l'], styles, indent=True)
-    row += 1
-    add_item_row(ws, row, '주문금액 즉시할인 지원', data['m'], styles, indent=True)
-    row += 1
-    
-    row += 1
-    
-    # (C) 결제정산수수료
-    add_item_row(ws, row, '(C)', None, styles)
-    ws[f'B{row}'] = '결제정산수수료'
-    ws[f'C{row}'] = calc_result['gyeoljae_total']
-    ws[f'C{row}'].number_format = '#,##0'
-    for col in ['A', 'B', 'C']:
-        ws[f'{col}{row}'].border = styles['border']
-        ws[f'{col}{row}'].alignment = Alignment(vertical='center')
-    ws[f'C{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    row += 1
-    
-    gyeoljae_items = [
-        ('기본수수료(정률)', data['x']),
-        ('우대수수료', data['y']),
-        ('배민 만나서결제주문금액', data['z']),
-        ('배민 만나서결제배달팁', data['aa'])
-    ]
-    
-    for label, value in gyeoljae_items:
-        add_item_row(ws, row, label, value, styles, indent=True)
+    ws.title = "요약"
+
+    ws['A1'] = '매장별 손익계산서 요약'
+    ws['A1'].style = 'statement_title'
+    ws.merge_cells('A1:H1')
+    ws.row_dimensions[1].height = 25
+
+    headers = ['매장', '거래기간', '총매출', '매출원가', '매출총이익', '입금금액', '매출총이익률(%)', '처리시간(초)']
+    for idx, header in enumerate(headers, 1):
+        ws.cell(row=3, column=idx, value=header).style = 'statement_header'
+
+    amount_keys = ['total_maechul', 'maechul_wonka', 'maechul_total_iik', 'ipgeum_total']
+    totals = dict.fromkeys(amount_keys, 0)
+
+    row = 4
+    for store in stores:
+        result = store['result']
+        ws.cell(row=row, column=1, value=store['store_name']).style = 'statement_text'
+        ws.cell(row=row, column=2, value=result['transaction_period'] or '').style = 'statement_text'
+        for idx, key in enumerate(amount_keys, 3):
+            ws.cell(row=row, column=idx, value=result[key]).style = 'statement_amount'
+            totals[key] += result[key]
+        total_maechul = result['total_maechul']
+        ws.cell(row=row, column=7, value=(result['maechul_total_iik'] / total_maechul * 100) if total_maechul != 0 else 0).style = 'statement_ratio'
+        ws.cell(row=row, column=8, value=round(store['elapsed'], 3)).style = 'statement_seconds'
         row += 1
-    
-    row += 1
-    
-    # (D) 조정금액
-    add_item_row(ws, row, '(D)', None, styles)
-    ws[f'B{row}'] = '조정금액'
-    ws[f'C{row}'] = data['ab']
-    ws[f'C{row}'].number_format = '#,##0'
-    for col in ['A', 'B', 'C']:
-        ws[f'{col}{row}'].border = styles['border']
-        ws[f'{col}{row}'].alignment = Alignment(vertical='center')
-    ws[f'C{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    row += 1
-    
-    row += 1
-    
-    # (E) 부가세
-    add_item_row(ws, row, '(E)', None, styles)
-    ws[f'B{row}'] = '부가세'
-    ws[f'C{row}'] = data['ac']
-    ws[f'C{row}'].number_format = '#,##0'
-    for col in ['A', 'B', 'C']:
-        ws[f'{col}{row}'].border = styles['border']
-        ws[f'{col}{row}'].alignment = Alignment(vertical='center')
-    ws[f'C{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    row += 1
-    
-    row += 1
-    
-    # (F) 우리가게클릭
-    add_item_row(ws, row, '(F)', None, styles)
-    ws[f'B{row}'] = '우리가게클릭'
-    ws[f'C{row}'] = calc_result['urigagae_total']
-    ws[f'C{row}'].number_format = '#,##0'
-    for col in ['A', 'B', 'C']:
-        ws[f'{col}{row}'].border = styles['border']
-        ws[f'{col}{row}'].alignment = Alignment(vertical='center')
-    ws[f'C{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    row += 1
-    
-    add_item_row(ws, row, '우리가게클릭 이용요금', data['ad'], styles, indent=True)
-    row += 1
-    add_item_row(ws, row, '부가세', data['ae'], styles, indent=True)
-    row += 1
-    
-    row += 1
-    
-    # (H) 입금금액
-    ws.merge_cells(f'A{row}:B{row}')
-    ws[f'A{row}'] = '(H) 입금금액'
-    ws[f'A{row}'].font = Font(bold=True, size=12, color='FFFFFF')
-    ws[f'A{row}'].fill = styles['blue_fill']
-    ws[f'A{row}'].border = styles['border']
-    ws[f'A{row}'].alignment = Alignment(horizontal='center', vertical='center')
-    ws[f'C{row}'] = calc_result['ipgeum_total']
-    ws[f'C{row}'].font = Font(bold=True, size=12)
-    ws[f'C{row}'].number_format = '#,##0'
-    ws[f'C{row}'].border = styles['border']
-    ws[f'C{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    ws[f'D{row}'] = (calc_result['ipgeum_total'] / total_maechul * 100) if total_maechul != 0 else 0
-    ws[f'D{row}'].font = Font(bold=True, size=12)
-    ws[f'D{row}'].number_format = '0.0'
-    ws[f'D{row}'].border = styles['border']
-    ws[f'D{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    row += 1
-    
-    # 빈 행
-    ws.row_dimensions[row].height = 5
-    row += 1
-    
-    # 총매출
-    add_section_header(ws, row, '총매출', total_maechul, 100.0, styles, total_maechul)
-    row += 1
-    
-    # 매출원가
-    add_section_header(ws, row, '매출원가', calc_result['maechul_wonka'], 
-                      (calc_result['maechul_wonka'] / total_maechul * 100) if total_maechul != 0 else 0,
-                      styles, total_maechul)
-    row += 1
-    
-    # 매출총이익
-    ws.merge_cells(f'A{row}:B{row}')
-    ws[f'A{row}'] = '매출총이익'
-    ws[f'A{row}'].font = Font(bold=True, size=12, color='FFFFFF')
-    ws[f'A{row}'].fill = styles['green_fill']
-    ws[f'A{row}'].border = styles['border']
-    ws[f'A{row}'].alignment = Alignment(horizontal='center', vertical='center')
-    ws[f'C{row}'] = calc_result['maechul_total_iik']
-    ws[f'C{row}'].font = Font(bold=True, size=12, color='FFFFFF')
-    ws[f'C{row}'].number_format = '#,##0'
-    ws[f'C{row}'].border = styles['border']
-    ws[f'C{row}'].fill = styles['green_fill']
-    ws[f'C{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    ws[f'D{row}'] = (calc_result['maechul_total_iik'] / total_maechul * 100) if total_maechul != 0 else 0
-    ws[f'D{row}'].font = Font(bold=True, size=12, color='FFFFFF')
-    ws[f'D{row}'].number_format = '0.0'
-    ws[f'D{row}'].border = styles['border']
-    ws[f'D{row}'].fill = styles['green_fill']
-    ws[f'D{row}'].alignment = Alignment(horizontal='right', vertical='center')
-    
-    # D열 테두리 추가
-    for r in range(6, row):
-        if ws[f'D{r}'].value is None:
-            ws[f'D{r}'].border = styles['border']
-    
+
+    # 합계
+    ws.cell(row=row, column=1, value='합계').style = 'statement_section'
+    ws.cell(row=row, column=2, value=f'{len(stores)}개 매장').style = 'statement_section'
+    for idx, key in enumerate(amount_keys, 3):
+        ws.cell(row=row, column=idx, value=totals[key]).style = 'statement_section_amount'
+    total_maechul = totals['total_maechul']
+    ws.cell(row=row, column=7, value=(totals['maechul_total_iik'] / total_maechul * 100) if total_maechul != 0 else 0).style = 'statement_section_ratio'
+    ws.cell(row=row, column=8).style = 'statement_section_amount'
+
     # 열 너비
-    ws.column_dimensions['A'].width = 12
-    ws.column_dimensions['B'].width = 32
-    ws.column_dimensions['C'].width = 18
-    ws.column_dimensions['D'].width = 12
-    
+    for col, width in zip('ABCDEFGH', [18, 26, 16, 16, 16, 16, 16, 14]):
+        ws.column_dimensions[col].width = width
+
+    wb.save(output_file)
+
+
+# 시트 이름에 쓸 수 없는 문자와 최대 길이
+INVALID_TITLE_CHARS = '[]:*?/\\'
+MAX_TITLE_LENGTH = 31
+
+
+def _sheet_title(label, used):
+    """워크북 안에서 겹치지 않는 시트 이름"""
+    title = ''.join('-' if ch in INVALID_TITLE_CHARS else ch for ch in str(label)).strip()[:MAX_TITLE_LENGTH] or '기간'
+    base, suffix = title, 2
+    while title in used:
+        tail = f" ({suffix})"
+        title = base[:MAX_TITLE_LENGTH - len(tail)] + tail
+        suffix += 1
+    used.add(title)
+    return title
+
+
+def _styled(ws, value, style):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _write_statement_sheet(ws, title, calc_result):
+    """
+    쓰기 전용 시트에 손익계산서 한 장 작성
+
+    쓰기 전용 모드에서는 셀 병합을 할 수 없으므로 병합하던 행은 구분 셀에 항목을 쓰고
+    항목 셀은 같은 스타일로 비워 둔다.
+    """
+    for col, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[col].width = width
+    ws.row_dimensions[1].height = 25
+
+    ws.append([_styled(ws, title, 'statement_title')])
+    ws.append([])
+    ws.append([_styled(ws, header, 'statement_header') for header in ['구분', '항목', '금액(원)', '비율(%)']])
+
+    for row, (kind, code, label, key, ratio) in enumerate(STATEMENT_LAYOUT, FIRST_LAYOUT_ROW):
+        if kind in ('blank', 'spacer'):
+            if kind == 'spacer':
+                ws.row_dimensions[row].height = 5
+            ws.append([None, None, None, _styled(ws, None, 'statement_border')])
+            continue
+
+        label_style, amount_style, ratio_style = ROW_STYLES[kind]
+        if kind in MERGED_ROWS:
+            cells = [_styled(ws, label, label_style), _styled(ws, None, label_style)]
+        else:
+            cells = [_styled(ws, code, label_style),
+                     _styled(ws, ('  ' + label) if kind == 'item' else label, label_style)]
+        value = _amount(calc_result, key) if key else None
+        cells.append(_styled(ws, value, amount_style))
+        if ratio is not None or kind in MERGED_ROWS:
+            cells.append(_styled(ws, _ratio(calc_result, value, ratio) if key else None, ratio_style))
+        else:
+            cells.append(_styled(ws, None, label_style))
+        ws.append(cells)
+
+
+def _write_comparison_sheet(ws, statements):
+    """기간을 열로 나란히 놓은 비교 시트 작성 (금액 행 + 매출총이익률 행)"""
+    ws.column_dimensions['A'].width = COLUMN_WIDTHS['A']
+    ws.column_dimensions['B'].width = COLUMN_WIDTHS['B']
+    for idx in range(len(statements)):
+        ws.column_dimensions[get_column_letter(idx + 3)].width = 24
+    ws.row_dimensions[1].height = 25
+
+    ws.append([_styled(ws, '기간별 손익계산서 비교', 'statement_title')])
+    ws.append([])
+    ws.append([_styled(ws, header, 'statement_header')
+               for header in ['구분', '항목'] + [statement['title'] for statement in statements]])
+
+    for kind, code, label, key, ratio in STATEMENT_LAYOUT:
+        if not key:
+            continue
+        label_style, amount_style, _ = ROW_STYLES[kind]
+        if kind in MERGED_ROWS:
+            cells = [_styled(ws, label, label_style), _styled(ws, None, label_style)]
+        else:
+            cells = [_styled(ws, code, label_style),
+                     _styled(ws, ('  ' + label) if kind == 'item' else label, label_style)]
+        cells += [_styled(ws, _amount(statement['calc_result'], key), amount_style) for statement in statements]
+        ws.append(cells)
+
+    margins = [_ratio(statement['calc_result'], statement['calc_result']['maechul_total_iik'], SHARE)
+               for statement in statements]
+    ws.append([_styled(ws, '매출총이익률(%)', 'statement_section'), _styled(ws, None, 'statement_section')]
+              + [_styled(ws, margin, 'statement_section_ratio') for margin in margins])
+
+
+def generate_comparison_excel(output_file, statements):
+    """
+    여러 기간의 손익계산서 비교 Excel 파일 생성
+
+    openpyxl 쓰기 전용 모드로 행을 바로 내보내므로 기간(시트)이 많아도 메모리 사용량이
+    셀 수에 비례해 늘지 않는다. 첫 시트는 기간별 비교, 이후 기간마다 손익계산서 한 장.
+
+    Args:
+        output_file: 출력 파일 경로 또는 쓰기 가능한 버퍼
+        statements: [{'title': 기간 이름, 'calc_result': calculate_totals() 결과}, ...]
+    """
+    wb = Workbook(write_only=True)
+    register_styles(wb)
+    used = set()
+
+    _write_comparison_sheet(wb.create_sheet(_sheet_title('비교', used)), statements)
+    for statement in statements:
+        ws = wb.create_sheet(_sheet_title(statement['title'], used))
+        _write_statement_sheet(ws, statement['title'], statement['calc_result'])
+
     wb.save(output_file)
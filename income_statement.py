@@ -2,48 +2,355 @@
 """
 손익계산서 생성 메인 모듈
 """
-from data_extractor import read_excel_data, extract_all_columns
-from calculator import calculate_totals
-from excel_generator import generate_excel
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
 
+import numpy as np
 
-def generate_income_statement(input_file, output_file):
+from data_extractor import (load_column_data, load_column_data_incremental, extract_transaction_period,
+                            is_settlement_sheet, parse_period, INTEGER_WON)
+from calculator import calculate_totals, calculate_totals_batch, column_matrix
+from excel_generator import generate_excel, generate_summary_excel, generate_comparison_excel, statement_preview
+from readers import list_sheets, file_format
+
+
+# 매장별 시트 변환 프로세스 수 (0이면 CPU 수)
+STORE_WORKERS = int(os.getenv('STORE_WORKERS', 0))
+
+# 증분 처리 사용 여부 (xlsx 업로드마다 모든 행을 해시하고 이전 레코드를 조회하므로 기본값은 사용 안 함)
+INCREMENTAL_INGEST = os.getenv('INCREMENTAL_INGEST', '0') == '1'
+
+
+def generate_income_statement(input_file, output_file, streaming=False, integer=None, find_state=None,
+                              load_sums=None):
     """
     입력 파일로부터 손익계산서 생성
     
     Args:
-        input_file: 입력 Excel 파일 경로
-        output_file: 출력 Excel 파일 경로
+        input_file: 입력 파일 경로 (.xlsx, .csv, .parquet)
+        output_file: 출력 Excel 파일 경로 또는 쓰기 가능한 버퍼 (BytesIO). None이면 Excel을 만들지
+                     않고 미리보기(statement)만 반환 (다운로드할 때 column_data로 생성)
+        streaming: True이면 xlsx를 데이터 프레임 없이 한 행씩 읽어 합계 계산 (대용량 파일용)
+        integer: True이면 금액을 int64로 읽고 계산하여 결과도 정수로 반환
+                 (없으면 INTEGER_WON 환경 변수)
+        find_state: 거래기간 → 이전 업로드 레코드를 반환하는 함수. 주어지면 xlsx
+                    (스트리밍 제외)는 이전 파일 뒤에 추가된 행만 처리한다
+                    (load_column_data_incremental)
+        load_sums: 이전 레코드 → 저장된 합계/큐브를 반환하는 함수 (앞부분이 같을 때만 호출)
     
     Returns:
         계산 결과 딕셔너리 (거래기간 포함)
     """
-    from data_extractor import extract_transaction_period
-    
-    # 0. 거래기간 추출
-    transaction_period = extract_transaction_period(input_file)
+    if integer is None:
+        integer = INTEGER_WON
     
-    # 1. 데이터 읽기
-    df_data = read_excel_data(input_file)
+    # 1. 파일 읽기 및 컬럼 데이터 추출 (한 번만 파싱하여 모든 단계에서 재사용)
+    if find_state and not streaming and file_format(input_file) == 'xlsx':
+        workbook, column_data = load_column_data_incremental(input_file, find_state, integer=integer,
+                                                             load_sums=load_sums)
+    else:
+        workbook, column_data = load_column_data(input_file, streaming=streaming, integer=integer)
     
-    # 2. 컬럼 데이터 추출
-    column_data = extract_all_columns(df_data)
+    # 2. 거래기간 추출
+    transaction_period = extract_transaction_period(workbook)
     
     # 3. 합계 계산
     calc_result = calculate_totals(column_data)
     
     # 4. Excel 생성
-    generate_excel(output_file, calc_result)
+    if output_file is not None:
+        generate_excel(output_file, calc_result)
     
-    # 5. 결과 반환
+    # 5. 결과 반환 (거래일별 큐브는 DB 저장용, 손익계산서 미리보기는 화면용으로 함께 전달)
+    result = summarize_result(transaction_period, calc_result, integer)
+    result['statement'] = statement_preview(calc_result)
+    result['daily_cube'] = workbook.daily_cube
+    result['column_data'] = serialize_column_data(column_data)
+    result['ingest_state'] = workbook.ingest_state
+    return result
+
+
+def no_previous_state(transaction_period):
+    """
+    이전 레코드를 조회할 수 없는 곳(작업 프로세스)에서 쓰는 find_state
+
+    항상 전체를 처리하지만 다음 업로드의 증분 처리에 쓸 상태(ingest_state)는 남긴다.
+    """
+    return None
+
+
+class PreloadedState:
+    """
+    요청 프로세스에서 미리 조회한 이전 레코드를 작업 프로세스로 넘기는 find_state
+
+    작업 프로세스는 DB를 조회할 수 없으므로, 업로드 파일의 프리앰블 거래기간으로 찾은 레코드를
+    담아 보내고 변환 중 추출한 거래기간이 같을 때만 돌려준다 (pickle 가능).
+    """
+
+    def __init__(self, transaction_period, record):
+        self.transaction_period = transaction_period
+        self.record = record
+
+    def __call__(self, transaction_period):
+        if transaction_period and transaction_period == self.transaction_period:
+            return self.record
+        return None
+
+
+def serialize_column_data(column_data):
+    """DB(JSON)에 저장할 항목별 합계 (NumPy 값을 int/float로 변환, 이력 재계산용)"""
+    return {key: value.item() if hasattr(value, 'item') else value
+            for key, value in column_data.items()}
+
+
+def recompute_results(records):
+    """
+    저장된 항목별 합계로 여러 레코드의 요약 결과를 한 번에 다시 계산 (계산식 수정 후 이력 갱신용)
+
+    Args:
+        records: 'transaction_period'와 'column_data'가 있는 레코드 목록
+
+    Returns:
+        레코드 순서대로 summarize_result() 형식 딕셔너리 목록
+    """
+    if not records:
+        return []
+    column_data = [record['column_data'] for record in records]
+    # 정수 원 단위로 저장된 레코드만 있으면 int64 행렬로 정확히 계산
+    integer = all(isinstance(value, int) for data in column_data for value in data.values())
+    totals = calculate_totals_batch(column_matrix(column_data, np.int64 if integer else np.float64))
+    return [summarize_result(record.get('transaction_period'),
+                             {name: values[idx] for name, values in totals.items()}, integer)
+            for idx, record in enumerate(records)]
+
+
+def summarize_result(transaction_period, calc_result, integer=False):
+    """
+    계산 결과에서 화면/DB용 요약 딕셔너리 생성
+
+    integer=True이면 금액을 파이썬 int로 변환한다 (JSON/DB에 정수 원 단위로 저장).
+    거래기간의 시작일/종료일('YYYY-MM-DD', 해석할 수 없으면 None)도 함께 넣어 DB의
+    period_start/period_end 컬럼에 저장한다.
+    """
+    amount = int if integer else float
+    period_start, period_end = parse_period(transaction_period)
     return {
         'transaction_period': transaction_period,
-        'total_maechul': float(calc_result['total_maechul']),
-        'maechul_wonka': float(calc_result['maechul_wonka']),
-        'maechul_total_iik': float(calc_result['maechul_total_iik']),
-        'ipgeum_total': float(calc_result['ipgeum_total']),
-        'jumun_jungae_total': float(calc_result['jumun_jungae_total']),
-        'baedalbi_total': float(calc_result['baedalbi_total']),
-        'gyeoljae_total': float(calc_result['gyeoljae_total']),
-        'urigagae_total': float(calc_result['urigagae_total'])
+        'period_start': period_start.isoformat() if period_start else None,
+        'period_end': period_end.isoformat() if period_end else None,
+        'total_maechul': amount(calc_result['total_maechul']),
+        'maechul_wonka': amount(calc_result['maechul_wonka']),
+        'maechul_total_iik': amount(calc_result['maechul_total_iik']),
+        'ipgeum_total': amount(calc_result['ipgeum_total']),
+        'jumun_jungae_total': amount(calc_result['jumun_jungae_total']),
+        'baedalbi_total': amount(calc_result['baedalbi_total']),
+        'gyeoljae_total': amount(calc_result['gyeoljae_total']),
+        'urigagae_total': amount(calc_result['urigagae_total'])
+    }
+
+
+# 큐브 조회 단위
+CUBE_FREQUENCIES = ('day', 'week')
+
+
+def cube_period_view(cube, freq='day'):
+    """
+    저장된 거래일별 큐브에서 일별/주별(월요일 시작) 손익 요약 목록 생성
+
+    Args:
+        cube: DailyCube.to_dict() 형식 딕셔너리
+        freq: 'day' 또는 'week'
+
+    Returns:
+        summarize_result() 형식 딕셔너리 목록 (기간 순, 'start'/'end' 날짜 포함)
+    """
+    if freq not in CUBE_FREQUENCIES:
+        raise ValueError(f"지원하지 않는 조회 단위입니다: {freq}")
+
+    items = cube['items']
+    buckets = {}
+    for day, values in sorted(cube['days'].items()):
+        current = date.fromisoformat(day)
+        start = current if freq == 'day' else current - timedelta(days=current.weekday())
+        bucket = buckets.setdefault(start, {'end': current, 'values': [0] * len(items)})
+        bucket['end'] = current
+        bucket['values'] = [total + value for total, value in zip(bucket['values'], values)]
+
+    views = []
+    for start, bucket in buckets.items():
+        calc_result = calculate_totals(dict(zip(items, bucket['values'])))
+        period = f"{start:%Y-%m-%d}" if freq == 'day' else f"{start:%Y-%m-%d} ~ {bucket['end']:%Y-%m-%d}"
+        view = summarize_result(period, calc_result)
+        view['start'] = start.isoformat()
+        view['end'] = bucket['end'].isoformat()
+        views.append(view)
+    return views
+
+
+def generate_comparison_statement(records, output_file):
+    """
+    저장된 레코드들로 기간별 비교 손익계산서 생성 (원본 파일은 읽지 않음)
+
+    Args:
+        records: 'id', 'transaction_period', 'column_data'(, 'store_name', 'period_start')가 있는 레코드 목록
+                 (period_start가 있으면 거래기간 문자열을 다시 해석하지 않음)
+        output_file: 출력 파일 경로 또는 쓰기 가능한 버퍼 (기간 조건은 DB 조회에서 이미 적용)
+
+    Returns:
+        포함한 레코드 id 목록 (거래기간 시작일, 매장 순)
+    """
+    dated = []
+    for record in records:
+        if not record.get('column_data'):
+            continue
+        start = record.get('period_start')
+        start = date.fromisoformat(start) if start else parse_period(record.get('transaction_period'))[0]
+        dated.append((start or date.max, record.get('store_name') or '', record['id'], record))
+    dated.sort(key=lambda entry: entry[:3])
+
+    statements = []
+    for _, store_name, record_id, record in dated:
+        title = record.get('transaction_period') or f"레코드 {record_id}"
+        statements.append({
+            'title': f"{store_name} {title}" if store_name else title,
+            'calc_result': calculate_totals(record['column_data'])
+        })
+    if not statements:
+        raise ValueError("비교할 레코드가 없습니다")
+
+    generate_comparison_excel(output_file, statements)
+    return [entry[2] for entry in dated]
+
+
+def _convert_sheet(input_file, sheet_index, store_name, output_file):
+    """
+    시트 하나를 손익계산서로 변환 (프로세스 풀 작업 단위)
+
+    정산 내역 시트가 아니면 None 반환
+    """
+    start = time.perf_counter()
+    workbook, column_data = load_column_data(input_file, sheet_index=sheet_index, integer=INTEGER_WON)
+    if not is_settlement_sheet(workbook):
+        return None
+
+    calc_result = calculate_totals(column_data)
+    generate_excel(output_file, calc_result)
+    return {
+        'store_name': store_name,
+        'sheet_index': sheet_index,
+        'output_file': output_file,
+        'result': summarize_result(extract_transaction_period(workbook), calc_result, INTEGER_WON),
+        'daily_cube': workbook.daily_cube,
+        'column_data': serialize_column_data(column_data),
+        'elapsed': time.perf_counter() - start
+    }
+
+
+def _convert_file(input_file, streaming):
+    """
+    업로드 파일 하나를 변환 (일괄 변환 프로세스 풀 작업 단위)
+
+    파일 하나의 오류가 다른 파일의 변환을 막지 않도록 예외는 결과의 'error'로 반환한다.
+    """
+    start = time.perf_counter()
+    try:
+        result = generate_income_statement(input_file, None, streaming=streaming,
+                                           find_state=no_previous_state if INCREMENTAL_INGEST else None)
+        result.pop('statement')
+        return {'result': result, 'error': None, 'elapsed': time.perf_counter() - start}
+    except Exception as e:
+        return {'result': None, 'error': str(e), 'elapsed': time.perf_counter() - start}
+
+
+def generate_batch_statements(input_files, streaming=None, max_workers=None):
+    """
+    여러 업로드 파일을 프로세스 풀에서 동시에 변환 (Excel은 만들지 않음)
+
+    Args:
+        input_files: 입력 파일 경로 목록 (.xlsx, .csv, .parquet)
+        streaming: 파일별 스트리밍 모드 여부 목록 (없으면 모두 False)
+        max_workers: 프로세스 수 (없으면 STORE_WORKERS, 그것도 0이면 CPU 수)
+
+    Returns:
+        입력 순서대로 [{'result': generate_income_statement() 결과 또는 None,
+                       'error': 오류 메시지 또는 None, 'elapsed': 초}, ...]
+    """
+    if not input_files:
+        return []
+    streaming = streaming or [False] * len(input_files)
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or STORE_WORKERS or min(len(input_files), os.cpu_count() or 1)) as pool:
+            return list(pool.map(_convert_file, input_files, streaming))
+    except (OSError, NotImplementedError) as e:
+        # 서버리스 환경 등 프로세스 풀을 만들 수 없으면 순차 처리
+        print(f"프로세스 풀을 사용할 수 없어 순차 처리합니다: {e}")
+        return [_convert_file(path, flag) for path, flag in zip(input_files, streaming)]
+
+
+def store_output_path(output_dir, prefix, store_name, taken=None):
+    """
+    매장별 출력 파일 경로 (파일명에 쓸 수 없는 문자는 _로 치환)
+
+    taken(이미 쓴 경로 집합)이 주어지면, 치환 후 이름이 같아지는 시트끼리 파일을 덮어쓰지 않도록
+    겹치는 경로에 _2, _3 ... 을 붙이고 결과 경로를 taken에 추가한다.
+    """
+    safe_name = re.sub(r'[\\/:*?"<>|\s]+', '_', store_name).strip('_') or 'store'
+    path = os.path.join(output_dir, f"{prefix}_{safe_name}.xlsx")
+    if taken is not None:
+        suffix = 2
+        while path in taken:
+            path = os.path.join(output_dir, f"{prefix}_{safe_name}_{suffix}.xlsx")
+            suffix += 1
+        taken.add(path)
+    return path
+
+
+def generate_store_statements(input_file, output_dir, prefix, max_workers=None):
+    """
+    매장별 시트가 여러 개인 워크북을 시트마다 손익계산서로 변환
+
+    시트마다 별도 프로세스에서 변환하고(프로세스 풀을 쓸 수 없는 환경에서는 순차 처리),
+    정산 내역이 아닌 시트는 건너뛴다. 모든 매장을 모은 요약 파일도 함께 생성한다.
+
+    Args:
+        input_file: 입력 Excel 파일 경로
+        output_dir: 출력 폴더
+        prefix: 출력 파일명 접두어
+        max_workers: 프로세스 수 (없으면 STORE_WORKERS, 그것도 0이면 CPU 수)
+
+    Returns:
+        {'stores': 매장별 결과 목록, 'skipped': 건너뛴 시트 이름 목록,
+         'summary_file': 요약 파일 경로, 'elapsed': 전체 소요 시간(초)}
+    """
+    start = time.perf_counter()
+    sheets = list_sheets(input_file)
+    summary_file = os.path.join(output_dir, f"{prefix}_요약.xlsx")
+    taken = {summary_file}
+    jobs = [(input_file, idx, name, store_output_path(output_dir, prefix, name, taken))
+            for idx, name in enumerate(sheets)]
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or STORE_WORKERS or min(len(jobs), os.cpu_count() or 1)) as pool:
+            converted = list(pool.map(_convert_sheet, *zip(*jobs)))
+    except (OSError, NotImplementedError) as e:
+        # 서버리스 환경 등 프로세스 풀을 만들 수 없으면 순차 처리
+        print(f"프로세스 풀을 사용할 수 없어 순차 처리합니다: {e}")
+        converted = [_convert_sheet(*job) for job in jobs]
+
+    stores = [store for store in converted if store is not None]
+    skipped = [name for name, store in zip(sheets, converted) if store is None]
+    if not stores:
+        raise ValueError("정산 내역 시트를 찾을 수 없습니다")
+
+    generate_summary_excel(summary_file, stores)
+
+    return {
+        'stores': stores,
+        'skipped': skipped,
+        'summary_file': summary_file,
+        'elapsed': time.perf_counter() - start
     }
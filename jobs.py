@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+비동기 변환 작업 모듈
+
+업로드 요청은 작업 id만 바로 돌려주고, 파싱/계산은 크기 제한이 있는 프로세스 풀에서,
+DB 저장 같은 후처리는 작업 스레드에서 실행한다. 작업 상태는 프로세스 메모리에 보관하므로
+웹 워커가 하나일 때(Procfile 기본값 gunicorn 워커 1개) 사용한다.
+"""
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# 동시에 실행할 변환 프로세스 수와 메모리에 보관할 작업 수
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+MAX_JOBS = int(os.getenv('JOB_HISTORY_SIZE', 200))
+
+# 작업 단계 (queued → converting → saving → done, 실패하면 failed)
+STAGES = ('queued', 'converting', 'saving', 'done', 'failed')
+
+
+class JobRegistry:
+    """
+    변환 작업 실행기와 상태 저장소
+
+    작업: id → {'id', 'status', 'stage', 'created', 'started', 'finished', 'response', 'error'}
+    status는 'queued', 'running', 'done', 'failed' 중 하나
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, max_jobs=MAX_JOBS):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._runner = None
+        self._pool = None
+
+    def _executors(self):
+        """실행기는 처음 작업을 받을 때 만든다 (gunicorn이 워커를 fork한 뒤)"""
+        with self._lock:
+            if self._runner is None:
+                self._runner = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._runner, self._pool
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def submit(self, convert, args, finish, cleanup=None):
+        """
+        작업 등록
+
+        Args:
+            convert: 프로세스 풀에서 실행할 변환 함수 (모듈 수준 함수여야 함)
+            args: convert 인자 튜플
+            finish: convert 결과를 받아 응답 딕셔너리를 반환하는 함수 (작업 스레드에서 실행)
+            cleanup: 실패했을 때 호출할 정리 함수
+
+        Returns:
+            작업 id
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                'id': job_id,
+                'status': 'queued',
+                'stage': 'queued',
+                'created': time.time(),
+                'started': None,
+                'finished': None,
+                'response': None,
+                'error': None
+            }
+            # 끝난 작업부터 오래된 순으로 제거
+            if len(self._jobs) > self.max_jobs:
+                for old_id in [key for key, job in self._jobs.items() if job['finished']]:
+                    if len(self._jobs) <= self.max_jobs:
+                        break
+                    del self._jobs[old_id]
+        runner, _ = self._executors()
+        runner.submit(self._run, job_id, convert, args, finish, cleanup)
+        return job_id
+
+    def _run(self, job_id, convert, args, finish, cleanup):
+        self._update(job_id, status='running', stage='converting', started=time.time())
+        try:
+            _, pool = self._executors()
+            result = pool.submit(convert, *args).result()
+            self._update(job_id, stage='saving')
+            response = finish(result)
+            self._update(job_id, status='done', stage='done', finished=time.time(), response=response)
+        except Exception as e:
+            traceback.print_exc()
+            if isinstance(e, BrokenProcessPool):
+                with self._lock:
+                    self._pool = None
+            if cleanup:
+                cleanup()
+            self._update(job_id, status='failed', stage='failed', finished=time.time(), error=str(e))
+
+    def get(self, job_id):
+        """작업 상태 사본 반환 (없으면 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+
+# 프로세스 공용 작업 저장소
+job_registry = JobRegistry()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+기록 정리(유지보수) 모듈
+
+보관 기간이 지난 레코드와 파일을 정리하고, 월별 통계 집계를 다시 계산하거나 점검한다. 웹 앱에서는 MaintenanceScheduler 스레드가
+주기적으로 실행하며, 여러 gunicorn 워커가 app.py를 import해도 잠금 파일을 잡은 워커
+하나만 실행한다 (그 워커가 종료되면 다른 워커가 이어받음). Vercel에서는 Cron이
+api/cleanup.py를 호출한다.
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# 보관 기간(일), 한 번에 삭제할 레코드 수, 실행 간격(초)
+RETENTION_DAYS = int(os.getenv('RETENTION_DAYS', 49))  # 7주
+CLEANUP_BATCH_SIZE = int(os.getenv('CLEANUP_BATCH_SIZE', 200))
+CLEANUP_INTERVAL = int(os.getenv('CLEANUP_INTERVAL_SECONDS', 86400))  # 24시간
+
+# 워커 사이 실행 담당 선출용 잠금 파일
+DEFAULT_LOCK_PATH = os.path.join(tempfile.gettempdir(), 'income_statement_maintenance.lock')
+LOCK_PATH = os.getenv('MAINTENANCE_LOCK_PATH', DEFAULT_LOCK_PATH)
+
+# 담당이 아닌 워커가 잠금을 다시 시도하는 간격(초)
+LEADER_RETRY_INTERVAL = 300
+
+
+def _remove_file(path):
+    """파일이 있으면 삭제 (삭제했으면 True)"""
+    if path and os.path.exists(path):
+        os.remove(path)
+        return True
+    return False
+
+
+def cleanup_old_records(supabase, retention_days=RETENTION_DAYS, batch_size=CLEANUP_BATCH_SIZE, on_deleted=None):
+    """
+    보관 기간이 지난 레코드와 파일 삭제
+
+    DB 함수(delete_old_income_statements) 한 번 호출로 id 순 batch_size개씩 삭제하고, 함수가
+    돌려준 삭제된 레코드의 파일만 지운다 (다운로드는 저장된 계산 결과로 만들므로 파일이 먼저
+    사라져도 문제없음). RLS 정책에 DELETE가 없으므로 함수는 service_role만 실행할 수 있다.
+
+    Args:
+        supabase: service_role 키로 만든 Supabase 클라이언트
+        retention_days: 보관 기간(일)
+        batch_size: 한 번에 조회/삭제할 레코드 수
+        on_deleted: 삭제한 레코드 id 목록을 받는 함수 (캐시 정리 등)
+
+    Returns:
+        {'deleted': 삭제한 레코드 수, 'files_removed': 삭제한 파일 수, 'batches': 삭제 요청 수,
+         'elapsed': 소요 시간(초), 'cutoff': 기준 시각, 'error': 오류 메시지 또는 None}
+    """
+    start = time.perf_counter()
+    cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+    metrics = {'deleted': 0, 'files_removed': 0, 'batches': 0, 'elapsed': 0.0, 'cutoff': cutoff, 'error': None}
+
+    try:
+        while True:
+            deleted = supabase.rpc('delete_old_income_statements',
+                                   {'cutoff': cutoff, 'batch_size': batch_size}).execute().data or []
+            metrics['batches'] += 1
+            if not deleted:
+                break
+
+            ids = [record['id'] for record in deleted]
+            metrics['deleted'] += len(ids)
+            if on_deleted:
+                on_deleted(ids)
+
+            for record in deleted:
+                for path in (record.get('input_file_path'), record.get('output_file_path')):
+                    try:
+                        metrics['files_removed'] += _remove_file(path)
+                    except OSError as e:
+                        print(f"파일 삭제 오류 (무시됨): {e}")
+
+            if len(deleted) < batch_size:
+                break
+    except Exception as e:
+        metrics['error'] = str(e)
+        print(f"자동 삭제 오류: {e}")
+
+    metrics['elapsed'] = round(time.perf_counter() - start, 3)
+    if metrics['deleted']:
+        print(f"✓ {metrics['deleted']}개의 오래된 레코드와 파일 {metrics['files_removed']}개를 삭제했습니다 "
+              f"({metrics['batches']}회, {metrics['elapsed']}초)")
+    return metrics
+
+
+def rebuild_monthly_rollup(supabase):
+    """
+    월별 통계 집계(income_statement_monthly)를 레코드 테이블에서 다시 계산
+
+    평소에는 DB 트리거가 레코드 저장/교체/삭제 때마다 집계를 갱신하므로 처음 설치할 때나
+    check_monthly_rollup()이 불일치를 찾았을 때만 실행한다. DB 함수는 service_role만 실행할 수
+    있으므로 service_role 키로 만든 클라이언트를 넘겨야 한다.
+
+    Returns:
+        {'months': 집계한 월 수, 'elapsed': 소요 시간(초)}
+    """
+    start = time.perf_counter()
+    months = supabase.rpc('rebuild_income_statement_monthly', {}).execute().data
+    elapsed = round(time.perf_counter() - start, 3)
+    print(f"✓ 월별 통계 집계를 다시 계산했습니다 ({months}개월, {elapsed}초)")
+    return {'months': months, 'elapsed': elapsed}
+
+
+def check_monthly_rollup(supabase):
+    """
+    월별 통계 집계와 레코드 테이블의 실제 합계 비교 (service_role 키 클라이언트 필요)
+
+    Returns:
+        {'consistent': 일치 여부, 'mismatches': 다른 월 목록 (월, 집계값, 실제값), 'elapsed': 소요 시간(초)}
+    """
+    start = time.perf_counter()
+    mismatches = supabase.rpc('check_income_statement_monthly', {}).execute().data or []
+    elapsed = round(time.perf_counter() - start, 3)
+    if mismatches:
+        print(f"월별 통계 집계 불일치: {len(mismatches)}개월 ({', '.join(row['month'] or '(기간 없음)' for row in mismatches)})")
+    return {'consistent': not mismatches, 'mismatches': mismatches, 'elapsed': elapsed}
+
+
+class MaintenanceScheduler:
+    """
+    워커 하나에서만 주기적으로 작업을 실행하는 스케줄러
+
+    잠금 파일에 배타적 잠금(fcntl.flock)을 잡은 프로세스가 담당이 되며, 잠금은 프로세스가
+    끝나면 운영체제가 풀어 준다. fcntl이 없는 환경에서는 잠금 없이 실행한다.
+    """
+
+    def __init__(self, task, interval=CLEANUP_INTERVAL, lock_path=LOCK_PATH):
+        self.task = task
+        self.interval = interval
+        self.lock_path = lock_path
+        self.is_leader = False
+        self.last_metrics = None
+        self.last_run = None
+        self._lock_file = None
+        self._thread = None
+
+    def _acquire(self):
+        """담당 잠금 시도 (이미 다른 워커가 잡고 있으면 False)"""
+        if fcntl is None:
+            return True
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _loop(self):
+        while not self.is_leader:
+            try:
+                self.is_leader = self._acquire()
+            except OSError as e:
+                print(f"유지보수 잠금 오류: {e}")
+            if not self.is_leader:
+                time.sleep(LEADER_RETRY_INTERVAL)
+        print(f"✓ 유지보수 스케줄러 담당 워커 (pid={os.getpid()})")
+
+        while True:
+            try:
+                self.last_metrics = self.task()
+                self.last_run = datetime.now().isoformat()
+            except Exception as e:
+                print(f"스케줄러 오류: {e}")
+            time.sleep(self.interval)
+
+    def start(self):
+        """백그라운드 스레드 시작 (여러 번 호출해도 한 번만 시작)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True, name='maintenance')
+            self._thread.start()
+        return self
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'is_leader': self.is_leader,
+            'interval': self.interval,
+            'last_run': self.last_run,
+            'last_metrics': self.last_metrics
+        }
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+스프레드시트 읽기 백엔드 모듈
+
+백엔드는 (입력, 시트 번호)를 받아 행 단위 값 튜플을 차례로 돌려주는 함수이다.
+입력은 파일 경로 또는 이름(name, 확장자로 형식 판별)이 있는 바이너리 버퍼(SpooledUpload 등)이며,
+버퍼는 읽을 때마다 처음으로 되감는다.
+openpyxl 읽기 전용 스트리밍이 기본 백엔드이며, 더 빠른 엔진(python-calamine)이
+설치되어 있으면 자동으로 사용한다. EXCEL_READER 환경 변수로 백엔드를 고정할 수 있다.
+
+CSV와 Parquet은 행 단위가 아니라 청크/컬럼 단위로 읽는 편이 빠르므로,
+여기서는 형식 판별과 헤더 부분 읽기만 제공하고 합계는 data_extractor에서 계산한다.
+"""
+import csv
+import importlib.util
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+
+from openpyxl import load_workbook
+
+
+class SpooledUpload(tempfile.SpooledTemporaryFile):
+    """
+    이름이 있는 업로드 버퍼
+
+    max_size 바이트까지는 메모리에만 있고 넘으면 임시 파일로 옮겨진다. 이름은 형식 판별과
+    저장 파일명에만 쓰며 디스크 경로가 아니다.
+    """
+
+    def __init__(self, name, max_size):
+        super().__init__(max_size=max_size)
+        self.upload_name = name
+
+    @property
+    def name(self):
+        return self.upload_name
+
+
+def is_buffer(source):
+    """입력이 경로가 아닌 파일 객체인지 확인"""
+    return hasattr(source, 'read')
+
+
+def rewind(source):
+    """버퍼이면 처음으로 되감아서, 경로이면 그대로 반환"""
+    if is_buffer(source):
+        source.seek(0)
+    return source
+
+
+@contextmanager
+def open_binary(source):
+    """경로 또는 버퍼를 바이너리로 읽기 (버퍼는 닫지 않음)"""
+    if is_buffer(source):
+        yield rewind(source)
+    else:
+        with open(source, 'rb') as f:
+            yield f
+
+
+@contextmanager
+def open_text(source, encoding):
+    """경로 또는 버퍼를 텍스트(CSV)로 읽기 (버퍼는 닫지 않음)"""
+    if not is_buffer(source):
+        with open(source, newline='', encoding=encoding) as f:
+            yield f
+        return
+    wrapper = io.TextIOWrapper(rewind(source), encoding=encoding, newline='')
+    try:
+        yield wrapper
+    finally:
+        wrapper.detach()
+
+
+def _iter_rows_openpyxl(file_path, sheet_index=0):
+    """openpyxl 읽기 전용 모드 (기본 백엔드)"""
+    wb = load_workbook(rewind(file_path), read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_index]
+        ws.reset_dimensions()
+        for row in ws.iter_rows(values_only=True):
+            yield row
+    finally:
+        wb.close()
+
+
+def _calamine_value(value):
+    """calamine 셀 값을 openpyxl과 같은 형태로 변환 (빈 셀 None, 정수 실수는 int)"""
+    if value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _iter_rows_calamine(file_path, sheet_index=0):
+    """python-calamine (Rust 기반, 설치된 경우에만 사용)"""
+    from python_calamine import CalamineWorkbook
+
+    if is_buffer(file_path):
+        wb = CalamineWorkbook.from_filelike(rewind(file_path))
+    else:
+        wb = CalamineWorkbook.from_path(file_path)
+    try:
+        sheet = wb.get_sheet_by_index(sheet_index)
+        for row in sheet.iter_rows():
+            yield tuple(_calamine_value(value) for value in row)
+    finally:
+        wb.close()
+
+
+# 백엔드 이름 → (행 이터레이터, 필요한 모듈). 자동 선택 시 앞쪽부터 우선
+READER_BACKENDS = {
+    'calamine': (_iter_rows_calamine, 'python_calamine'),
+    'openpyxl': (_iter_rows_openpyxl, 'openpyxl'),
+}
+
+DEFAULT_BACKEND = 'openpyxl'
+
+
+def is_available(name):
+    """백엔드에 필요한 모듈이 설치되어 있는지 확인"""
+    if name not in READER_BACKENDS:
+        return False
+    return importlib.util.find_spec(READER_BACKENDS[name][1]) is not None
+
+
+def available_backends():
+    """사용 가능한 백엔드 이름 목록 (우선순위 순)"""
+    return [name for name in READER_BACKENDS if is_available(name)]
+
+
+def select_backend(name=None):
+    """
+    사용할 백엔드 이름 결정
+
+    name이 없으면 EXCEL_READER 환경 변수(기본 'auto')를 따른다. 'auto'는 설치된
+    백엔드 중 가장 빠른 것을, 지정한 백엔드가 없으면 기본 백엔드를 사용한다.
+    """
+    name = name or os.getenv('EXCEL_READER', 'auto')
+    if name == 'auto':
+        return available_backends()[0]
+    if is_available(name):
+        return name
+    print(f"⚠️  '{name}' 읽기 백엔드를 사용할 수 없어 {DEFAULT_BACKEND}(으)로 읽습니다.")
+    return DEFAULT_BACKEND
+
+
+def list_sheets(file_path):
+    """Excel 파일의 시트 이름 목록 (시트 순서대로)"""
+    wb = load_workbook(rewind(file_path), read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def iter_sheet_rows(file_path, sheet_index=0, backend=None):
+    """시트의 행을 값 튜플로 차례로 반환"""
+    iter_rows, _ = READER_BACKENDS[select_backend(backend)]
+    return iter_rows(file_path, sheet_index)
+
+
+# 확장자 → 입력 형식
+FILE_FORMATS = {
+    '.xlsx': 'xlsx',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+}
+
+
+def file_format(file_path):
+    """파일 확장자로 입력 형식 판별 (버퍼는 name 속성, 지원하지 않으면 None)"""
+    return FILE_FORMATS.get(os.path.splitext(str(getattr(file_path, 'name', file_path)))[1].lower())
+
+
+def detect_csv_encoding(file_path, sample_size=64 * 1024):
+    """CSV 인코딩 판별 (UTF-8이 아니면 국내 회계 프로그램 기본값인 CP949로 간주)"""
+    with open_binary(file_path) as f:
+        sample = f.read(sample_size)
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # 샘플 끝에서 멀티바이트 문자가 잘린 경우는 UTF-8로 본다
+        if e.start < len(sample) - 3:
+            return 'cp949'
+    return 'utf-8-sig'
+
+
+def read_csv_head(file_path, encoding, n_rows):
+    """CSV 앞부분 n_rows개 행을 값 리스트로 반환 (빈 문자열은 None)"""
+    with open_text(file_path, encoding) as f:
+        lines = [line for _, line in zip(range(n_rows), f)]
+    return [[value if value != '' else None for value in row] for row in csv.reader(lines)]
+
+
+def import_parquet():
+    """pyarrow.parquet 모듈 반환 (설치되지 않았으면 안내 메시지와 함께 오류)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet 파일을 읽으려면 pyarrow 패키지가 필요합니다 (pip install pyarrow)")
+    return pq
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+생성된 손익계산서 버퍼 캐시 모듈
+
+손익계산서 xlsx는 저장된 계산 결과로 다운로드할 때마다 메모리에서 만들 수 있으므로
+디스크(OUTPUT_FOLDER)에 보관하지 않는다. 같은 레코드를 여러 번 내려받는 경우를 위해
+최근에 만든 버퍼만 프로세스 메모리에 크기 제한을 두고 보관한다.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+
+MAX_ENTRIES = int(os.getenv('STATEMENT_CACHE_SIZE', 32))
+MAX_BYTES = int(os.getenv('STATEMENT_CACHE_MAX_BYTES', 8 * 1024 * 1024))  # 8MB
+
+
+class RenderCache:
+    """
+    항목 수와 전체 바이트 수 제한이 있는 LRU 버퍼 캐시
+
+    항목: 키(레코드 id 등) → xlsx 바이트
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """캐시된 버퍼 반환 (없으면 None)"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        """버퍼 저장 (제한을 넘으면 가장 오래 사용하지 않은 항목부터 제거)"""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def discard(self, key):
+        """레코드가 삭제/교체되었을 때 항목 제거"""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# 프로세스 공용 캐시
+statement_cache = RenderCache()
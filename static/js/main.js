@@ -3,6 +3,7 @@ const uploadBox = document.getElementById("uploadBox");
 const fileInput = document.getElementById("fileInput");
 const progress = document.getElementById("progress");
 const result = document.getElementById("result");
+const ALLOWED_EXTENSIONS = [".xlsx", ".csv", ".parquet"];
 
 // 드래그 앤 드롭
 uploadBox.addEventListener("dragover", (e) => {
@@ -33,8 +34,9 @@ fileInput.addEventListener("change", (e) => {
 
 // 파일 처리
 function handleFile(file) {
-  if (!file.name.endsWith(".xlsx")) {
-    alert("Excel 파일(.xlsx)만 업로드 가능합니다.");
+  const name = file.name.toLowerCase();
+  if (!ALLOWED_EXTENSIONS.some((ext) => name.endsWith(ext))) {
+    alert("Excel(.xlsx), CSV(.csv), Parquet(.parquet) 파일만 업로드 가능합니다.");
     return;
   }
 
@@ -51,12 +53,17 @@ async function uploadFile(file) {
   progress.style.display = "block";
 
   try {
-    const response = await fetch("/upload", {
+    // 작업 모드가 켜져 있으면(워커 하나인 배포) 작업으로 올리고 완료될 때까지 상태 조회
+    const jobMode = uploadBox.dataset.jobMode === "1";
+    const response = await fetch(jobMode ? "/upload?mode=job" : "/upload", {
       method: "POST",
       body: formData,
     });
 
-    const data = await response.json();
+    let data = await response.json();
+    if (data.success && data.job_id) {
+      data = await waitForJob(data.status_url);
+    }
 
     if (data.success) {
       showResult(data);
@@ -69,6 +76,31 @@ async function uploadFile(file) {
   }
 }
 
+// 변환 작업 상태 조회 (완료되면 동기 변환과 같은 응답 반환)
+const JOB_POLL_INTERVAL = 500;
+const JOB_STAGE_LABELS = {
+  queued: "변환 대기 중...",
+  converting: "변환 중...",
+  saving: "결과 저장 중...",
+};
+
+async function waitForJob(statusUrl) {
+  const progressText = document.getElementById("progressText");
+  while (true) {
+    const response = await fetch(statusUrl);
+    const job = await response.json();
+
+    if (job.status === "done") {
+      return job.response;
+    }
+    if (job.status === "failed" || !response.ok) {
+      return { success: false, error: job.error };
+    }
+    progressText.textContent = JOB_STAGE_LABELS[job.stage] || "변환 중...";
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL));
+  }
+}
+
 // 결과 표시
 function showResult(data) {
   progress.style.display = "none";
@@ -83,6 +115,15 @@ function showResult(data) {
     result.insertBefore(updateNotice, result.firstChild);
   }
 
+  // 동일 파일 재업로드 안내
+  if (data.cache === "hit") {
+    const cacheNotice = document.createElement("div");
+    cacheNotice.style.cssText =
+      "background: #e7f1ff; border: 1px solid #b8daff; color: #004085; padding: 12px; border-radius: 4px; margin-bottom: 15px;";
+    cacheNotice.textContent = "이미 변환한 파일과 동일하여 이전 변환 결과를 불러왔습니다.";
+    result.insertBefore(cacheNotice, result.firstChild);
+  }
+
   // 숫자 포맷팅
   const formatNumber = (num) => {
     return new Intl.NumberFormat("ko-KR").format(Math.round(num)) + "원";
@@ -101,9 +142,45 @@ function showResult(data) {
     data.result.ipgeum_total
   );
 
+  // 손익계산서 미리보기 (Excel 파일은 다운로드할 때 생성)
+  if (data.statement) {
+    renderStatement(data.statement);
+  }
+
   // 다운로드 버튼
   const downloadBtn = document.getElementById("downloadBtn");
   downloadBtn.onclick = () => {
-    window.location.href = "/download/" + data.output_filename;
+    window.location.href = data.download_url || "/download/" + data.output_filename;
   };
 }
+
+// 손익계산서 미리보기 표 (Excel과 같은 구성)
+const MERGED_KINDS = ["section", "section_title", "deposit", "profit"];
+
+function renderStatement(rows) {
+  const formatAmount = (num) =>
+    num === null ? "" : new Intl.NumberFormat("ko-KR").format(Math.round(num));
+  const formatRatio = (num) => (num === null ? "" : Number(num).toFixed(1));
+
+  const tbody = document.getElementById("statementBody");
+  tbody.innerHTML = "";
+  rows.forEach((row) => {
+    const tr = document.createElement("tr");
+    tr.className = row.kind === "section_title" ? "section" : row.kind;
+
+    const cells = MERGED_KINDS.includes(row.kind)
+      ? [[row.label, 2]]
+      : [[row.code], [row.label]];
+    cells.push([formatAmount(row.amount), 1, "number"]);
+    cells.push([formatRatio(row.ratio), 1, "number"]);
+
+    cells.forEach(([text, colspan, className]) => {
+      const td = document.createElement("td");
+      td.textContent = text || "";
+      if (colspan > 1) td.colSpan = colspan;
+      if (className) td.className = className;
+      tr.appendChild(td);
+    });
+    tbody.appendChild(tr);
+  });
+}
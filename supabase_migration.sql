@@ -5,3 +5,408 @@ ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS transaction_period TEXT;
 
 -- 인덱스 추가 (거래기간으로 검색 최적화)
 CREATE INDEX IF NOT EXISTS idx_transaction_period ON income_statements(transaction_period);
+
+-- 업로드 파일 내용 해시와 변환 결과 (동일 파일 재업로드 시 재변환 없이 결과 재사용)
+ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS result JSONB;
+
+CREATE INDEX IF NOT EXISTS idx_content_hash ON income_statements(content_hash);
+
+-- 매장 이름 (매장별 시트 워크북 업로드 시 시트 이름, 단일 파일 업로드는 NULL)
+ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS store_name TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_store_period ON income_statements(store_name, transaction_period);
+
+-- 기록 목록 키셋 페이지 ((upload_date, id) 내림차순, /api/records와 /admin/data)
+CREATE INDEX IF NOT EXISTS idx_upload_date_id ON income_statements(upload_date DESC, id DESC);
+
+-- 거래일별 항목 합계 큐브 ({"items": [...], "days": {"YYYY-MM-DD": [...]}})
+-- 일별/주별 조회(/api/record/<id>/daily)는 원본 파일 대신 이 값을 사용
+ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS daily_cube JSONB;
+
+-- 항목별(f~ae) 기간 합계 - 계산식이 바뀌면 /admin/recompute로 원본 파일 없이 결과 재계산
+ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS column_data JSONB;
+
+-- 증분 처리 상태 (처리한 행 수, 앞부분 행 해시, 헤더 지문 등)
+-- 같은 거래기간 파일이 뒤에 행만 추가되어 다시 올라오면 추가된 행만 처리
+ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS ingest_state JSONB;
+
+-- 거래기간 시작일/종료일 (업로드 때 앱이 transaction_period를 해석해 함께 저장)
+-- 기간 조회(/api/records?from=&to=, /admin/export/comparison)는 문자열 대신 이 컬럼의 인덱스를 사용
+ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS period_start DATE;
+ALTER TABLE income_statements ADD COLUMN IF NOT EXISTS period_end DATE;
+
+CREATE INDEX IF NOT EXISTS idx_period_start ON income_statements(period_start);
+CREATE INDEX IF NOT EXISTS idx_period_end ON income_statements(period_end);
+
+-- 거래기간 문자열 → 시작일/종료일 (data_extractor.parse_period와 같은 규칙: 연도가 있는 날짜의
+-- 처음과 마지막, "07-26-08-26"처럼 연도가 없으면 NULL). 기존 레코드 채우기용.
+CREATE OR REPLACE FUNCTION income_statement_period_dates(period TEXT, OUT period_start DATE, OUT period_end DATE)
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+    m TEXT[];
+    d DATE;
+BEGIN
+    FOR m IN SELECT regexp_matches(period, '(\d{4})[-./](\d{1,2})[-./](\d{1,2})', 'g')
+    LOOP
+        BEGIN
+            d := make_date(m[1]::INT, m[2]::INT, m[3]::INT);
+        EXCEPTION WHEN datetime_field_overflow THEN
+            CONTINUE;
+        END;
+        IF period_start IS NULL THEN
+            period_start := d;
+        END IF;
+        period_end := d;
+    END LOOP;
+END;
+$$;
+
+-- 기존 레코드 채우기 (이미 채운 레코드는 건너뜀)
+UPDATE income_statements
+SET (period_start, period_end) = (SELECT p.period_start, p.period_end FROM income_statement_period_dates(transaction_period) p)
+WHERE period_start IS NULL AND transaction_period IS NOT NULL;
+
+-- 같은 (매장, 거래기간) 레코드 교체를 한 번의 요청으로 처리하는 함수
+-- 기존 레코드 삭제와 새 레코드 저장을 한 트랜잭션에서 실행하고, 삭제한 레코드의 파일 경로를
+-- 돌려주어 앱이 파일을 나중에 지우게 한다. 같은 키의 동시 업로드는 advisory lock으로 차례로 처리.
+-- new_rows: 저장할 레코드 JSON 배열 (income_statements 컬럼 이름)
+-- 반환: {"ids": [새 레코드 id, ...], "removed": [{"id", "input_file_path", "output_file_path"}, ...]}
+--       (removed의 경로는 다른 레코드가 아직 쓰고 있으면 NULL)
+-- anon 키의 RLS 정책에는 DELETE가 없으므로 소유자 권한(SECURITY DEFINER)으로 실행하고, 아래에서
+-- 실행 권한을 service_role에만 주어 공개 anon 키로는 /rpc/replace_income_statements를 호출할 수 없게 한다.
+CREATE OR REPLACE FUNCTION replace_income_statements(new_rows JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    item JSONB;
+    rec income_statements;
+    new_id BIGINT;
+    ids JSONB := '[]'::JSONB;
+    removed JSONB := '[]'::JSONB;
+BEGIN
+    FOR item IN SELECT * FROM jsonb_array_elements(new_rows)
+    LOOP
+        rec := jsonb_populate_record(NULL::income_statements, item);
+
+        IF rec.transaction_period IS NOT NULL THEN
+            PERFORM pg_advisory_xact_lock(hashtext(COALESCE(rec.store_name, '') || '|' || rec.transaction_period));
+
+            WITH deleted AS (
+                DELETE FROM income_statements
+                WHERE transaction_period = rec.transaction_period
+                  AND store_name IS NOT DISTINCT FROM rec.store_name
+                RETURNING id, input_file_path, output_file_path
+            )
+            SELECT removed || COALESCE(jsonb_agg(to_jsonb(deleted)), '[]'::JSONB) INTO removed FROM deleted;
+        END IF;
+
+        INSERT INTO income_statements (
+            upload_filename, store_name, transaction_period, period_start, period_end,
+            input_file_path, output_file_path, upload_date, total_sales, total_cost, gross_profit, deposit_amount,
+            content_hash, result, daily_cube, column_data, ingest_state
+        ) VALUES (
+            rec.upload_filename, rec.store_name, rec.transaction_period, rec.period_start, rec.period_end,
+            rec.input_file_path, rec.output_file_path, COALESCE(rec.upload_date, NOW()), rec.total_sales, rec.total_cost,
+            rec.gross_profit, rec.deposit_amount, rec.content_hash, rec.result, rec.daily_cube, rec.column_data, rec.ingest_state
+        )
+        RETURNING id INTO new_id;
+
+        ids := ids || to_jsonb(new_id);
+    END LOOP;
+
+    -- 남은 레코드가 아직 쓰는 파일(매장별 업로드의 공유 원본 등)은 지우지 않도록 경로를 비움
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'id', r.id,
+        'input_file_path', CASE WHEN EXISTS (SELECT 1 FROM income_statements s WHERE s.input_file_path = r.input_file_path)
+                                THEN NULL ELSE r.input_file_path END,
+        'output_file_path', CASE WHEN EXISTS (SELECT 1 FROM income_statements s WHERE s.output_file_path = r.output_file_path)
+                                 THEN NULL ELSE r.output_file_path END
+    )), '[]'::JSONB)
+    INTO removed
+    FROM jsonb_to_recordset(removed) AS r(id BIGINT, input_file_path TEXT, output_file_path TEXT);
+
+    RETURN jsonb_build_object('ids', ids, 'removed', removed);
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION replace_income_statements(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION replace_income_statements(JSONB) TO service_role;
+
+-- 계산식 재계산(/admin/recompute) 결과를 한 번의 요청으로 저장하는 함수
+-- updates: [{"id", "total_sales", "total_cost", "gross_profit", "deposit_amount", "period_start",
+--            "period_end", "result"}, ...]
+-- 반환: 갱신한 레코드 수
+-- 어떤 레코드의 결과든 덮어쓸 수 있으므로 service_role만 실행 (관리자 비밀번호를 확인한 서버만 호출)
+CREATE OR REPLACE FUNCTION update_income_statement_results(updates JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE income_statements s
+    SET total_sales = u.total_sales,
+        total_cost = u.total_cost,
+        gross_profit = u.gross_profit,
+        deposit_amount = u.deposit_amount,
+        period_start = u.period_start,
+        period_end = u.period_end,
+        result = u.result
+    FROM jsonb_to_recordset(updates) AS u(
+        id BIGINT, total_sales NUMERIC, total_cost NUMERIC, gross_profit NUMERIC, deposit_amount NUMERIC,
+        period_start DATE, period_end DATE, result JSONB
+    )
+    WHERE s.id = u.id;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION update_income_statement_results(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION update_income_statement_results(JSONB) TO service_role;
+
+-- 보관 기간이 지난 레코드를 id 순으로 batch_size개씩 삭제하는 함수 (maintenance.cleanup_old_records)
+-- anon 키의 RLS 정책에는 DELETE가 없으므로 소유자 권한으로 실행하고 service_role만 호출할 수 있게 한다.
+-- 반환: 삭제한 레코드 [{"id", "input_file_path", "output_file_path"}, ...]
+--       (경로는 남은 레코드가 아직 쓰고 있으면 NULL)
+CREATE OR REPLACE FUNCTION delete_old_income_statements(cutoff TIMESTAMP WITH TIME ZONE, batch_size INTEGER)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    removed JSONB;
+BEGIN
+    WITH deleted AS (
+        DELETE FROM income_statements
+        WHERE id IN (
+            SELECT id FROM income_statements
+            WHERE upload_date < cutoff
+            ORDER BY id
+            LIMIT batch_size
+        )
+        RETURNING id, input_file_path, output_file_path
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(deleted) ORDER BY id), '[]'::JSONB) INTO removed FROM deleted;
+
+    -- 남은 레코드가 아직 쓰는 파일(매장별 업로드의 공유 원본 등)은 지우지 않도록 경로를 비움
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'id', r.id,
+        'input_file_path', CASE WHEN EXISTS (SELECT 1 FROM income_statements s WHERE s.input_file_path = r.input_file_path)
+                                THEN NULL ELSE r.input_file_path END,
+        'output_file_path', CASE WHEN EXISTS (SELECT 1 FROM income_statements s WHERE s.output_file_path = r.output_file_path)
+                                 THEN NULL ELSE r.output_file_path END
+    ) ORDER BY r.id), '[]'::JSONB)
+    INTO removed
+    FROM jsonb_to_recordset(removed) AS r(id BIGINT, input_file_path TEXT, output_file_path TEXT);
+
+    RETURN removed;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION delete_old_income_statements(TIMESTAMP WITH TIME ZONE, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION delete_old_income_statements(TIMESTAMP WITH TIME ZONE, INTEGER) TO service_role;
+
+-- (매장, 거래기간)마다 레코드 하나만 있도록 보장 (매장 없는 업로드는 빈 문자열로 취급)
+-- 예전에는 RLS 때문에 교체 시 삭제가 적용되지 않아 중복이 남아 있을 수 있으므로, 인덱스를 만들기 전에
+-- (매장, 거래기간)마다 가장 최근(upload_date, id) 레코드만 남긴다.
+DELETE FROM income_statements older
+USING income_statements newer
+WHERE older.transaction_period IS NOT NULL
+  AND newer.transaction_period = older.transaction_period
+  AND COALESCE(newer.store_name, '') = COALESCE(older.store_name, '')
+  AND (COALESCE(older.upload_date, '-infinity'), older.id) < (COALESCE(newer.upload_date, '-infinity'), newer.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_store_period_unique
+    ON income_statements (COALESCE(store_name, ''), transaction_period)
+    WHERE transaction_period IS NOT NULL;
+
+-- 월별 통계 집계 테이블 (/admin/statistics)
+-- 레코드가 저장/교체/삭제될 때 트리거가 해당 월의 합계만 더하고 빼므로 통계 조회는 전체 레코드 대신
+-- 이 테이블의 몇 행만 읽는다. month는 거래기간 종료일(period_end)의 'YYYY-MM' (종료일이 없으면 빈 문자열,
+-- 전체 합계에만 포함).
+CREATE TABLE IF NOT EXISTS income_statement_monthly (
+    month TEXT PRIMARY KEY,
+    record_count BIGINT NOT NULL DEFAULT 0,
+    total_sales NUMERIC NOT NULL DEFAULT 0,
+    total_cost NUMERIC NOT NULL DEFAULT 0,
+    gross_profit NUMERIC NOT NULL DEFAULT 0,
+    deposit_amount NUMERIC NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE income_statement_monthly ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Enable read access for all users" ON income_statement_monthly;
+CREATE POLICY "Enable read access for all users" ON income_statement_monthly
+    FOR SELECT USING (true);
+
+-- 집계 월 ('YYYY-MM') - 업로드 때 저장한 거래기간 종료일(period_end) 기준, 없으면 빈 문자열
+-- (거래기간 문자열을 여기서 다시 해석하지 않음. 예전 텍스트 해석 함수는 제거)
+DROP FUNCTION IF EXISTS income_statement_month(TEXT);
+
+CREATE OR REPLACE FUNCTION income_statement_month(period_end DATE)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT COALESCE(to_char(period_end, 'YYYY-MM'), '');
+$$;
+
+-- 문장 단위 트리거: 변경된 레코드(old_rows는 빼고 new_rows는 더함)를 월별로 묶어 한 번에 반영
+-- 정리 작업의 일괄 삭제나 교체 함수처럼 여러 행을 바꿔도 월마다 한 번만 갱신한다.
+CREATE OR REPLACE FUNCTION income_statement_monthly_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO income_statement_monthly AS m
+            (month, record_count, total_sales, total_cost, gross_profit, deposit_amount)
+        SELECT income_statement_month(period_end), -COUNT(*),
+               -COALESCE(SUM(total_sales), 0), -COALESCE(SUM(total_cost), 0),
+               -COALESCE(SUM(gross_profit), 0), -COALESCE(SUM(deposit_amount), 0)
+        FROM old_rows
+        GROUP BY 1
+        ORDER BY 1  -- 여러 월을 같은 순서로 잠가 교착 방지
+        ON CONFLICT (month) DO UPDATE SET
+            record_count = m.record_count + EXCLUDED.record_count,
+            total_sales = m.total_sales + EXCLUDED.total_sales,
+            total_cost = m.total_cost + EXCLUDED.total_cost,
+            gross_profit = m.gross_profit + EXCLUDED.gross_profit,
+            deposit_amount = m.deposit_amount + EXCLUDED.deposit_amount,
+            updated_at = NOW();
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO income_statement_monthly AS m
+            (month, record_count, total_sales, total_cost, gross_profit, deposit_amount)
+        SELECT income_statement_month(period_end), COUNT(*),
+               COALESCE(SUM(total_sales), 0), COALESCE(SUM(total_cost), 0),
+               COALESCE(SUM(gross_profit), 0), COALESCE(SUM(deposit_amount), 0)
+        FROM new_rows
+        GROUP BY 1
+        ORDER BY 1
+        ON CONFLICT (month) DO UPDATE SET
+            record_count = m.record_count + EXCLUDED.record_count,
+            total_sales = m.total_sales + EXCLUDED.total_sales,
+            total_cost = m.total_cost + EXCLUDED.total_cost,
+            gross_profit = m.gross_profit + EXCLUDED.gross_profit,
+            deposit_amount = m.deposit_amount + EXCLUDED.deposit_amount,
+            updated_at = NOW();
+    END IF;
+
+    DELETE FROM income_statement_monthly WHERE record_count = 0;
+    RETURN NULL;
+END;
+$$;
+
+-- 트리거로만 실행되므로 누구에게도 실행 권한을 주지 않음
+REVOKE EXECUTE ON FUNCTION income_statement_monthly_trigger() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS income_statement_monthly_insert ON income_statements;
+CREATE TRIGGER income_statement_monthly_insert
+    AFTER INSERT ON income_statements
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION income_statement_monthly_trigger();
+
+DROP TRIGGER IF EXISTS income_statement_monthly_update ON income_statements;
+CREATE TRIGGER income_statement_monthly_update
+    AFTER UPDATE ON income_statements
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION income_statement_monthly_trigger();
+
+DROP TRIGGER IF EXISTS income_statement_monthly_delete ON income_statements;
+CREATE TRIGGER income_statement_monthly_delete
+    AFTER DELETE ON income_statements
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION income_statement_monthly_trigger();
+
+-- 레코드 테이블에서 월별 집계를 다시 계산 (처음 설치할 때, 또는 점검에서 불일치가 나왔을 때)
+-- 다시 계산하는 동안 레코드 변경은 잠시 기다린다. 반환: 집계한 월 수
+-- 전체 테이블을 잠그고 다시 읽으므로 service_role만 실행 (관리자 비밀번호를 확인한 서버만 호출)
+CREATE OR REPLACE FUNCTION rebuild_income_statement_monthly()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    months INTEGER;
+BEGIN
+    LOCK TABLE income_statements IN SHARE MODE;
+    DELETE FROM income_statement_monthly;
+
+    INSERT INTO income_statement_monthly
+        (month, record_count, total_sales, total_cost, gross_profit, deposit_amount)
+    SELECT income_statement_month(period_end), COUNT(*),
+           COALESCE(SUM(total_sales), 0), COALESCE(SUM(total_cost), 0),
+           COALESCE(SUM(gross_profit), 0), COALESCE(SUM(deposit_amount), 0)
+    FROM income_statements
+    GROUP BY 1;
+
+    GET DIAGNOSTICS months = ROW_COUNT;
+    RETURN months;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION rebuild_income_statement_monthly() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_income_statement_monthly() TO service_role;
+
+-- 월별 집계와 레코드 테이블 비교 (일치하면 빈 결과, 다르면 월마다 집계값과 실제값)
+-- 전체 테이블을 읽으므로 service_role만 실행
+CREATE OR REPLACE FUNCTION check_income_statement_monthly()
+RETURNS TABLE (
+    month TEXT,
+    rollup_count BIGINT, actual_count BIGINT,
+    rollup_sales NUMERIC, actual_sales NUMERIC,
+    rollup_cost NUMERIC, actual_cost NUMERIC,
+    rollup_profit NUMERIC, actual_profit NUMERIC,
+    rollup_deposit NUMERIC, actual_deposit NUMERIC
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH actual AS (
+        SELECT income_statement_month(period_end) AS month, COUNT(*) AS record_count,
+               COALESCE(SUM(total_sales), 0) AS total_sales, COALESCE(SUM(total_cost), 0) AS total_cost,
+               COALESCE(SUM(gross_profit), 0) AS gross_profit, COALESCE(SUM(deposit_amount), 0) AS deposit_amount
+        FROM income_statements
+        GROUP BY 1
+    )
+    SELECT COALESCE(r.month, a.month),
+           COALESCE(r.record_count, 0), COALESCE(a.record_count, 0),
+           COALESCE(r.total_sales, 0), COALESCE(a.total_sales, 0),
+           COALESCE(r.total_cost, 0), COALESCE(a.total_cost, 0),
+           COALESCE(r.gross_profit, 0), COALESCE(a.gross_profit, 0),
+           COALESCE(r.deposit_amount, 0), COALESCE(a.deposit_amount, 0)
+    FROM income_statement_monthly r
+    FULL OUTER JOIN actual a ON a.month = r.month
+    WHERE r.month IS NULL OR a.month IS NULL
+       OR r.record_count <> a.record_count
+       OR r.total_sales <> a.total_sales
+       OR r.total_cost <> a.total_cost
+       OR r.gross_profit <> a.gross_profit
+       OR r.deposit_amount <> a.deposit_amount
+    ORDER BY 1;
+$$;
+
+REVOKE EXECUTE ON FUNCTION check_income_statement_monthly() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION check_income_statement_monthly() TO service_role;
+
+-- 기존 레코드로 처음 한 번 채우기
+SELECT rebuild_income_statement_monthly();
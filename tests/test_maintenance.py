@@ -0,0 +1,111 @@
+"""maintenance.cleanup_old_records 테스트 (DB 함수 delete_old_income_statements를 흉내 내는 가짜 클라이언트)"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maintenance import cleanup_old_records
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Call:
+    def __init__(self, function):
+        self.function = function
+
+    def execute(self):
+        return _Response(self.function())
+
+
+class FakeSupabase:
+    """income_statements 테이블을 메모리에 두고 삭제 함수만 supabase_migration.sql과 같은 규칙으로 실행"""
+
+    def __init__(self, rows, denied=False):
+        self.rows = rows
+        self.denied = denied
+        self.calls = 0
+
+    def rpc(self, name, params):
+        assert name == 'delete_old_income_statements'
+        return _Call(lambda: self._delete_old(params['cutoff'], params['batch_size']))
+
+    def _delete_old(self, cutoff, batch_size):
+        self.calls += 1
+        if self.denied:
+            raise PermissionError('permission denied for function delete_old_income_statements')
+        targets = sorted((row for row in self.rows if row['upload_date'] < cutoff), key=lambda row: row['id'])[:batch_size]
+        self.rows = [row for row in self.rows if row not in targets]
+        in_use = {row[key] for row in self.rows for key in ('input_file_path', 'output_file_path')}
+        return [{
+            'id': row['id'],
+            'input_file_path': None if row['input_file_path'] in in_use else row['input_file_path'],
+            'output_file_path': None if row['output_file_path'] in in_use else row['output_file_path']
+        } for row in targets]
+
+
+def _make_rows(tmp_path, count, days_ago, start_id=1, shared_input=None):
+    rows = []
+    for record_id in range(start_id, start_id + count):
+        paths = []
+        for kind in ('input', 'output'):
+            path = tmp_path / f"{kind}_{record_id}.xlsx"
+            path.write_bytes(b'x')
+            paths.append(str(path))
+        rows.append({
+            'id': record_id,
+            'input_file_path': shared_input or paths[0],
+            'output_file_path': paths[1],
+            'upload_date': (datetime.now() - timedelta(days=days_ago)).isoformat()
+        })
+    return rows
+
+
+def test_cleanup_removes_old_rows_and_files(tmp_path):
+    old = _make_rows(tmp_path, 450, days_ago=60)
+    recent = _make_rows(tmp_path, 5, days_ago=1, start_id=1000)
+    client = FakeSupabase(old + recent)
+    discarded = []
+
+    metrics = cleanup_old_records(client, retention_days=49, batch_size=200, on_deleted=discarded.extend)
+
+    assert metrics['error'] is None
+    assert metrics['deleted'] == 450
+    assert metrics['files_removed'] == 900
+    assert metrics['batches'] == 3
+    assert sorted(discarded) == [row['id'] for row in old]
+    assert [row['id'] for row in client.rows] == [row['id'] for row in recent]
+    for row in old:
+        assert not os.path.exists(row['input_file_path'])
+        assert not os.path.exists(row['output_file_path'])
+    for row in recent:
+        assert os.path.exists(row['input_file_path'])
+        assert os.path.exists(row['output_file_path'])
+
+
+def test_cleanup_keeps_files_still_used_by_remaining_rows(tmp_path):
+    shared = tmp_path / 'stores.xlsx'
+    shared.write_bytes(b'x')
+    old = _make_rows(tmp_path, 2, days_ago=60, shared_input=str(shared))
+    recent = _make_rows(tmp_path, 1, days_ago=1, start_id=10, shared_input=str(shared))
+    client = FakeSupabase(old + recent)
+
+    metrics = cleanup_old_records(client, retention_days=49, batch_size=200)
+
+    assert metrics['deleted'] == 2
+    assert metrics['files_removed'] == 2
+    assert shared.exists()
+
+
+def test_cleanup_reports_error_when_function_is_denied(tmp_path):
+    client = FakeSupabase(_make_rows(tmp_path, 3, days_ago=60), denied=True)
+
+    metrics = cleanup_old_records(client, retention_days=49, batch_size=2)
+
+    assert metrics['deleted'] == 0
+    assert 'permission denied' in metrics['error']
+    assert client.calls == 1
+    assert len(client.rows) == 3